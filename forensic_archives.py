@@ -0,0 +1,168 @@
+"""Recursive archive descent: streams members of zip/tar/gzip/bzip2/xz containers
+out of memory and hands them to the extractors without touching the disk.
+
+Members are addressed by virtual paths such as ``outer.zip!/inner/photo.jpg``;
+nested archives add another ``!/`` level. ArchiveLimits bounds depth, member
+count, per-member buffering and total expanded bytes so hostile archives
+(zip bombs, deep nesting) cannot exhaust memory or time.
+"""
+import io
+import os
+import bz2
+import gzip
+import lzma
+import hashlib
+import tarfile
+import zipfile
+import datetime
+from collections import namedtuple
+
+from forensic_extractors import HEADER_SIZE, sniff, signature_matches, extract_metadata
+from forensic_hashsets import KNOWN_GOOD
+
+SEP = "!/"
+READ_CHUNK = 1 << 20
+OOXML_MEDIA = ("word/media/", "xl/media/", "ppt/media/", "word/embeddings/", "xl/embeddings/", "ppt/embeddings/")
+
+ArchiveLimits = namedtuple("ArchiveLimits", "max_depth max_members max_member_size max_total")
+DEFAULT_LIMITS = ArchiveLimits(max_depth=3, max_members=10000, max_member_size=64 << 20, max_total=1 << 30)
+
+
+class LimitExceeded(Exception):
+    pass
+
+
+def archive_kind(header):
+    if header.startswith((b'PK\x03\x04', b'PK\x05\x06')): return "zip"
+    if header[257:262] == b'ustar': return "tar"
+    if header.startswith(b'\x1f\x8b'): return "gzip"
+    if header.startswith(b'BZh'): return "bzip2"
+    if header.startswith(b'\xfd7zXZ\x00'): return "xz"
+    return None
+
+
+# --- MEMBER ENUMERATION ---
+def zip_members(f):
+    with zipfile.ZipFile(f) as zf:
+        names = set(zf.namelist())
+        ooxml = "[Content_Types].xml" in names
+        for info in zf.infolist():
+            if info.is_dir(): continue
+            if ooxml and not info.filename.startswith(OOXML_MEDIA): continue
+            if info.flag_bits & 0x1:
+                yield info.filename, info.file_size, info.date_time, None
+                continue
+            with zf.open(info) as stream: yield info.filename, info.file_size, info.date_time, stream
+
+
+def tar_members(f):
+    with tarfile.open(fileobj=f, mode="r:*") as tf:
+        for ti in tf:
+            if not ti.isfile(): continue
+            stamp = datetime.datetime.fromtimestamp(ti.mtime, datetime.timezone.utc).timetuple()[:6]
+            with tf.extractfile(ti) as stream: yield ti.name, ti.size, stamp, stream
+
+
+def stream_members(opener, vname):
+    def members(f):
+        with opener(f) as stream: yield vname, None, None, stream
+    return members
+
+
+def members_for(kind, outer_name):
+    inner = os.path.splitext(os.path.basename(outer_name))[0] or "data"
+    if kind == "zip": return zip_members
+    if kind == "tar": return tar_members
+    if kind == "gzip": return stream_members(lambda f: gzip.GzipFile(fileobj=f), inner)
+    if kind == "bzip2": return stream_members(bz2.BZ2File, inner)
+    if kind == "xz": return stream_members(lzma.LZMAFile, inner)
+    raise ValueError(kind)
+
+
+# --- READING ---
+def read_member(stream, algorithms, limit, budget):
+    """Hashes a member stream; keeps its bytes only while it fits in `limit`.
+
+    budget is a one-element list with the bytes still allowed for this top-level
+    archive; it is decremented as data is decompressed.
+    """
+    hashers = [(name, hashlib.new(name)) for name in algorithms]
+    keep, header, size = bytearray(), b"", 0
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk: break
+        size += len(chunk)
+        budget[0] -= len(chunk)
+        if budget[0] < 0: raise LimitExceeded("expanded size limit reached")
+        if len(header) < HEADER_SIZE: header += chunk[:HEADER_SIZE - len(header)]
+        for _, h in hashers: h.update(chunk)
+        if keep is not None:
+            keep += chunk
+            if len(keep) > limit: keep = None
+    return {name: h.hexdigest() for name, h in hashers}, header, (bytes(keep) if keep is not None else None), size
+
+
+def member_result(vpath, digests, header, data, size, stamp, known=None, local=False):
+    """Result dict for one member; `local` marks `stamp` as wall-clock time of an unknown zone (zip/DOS)."""
+    status = "SECURE" if signature_matches(vpath, header) else "SPOOFED?"
+    verdict, set_name = known.lookup(digests) if known is not None else (None, None)
+    if verdict: status = verdict
+    meta = extract_metadata(vpath, data, header) if data is not None and verdict != KNOWN_GOOD else {}
+    if set_name: meta['Hash Set'] = set_name
+    for name, value in digests.items():
+        if name not in ("md5", "sha256"): meta[name.upper()] = value      # optional digests, as for top-level files
+    if data is None and sniff(header) is not None:
+        meta['Archive Note'] = "member larger than the in-memory limit; hashed only"
+    mtime_ns = None
+    if stamp:
+        try: mtime_ns = int(datetime.datetime(*stamp, tzinfo=datetime.timezone.utc).timestamp()) * 10**9
+        except ValueError: pass
+    return {
+        "path": vpath,
+        "filename": os.path.basename(vpath),
+        "file_type": os.path.splitext(vpath)[1].lower(),
+        "md5": digests.get('md5', "ERROR"),
+        "sha256": digests.get('sha256', "ERROR"),
+        "status": status,
+        "meta": meta,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "inode": None,
+        "mtime_local": local and mtime_ns is not None,
+    }
+
+
+def expand(f, vpath, kind, algorithms, limits, depth=1, budget=None, counter=None, known=None):
+    """Yields a result dict for every member (recursively) of the archive open as `f`."""
+    budget = budget if budget is not None else [limits.max_total]
+    counter = counter if counter is not None else [0]
+    for name, _, stamp, stream in members_for(kind, vpath)(f):
+        counter[0] += 1
+        if counter[0] > limits.max_members: raise LimitExceeded("member count limit reached")
+        child = f"{vpath}{SEP}{name.lstrip('/')}"
+        if stream is None:
+            result = member_result(child, {}, b"", None, None, stamp, local=kind == "zip")
+            result["status"] = "ENCRYPTED"
+            yield result
+            continue
+        digests, header, data, size = read_member(stream, algorithms, limits.max_member_size, budget)
+        result = member_result(child, digests, header, data, size, stamp, known, local=kind == "zip")
+        yield result
+        inner = archive_kind(header)
+        if inner and data is not None and depth < limits.max_depth and result["status"] != KNOWN_GOOD:
+            yield from expand(io.BytesIO(data), child, inner, algorithms, limits, depth + 1, budget, counter, known)
+
+
+def expand_archive(path, header, data=None, algorithms=("md5", "sha256"), limits=DEFAULT_LIMITS, known=None):
+    """All member results for a top-level archive, plus a warning string if a limit cut it short."""
+    kind = archive_kind(header or b"")
+    if kind is None: return [], None
+    children = []
+    try:
+        with (io.BytesIO(data) if data is not None else open(path, 'rb')) as f:
+            for child in expand(f, path, kind, algorithms, limits, known=known): children.append(child)
+    except LimitExceeded as e:
+        return children, str(e)
+    except Exception as e:
+        return children, f"archive read error: {e}"
+    return children, None
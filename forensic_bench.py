@@ -0,0 +1,454 @@
+"""Benchmark suite over a reproducible synthetic evidence corpus.
+
+generate_corpus() writes JPEGs with EXIF (camera, timestamps, GPS), PDFs with an
+Info dictionary, docx/xlsx/pptx packages with docProps, ID3-tagged MP3s and zips
+nesting all of those, using only the standard library and a seeded RNG, so the
+same (files, seed, size) always yields byte-identical files and mtimes.
+
+run_benchmarks() times hashing, each extractor, ingest, correlation, timeline,
+search and every export format. Ingest runs in the sandboxed workers the CLI and
+GUI use by default unless sandbox=False; the results record which was measured. Each stage runs in a fresh interpreter so its
+peak RSS is its own; results are plain dicts written as JSON and compare()
+diffs two such files to catch regressions between versions.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import struct
+import zipfile
+import datetime
+import platform
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try: import resource
+except ImportError: resource = None    # Windows: no getrusage, RSS is reported as null
+
+CORPUS_VERSION = 1
+MANIFEST = "corpus.json"
+MIX = (("jpeg", 40), ("pdf", 18), ("docx", 8), ("xlsx", 6), ("pptx", 6), ("mp3", 12), ("zip", 10))
+EXTENSIONS = {"jpeg": ".jpg", "pdf": ".pdf", "docx": ".docx", "xlsx": ".xlsx", "pptx": ".pptx", "mp3": ".mp3", "zip": ".zip"}
+FILES_PER_DIR = 1000
+PAYLOAD_KB = 64                 # mean filler bytes per file (image data, PDF streams, audio frames)
+ZIP_DATE = (2024, 1, 1, 0, 0, 0)
+
+CAMERAS = (("Apple", "iPhone 13"), ("Apple", "iPhone 15 Pro"), ("Canon", "EOS R5"), ("NIKON CORPORATION", "NIKON D850"),
+           ("samsung", "SM-S918B"), ("Google", "Pixel 8"), ("SONY", "ILCE-7M4"), ("FUJIFILM", "X-T5"))
+SOFTWARE = ("17.1.2", "Adobe Photoshop 25.0", "GIMP 2.10.34", "Lightroom 7.0", "Ver.1.10", "HDR+ 1.0")
+AUTHORS = ("Alice Smith", "Smith, Alice", "Bob Jones", "Carol White", "Dave Brown", "Eve Black", "Mallory Grey")
+PRODUCERS = ("Microsoft Word 2019", "LibreOffice 7.6", "Adobe PDF Library 17.0", "macOS Quartz PDFContext", "pdfTeX-1.40.25")
+PLACES = ((37.7749, -122.4194), (40.7128, -74.0060), (51.5074, -0.1278), (48.8566, 2.3522),
+          (-33.8688, 151.2093), (35.6762, 139.6503), (52.5200, 13.4050), (19.4326, -99.1332))
+EPOCH = 1704067200              # 2024-01-01T00:00:00Z; generated timestamps fall in the following year
+YEAR = 365 * 86400
+
+SEARCH_QUERIES = ('iphone', 'key:Model value:"iPhone*"', 'value:"Alice*"', 'status:FLAGGED',
+                  'after:2024-06-01 before:2024-07-01', 'file:*.pdf', 'key:"GPS Position"')
+SEARCH_REPEAT = 20
+
+
+# --- CORPUS: FORMAT WRITERS ---
+def stamp(ts, fmt="%Y:%m:%d %H:%M:%S"):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime(fmt)
+
+
+def tiff_ifd(entries, base):
+    """One little-endian IFD at TIFF offset `base`: entries are (tag, type, count, packed value)."""
+    data_start = base + 2 + 12 * len(entries) + 4
+    head, data = struct.pack("<H", len(entries)), b""
+    for tag, typ, count, value in sorted(entries):
+        if len(value) <= 4: head += struct.pack("<HHI", tag, typ, count) + value.ljust(4, b"\0")
+        else:
+            head += struct.pack("<HHII", tag, typ, count, data_start + len(data))
+            data += value + b"\0" * (len(value) % 2)
+    return head + b"\0\0\0\0" + data
+
+
+def ascii_tag(tag, text):
+    raw = text.encode("ascii") + b"\0"
+    return tag, 2, len(raw), raw
+
+
+def dms(value):
+    value = abs(value)
+    d, m = int(value), int(value % 1 * 60)
+    return struct.pack("<6I", d, 1, m, 1, round((value * 3600 - d * 3600 - m * 60) * 100), 100)
+
+
+def make_jpeg(rng, ts, size):
+    make, model = rng.choice(CAMERAS)
+    captured = stamp(ts)
+    modified = stamp(ts + rng.choice((0, 0, 0, 3600, -7200)))     # some edited, some "modified" before capture
+    ifd0 = [ascii_tag(0x010F, make), ascii_tag(0x0110, model), ascii_tag(0x0131, rng.choice(SOFTWARE)),
+            ascii_tag(0x0132, modified)]
+    if rng.random() < 0.3: ifd0.append(ascii_tag(0x013B, rng.choice(AUTHORS)))
+    exif = [ascii_tag(0x9003, captured), ascii_tag(0x9004, captured),
+            ascii_tag(0xA431, f"SN{rng.randrange(50):05d}")]
+    gps = None
+    if rng.random() < 0.6:
+        lat, lon = rng.choice(PLACES)
+        lat, lon = lat + rng.uniform(-0.002, 0.002), lon + rng.uniform(-0.002, 0.002)
+        gps = [ascii_tag(1, "N" if lat >= 0 else "S"), (2, 5, 3, dms(lat)),
+               ascii_tag(3, "E" if lon >= 0 else "W"), (4, 5, 3, dms(lon))]
+    pointers = [(0x8769, 4, 1, b"\0" * 4)] + ([(0x8825, 4, 1, b"\0" * 4)] if gps else [])
+    exif_base = 8 + len(tiff_ifd(ifd0 + pointers, 8))
+    exif_ifd = tiff_ifd(exif, exif_base)
+    pointers = [(0x8769, 4, 1, struct.pack("<I", exif_base))]
+    if gps: pointers.append((0x8825, 4, 1, struct.pack("<I", exif_base + len(exif_ifd))))
+    tiff = b"II*\0" + struct.pack("<I", 8) + tiff_ifd(ifd0 + pointers, 8) + exif_ifd
+    if gps: tiff += tiff_ifd(gps, exif_base + len(exif_ifd))
+    app1 = b"Exif\0\0" + tiff
+    return (b"\xff\xd8\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 +
+            b"\xff\xda\x00\x08\x01\x01\x00\x00\x3f\x00" + rng.randbytes(size) + b"\xff\xd9")
+
+
+def make_pdf(rng, ts, size):
+    created = ts + (rng.choice((0, 0, 0, 0, 7200)))                 # a few "created after modified"
+    info = (f"<< /Title ({rng.choice(('Invoice', 'Report', 'Contract', 'Minutes'))} {rng.randrange(1000)}) "
+            f"/Author ({rng.choice(AUTHORS)}) /Producer ({rng.choice(PRODUCERS)}) /Creator (Writer) "
+            f"/CreationDate (D:{stamp(created, '%Y%m%d%H%M%S')}Z) /ModDate (D:{stamp(ts + 3600 if created == ts else ts, '%Y%m%d%H%M%S')}Z) >>")
+    stream = rng.randbytes(size)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [] /Count 0 >>", info.encode("latin-1"),
+               b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"]
+    out, offsets = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"), []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+OOXML_MAIN = {"docx": ("word/document.xml", "wordprocessingml.document.main", "Microsoft Office Word"),
+              "xlsx": ("xl/workbook.xml", "spreadsheetml.sheet.main", "Microsoft Excel"),
+              "pptx": ("ppt/presentation.xml", "presentationml.presentation.main", "Microsoft Office PowerPoint")}
+
+
+def zip_bytes(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members: zf.writestr(zipfile.ZipInfo(name, ZIP_DATE), data, zipfile.ZIP_DEFLATED)
+    return buf.getvalue()
+
+
+def make_ooxml(kind, rng, ts, size):
+    part, content_type, app = OOXML_MAIN[kind]
+    created = ts - rng.choice((0, 86400, 30 * 86400, -7200))        # negative: "created after modified"
+    author, editor = rng.choice(AUTHORS), rng.choice(AUTHORS)
+    core = ('<?xml version="1.0" encoding="UTF-8"?><cp:coreProperties '
+            'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            f'<dc:title>{kind.upper()} {rng.randrange(1000)}</dc:title><dc:creator>{author}</dc:creator>'
+            f'<cp:lastModifiedBy>{editor}</cp:lastModifiedBy>'
+            f'<dcterms:created xsi:type="dcterms:W3CDTF">{stamp(created, "%Y-%m-%dT%H:%M:%SZ")}</dcterms:created>'
+            f'<dcterms:modified xsi:type="dcterms:W3CDTF">{stamp(ts, "%Y-%m-%dT%H:%M:%SZ")}</dcterms:modified>'
+            '</cp:coreProperties>')
+    appxml = ('<?xml version="1.0" encoding="UTF-8"?><Properties '
+              'xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+              f'<Application>{app}</Application><AppVersion>16.0000</AppVersion>'
+              f'<Company>{rng.choice(("Acme Corp", "Initech", "Globex", ""))}</Company>'
+              f'<TotalTime>{rng.randrange(600)}</TotalTime></Properties>')
+    types = ('<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+             f'<Override PartName="/{part}" ContentType="application/vnd.openxmlformats-officedocument.{content_type}+xml"/>'
+             '</Types>')
+    return zip_bytes((("[Content_Types].xml", types), ("docProps/core.xml", core), ("docProps/app.xml", appxml),
+                      (part, "<root>" + rng.randbytes(size).hex() + "</root>")))
+
+
+def id3_frame(frame_id, text):
+    body = b"\x00" + text.encode("latin-1")
+    return frame_id.encode("ascii") + struct.pack(">IH", len(body), 0) + body
+
+
+def make_mp3(rng, ts, size):
+    frames = (id3_frame("TIT2", f"Track {rng.randrange(100)}") + id3_frame("TPE1", rng.choice(AUTHORS)) +
+              id3_frame("TALB", f"Album {rng.randrange(20)}") + id3_frame("TYER", stamp(ts, "%Y")))
+    syncsafe = bytes((len(frames) >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    frame = b"\xff\xfb\x90\x64" + bytes(413)                        # MPEG-1 layer III, 128 kbit/s, 44.1 kHz
+    return b"ID3\x03\x00\x00" + syncsafe + frames + frame * max(8, size // len(frame))
+
+
+WRITERS = {"jpeg": make_jpeg, "pdf": make_pdf, "mp3": make_mp3,
+           "docx": lambda rng, ts, size: make_ooxml("docx", rng, ts, size),
+           "xlsx": lambda rng, ts, size: make_ooxml("xlsx", rng, ts, size),
+           "pptx": lambda rng, ts, size: make_ooxml("pptx", rng, ts, size)}
+
+
+def make_zip(rng, ts, size, depth=0):
+    """A zip of a few corpus files; most also nest one more zip level."""
+    members = []
+    for i in range(rng.randint(2, 4)):
+        kind = rng.choice(("jpeg", "pdf", "docx", "mp3"))
+        members.append((f"{kind}_{i}{EXTENSIONS[kind]}", WRITERS[kind](rng, ts + i, size // 4)))
+    if depth < 2 and rng.random() < 0.7: members.append((f"nested_{depth + 1}.zip", make_zip(rng, ts, size // 2, depth + 1)))
+    return zip_bytes(members)
+
+
+WRITERS["zip"] = make_zip
+
+
+# --- CORPUS: GENERATION ---
+def generate_corpus(out_dir, files=1000, seed=1, payload_kb=PAYLOAD_KB):
+    """Writes (or reuses) the corpus for these parameters under out_dir; returns its manifest."""
+    params = {"version": CORPUS_VERSION, "files": files, "seed": seed, "payload_kb": payload_kb}
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f: manifest = json.load(f)
+        if manifest.get("params") == params: return manifest
+        shutil.rmtree(out_dir)
+    rng = random.Random(seed)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    counts = dict.fromkeys(kinds, 0)
+    total = 0
+    for i in range(files):
+        kind = rng.choices(kinds, weights)[0]
+        ts = EPOCH + rng.randrange(YEAR)
+        if rng.random() < 0.02: ts = EPOCH + YEAR // 2 + rng.randrange(30)     # a burst of same-minute files
+        size = max(1, int(rng.expovariate(1 / (payload_kb * 1024))))
+        data = WRITERS[kind](rng, ts, size)
+        folder = os.path.join(out_dir, f"{i // FILES_PER_DIR:04d}")
+        if i % FILES_PER_DIR == 0: os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{kind}_{i:07d}{EXTENSIONS[kind]}")
+        with open(path, "wb") as f: f.write(data)
+        mtime = ts + rng.choice((0, 60, 86400, 10 * 86400))
+        os.utime(path, (mtime, mtime))
+        counts[kind] += 1
+        total += len(data)
+    manifest = {"params": params, "files": files, "bytes": total, "kinds": counts}
+    with open(manifest_path, "w") as f: json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def corpus_files(corpus):
+    from forensic_scan import scan
+    return sorted(p for p in scan([corpus]) if not p.endswith(MANIFEST))
+
+
+# --- MEASUREMENT ---
+def percentiles(samples):
+    """count, mean, p50/p90/p95/p99 and max of latency samples in seconds, reported in milliseconds."""
+    if not samples: return {"count": 0}
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, max(0, int(round(q * len(s) + 0.5)) - 1))]
+    out = {"count": len(s), "mean_ms": sum(s) / len(s) * 1000}
+    out.update({f"p{int(q * 100)}_ms": pick(q) * 1000 for q in (0.5, 0.9, 0.95, 0.99)})
+    out["max_ms"] = s[-1] * 1000
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in out.items()}
+
+
+def peak_rss_mb(who="self"):
+    """Peak resident set size of this process (or its reaped children) in MiB, or None."""
+    if resource is None: return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    scale = 1 if sys.platform == "darwin" else 1024             # ru_maxrss is bytes on macOS, KiB on Linux
+    return round(usage.ru_maxrss * scale / (1 << 20), 1)
+
+
+def throughput(seconds, files, size):
+    seconds = max(seconds, 1e-9)
+    return {"seconds": round(seconds, 4), "files": files, "files_per_s": round(files / seconds, 1),
+            "mb_per_s": round(size / (1 << 20) / seconds, 2)}
+
+
+# --- STAGES (each runs in its own interpreter) ---
+def stage_hash(ctx):
+    from forensic_core import hash_file
+    files, latencies, size = corpus_files(ctx["corpus"]), [], 0
+    start = time.perf_counter()
+    for path in files:
+        t = time.perf_counter()
+        hash_file(path, keep_limit=0)
+        latencies.append(time.perf_counter() - t)
+        size += os.path.getsize(path)
+    out = throughput(time.perf_counter() - start, len(files), size)
+    out["latency"] = percentiles(latencies)
+    return out
+
+
+def stage_extract(ctx):
+    """Per-extractor latency with content already in memory, as the engine hands it over."""
+    from forensic_extractors import sniff, extract_metadata, HEADER_SIZE
+    files, by_kind, errors, size = corpus_files(ctx["corpus"]), {}, 0, 0
+    start = time.perf_counter()
+    for path in files:
+        with open(path, "rb") as f: data = f.read()
+        header = data[:HEADER_SIZE]
+        ex = sniff(header)
+        t = time.perf_counter()
+        meta = extract_metadata(path, data, header)
+        by_kind.setdefault(ex.name if ex else "NONE", []).append(time.perf_counter() - t)
+        errors += 'Error' in meta
+        size += len(data)
+    out = throughput(time.perf_counter() - start, len(files), size)
+    out["errors"] = errors
+    out["extractors"] = {name: percentiles(samples) for name, samples in sorted(by_kind.items())}
+    return out
+
+
+def stage_ingest(ctx):
+    from forensic_db import ForensicStore
+    from forensic_core import ForensicEngine
+    from forensic_archives import DEFAULT_LIMITS
+    from forensic_metrics import REGISTRY
+    from forensic_sandbox import DEFAULT_SANDBOX
+    if os.path.exists(ctx["db"]): os.remove(ctx["db"])
+    store = ForensicStore(ctx["db"])
+    try:
+        files = corpus_files(ctx["corpus"])
+        size = sum(os.path.getsize(p) for p in files)
+        engine = ForensicEngine(store, workers=ctx["workers"], archives=DEFAULT_LIMITS,
+                                sandbox=DEFAULT_SANDBOX if ctx["sandbox"] else None)
+        start = time.perf_counter()
+        engine.run(files)
+        out = throughput(time.perf_counter() - start, len(files), size)
+        out["sandboxed"] = ctx["sandbox"]
+        out["archive_members"] = engine.stats["members"]
+        out["metadata_rows"] = store.row_count()
+        out["pipeline"] = REGISTRY.snapshot()["timers"]
+    finally:
+        store.close()
+    return out
+
+
+def stage_correlate(ctx):
+    from forensic_db import ForensicStore
+    from forensic_correlate import Correlator
+    store = ForensicStore(ctx["db"])
+    try:
+        start = time.perf_counter()
+        counts = Correlator(store).run()
+        return {"seconds": round(time.perf_counter() - start, 4), "groups": counts}
+    finally:
+        store.close()
+
+
+def stage_timeline(ctx):
+    from forensic_db import ForensicStore
+    from forensic_timeline import Timeline
+    store = ForensicStore(ctx["db"])
+    try:
+        start = time.perf_counter()
+        counts = Timeline(store).run()
+        return {"seconds": round(time.perf_counter() - start, 4), "counts": counts}
+    finally:
+        store.close()
+
+
+def stage_search(ctx):
+    from forensic_db import ForensicStore
+    import forensic_search
+    store = ForensicStore(ctx["db"])
+    try:
+        queries, everything = {}, []
+        for query in SEARCH_QUERIES:
+            samples = []
+            for _ in range(SEARCH_REPEAT):
+                t = time.perf_counter()
+                rows = forensic_search.search(store, query, limit=100).fetchall()
+                forensic_search.count(store, query, cap=10000)
+                samples.append(time.perf_counter() - t)
+            queries[query] = dict(percentiles(samples), rows=len(rows))
+            everything += samples
+        return {"latency": percentiles(everything), "queries": queries}
+    finally:
+        store.close()
+
+
+def stage_export(ctx, fmt):
+    from forensic_db import ForensicStore
+    from forensic_reports import EXPORTERS
+    store = ForensicStore(ctx["db"])
+    path = os.path.join(ctx["work"], f"report.{fmt}")
+    try:
+        start = time.perf_counter()
+        rows = EXPORTERS[fmt](store, path)
+        seconds = max(time.perf_counter() - start, 1e-9)
+        return {"seconds": round(seconds, 4), "rows": rows, "rows_per_s": round(rows / seconds, 1),
+                "output_mb": round(os.path.getsize(path) / (1 << 20), 2)}
+    finally:
+        store.close()
+
+
+STAGES = {"hash": stage_hash, "extract": stage_extract, "ingest": stage_ingest, "correlate": stage_correlate,
+          "timeline": stage_timeline, "search": stage_search,
+          "export_csv": lambda ctx: stage_export(ctx, "csv"),
+          "export_html": lambda ctx: stage_export(ctx, "html"),
+          "export_pdf": lambda ctx: stage_export(ctx, "pdf")}
+
+
+def run_stage(name, ctx):
+    result = STAGES[name](ctx)
+    result["peak_rss_mb"] = peak_rss_mb("self")
+    result["workers_peak_rss_mb"] = peak_rss_mb("children")
+    return result
+
+
+# --- SUITE ---
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def run_benchmarks(corpus, work_dir, files=1000, seed=1, payload_kb=PAYLOAD_KB, workers=1, stages=None, label=None,
+                   progress=None, sandbox=True):
+    """Generates/reuses the corpus, runs the selected stages in order and returns the results dict."""
+    manifest = generate_corpus(corpus, files, seed, payload_kb)
+    os.makedirs(work_dir, exist_ok=True)
+    ctx = {"corpus": corpus, "work": work_dir, "db": os.path.join(work_dir, "bench.db"), "workers": workers,
+           "sandbox": sandbox}
+    results = {
+        "label": label,
+        "revision": git_revision(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "sandboxed": sandbox,
+        "corpus": manifest,
+        "stages": {},
+    }
+    spawn = multiprocessing.get_context("spawn")
+    for name in stages or STAGES:
+        if progress: progress(name)
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            results["stages"][name] = pool.submit(run_stage, name, ctx).result()
+    return results
+
+
+# --- COMPARISON ---
+HIGHER_IS_BETTER = ("files_per_s", "mb_per_s", "rows_per_s")
+LOWER_IS_BETTER = ("seconds", "peak_rss_mb")
+
+
+def headline(stage):
+    metrics = {m: stage.get(m) for m in HIGHER_IS_BETTER + LOWER_IS_BETTER}
+    metrics["p95_ms"] = stage.get("latency", {}).get("p95_ms")
+    return metrics
+
+
+def compare(baseline, current, tolerance=0.10):
+    """(stage, metric, old, new, change, regressed) for every headline metric both results share."""
+    out = []
+    for stage, new in current["stages"].items():
+        if stage not in baseline.get("stages", {}): continue
+        old, new = headline(baseline["stages"][stage]), headline(new)
+        for metric, a in old.items():
+            b = new[metric]
+            if not a or b is None: continue
+            higher = metric in HIGHER_IS_BETTER
+            change = (b - a) / a
+            out.append((stage, metric, a, b, change, change < -tolerance if higher else change > tolerance))
+    return out
@@ -0,0 +1,400 @@
+"""Headless command-line front end for unattended evidence ingest (no tkinter required)."""
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+
+from forensic_core import ForensicEngine, iter_files, setup_logging, LOG_DIR, DEFAULT_DIGESTS, OPTIONAL_DIGESTS
+from forensic_db import ForensicStore, DB_PATH
+from forensic_correlate import Correlator, TIME_WINDOW, FUZZY_THRESHOLD
+from forensic_reports import EXPORTERS
+from forensic_archives import ArchiveLimits, DEFAULT_LIMITS
+from forensic_scan import ScanFilter
+import forensic_search
+from forensic_hashsets import KnownFiles, build_hashset
+from forensic_timeline import Timeline, parse_epoch
+from forensic_geo import GeoIndex, CLUSTER_PRECISION
+from forensic_sandbox import SandboxLimits, DEFAULT_SANDBOX
+import forensic_metrics
+from forensic_metrics import REGISTRY, JsonlExporter, JSONL_INTERVAL
+
+logger = logging.getLogger("forensic")
+
+
+def read_list(list_path):
+    src = sys.stdin if list_path == "-" else open(list_path, encoding="utf-8")
+    try:
+        for line in src:
+            line = line.strip()
+            if line: yield line
+    finally:
+        if src is not sys.stdin: src.close()
+
+
+def input_paths(args):
+    for p in args.paths: yield p
+    for lst in args.file_list: yield from read_list(lst)
+
+
+def cmd_analyze(args):
+    exporter = JsonlExporter(args.metrics_jsonl, interval=args.metrics_interval) if args.metrics_jsonl else None
+    if args.metrics_port is not None: forensic_metrics.serve(args.metrics_port)
+    try:
+        with forensic_metrics.profiled(args.profile, args.tracemalloc):
+            run_analysis(args, exporter)
+    finally:
+        if exporter: exporter.close()
+    if args.slowest:
+        for line in forensic_metrics.summary(n=args.slowest): print(line)
+    return 0
+
+
+def run_analysis(args, exporter=None):
+    store = ForensicStore(args.db)
+    try:
+        if args.fresh: store.clear()
+        engine = ForensicEngine(store, workers=args.workers, queue_size=args.queue_size,
+                                algorithms=DEFAULT_DIGESTS + tuple(args.extra_hash), paranoid=args.paranoid,
+                                archives=archive_limits(args), known=known_files(args), sandbox=sandbox_limits(args))
+        start = time.time()
+        logger.info("EXECUTING ANALYSIS...")
+        count = 0
+        for result in engine.process(iter_files(input_paths(args), scan_filter(args), args.scan_workers)):
+            count += 1
+            if args.verbose: print(f"[{'CACHED' if result.get('cached') else result['status']}] {result['path']} md5={result['md5']} sha256={result['sha256']}")
+            if exporter: exporter.tick()
+        elapsed = time.time() - start
+        print(f"ANALYSIS COMPLETE: {count} FILES IN {elapsed:.2f}s -> {args.db} "
+              f"(analyzed={engine.stats['analyzed']} cached={engine.stats['cached']} verified={engine.stats['verified']} "
+              f"archive_members={engine.stats['members']} known={engine.stats['known']} known_bad={engine.stats['known_bad']} errors={engine.stats['errors']})")
+        logger.info(f"ANALYSIS COMPLETE: {count} FILES")
+        if not args.no_correlate: correlate(store, args)
+        if not args.no_timeline: build_timeline(store)
+    finally:
+        store.close()
+
+
+def archive_limits(args):
+    if args.no_archives: return None
+    return ArchiveLimits(max_depth=args.archive_depth, max_members=args.archive_max_members,
+                         max_member_size=args.archive_member_mb << 20, max_total=args.archive_total_mb << 20)
+
+
+def sandbox_limits(args):
+    if args.no_sandbox: return None
+    return SandboxLimits(timeout=args.timeout, max_memory=args.max_memory_mb << 20, max_tasks=args.recycle_after)
+
+
+def known_files(args):
+    if not (args.known_good or args.known_bad): return None
+    return KnownFiles(good=args.known_good, bad=args.known_bad)
+
+
+def scan_filter(args):
+    return ScanFilter(include=args.include, exclude=args.exclude, exts=args.ext, magic=args.magic,
+                      min_size=args.min_size, max_size=args.max_size)
+
+
+def correlate(store, args):
+    correlator = Correlator(store, window=args.window, threshold=args.threshold)
+    start = time.time()
+    with REGISTRY.timer("phase", phase="correlate"): counts = correlator.run(args.rules)
+    print(f"CORRELATION COMPLETE IN {time.time() - start:.2f}s: "
+          + ", ".join(f"{rule}={n}" for rule, n in counts.items()))
+    for _, rule, signature, size in correlator.groups(limit=args.show):
+        print(f"LINK: {rule}='{signature}' SHARED BY {size} FILES")
+
+
+def build_timeline(store):
+    start = time.time()
+    with REGISTRY.timer("phase", phase="timeline"): counts = Timeline(store).run()
+    print(f"TIMELINE COMPLETE IN {time.time() - start:.2f}s: " + ", ".join(f"{k}={n}" for k, n in counts.items()))
+
+
+def cmd_timeline(args):
+    store = ForensicStore(args.db)
+    try:
+        if not args.no_build: build_timeline(store)
+        timeline = Timeline(store)
+        if args.anomalies:
+            for rule, path, detail in timeline.anomalies(args.rule, args.limit): print(f"{rule}\t{path}\t{detail}")
+            return 0
+        bounds = []
+        for value in (args.start, args.end):
+            epoch = parse_epoch(value) if value else None
+            if value and epoch is None:
+                print(f"TIMELINE ERROR: bad date '{value}' (use YYYY-MM-DD)", file=sys.stderr)
+                return 2
+            bounds.append(epoch)
+        for row in timeline.events(*bounds, limit=args.limit): print("\t".join(row))
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_geo(args):
+    store = ForensicStore(args.db)
+    try:
+        start = time.time()
+        geo = GeoIndex(store)
+        if args.near: rows = geo.near(*args.near, args.radius, args.limit)
+        elif args.box: rows = geo.within(*args.box)[:args.limit]
+        else: rows = geo.clusters(args.precision, args.min_size, args.limit)
+        for row in rows: print("\t".join(f"{v:.6f}" if isinstance(v, float) else str(v) for v in row))
+        print(f"GEO QUERY COMPLETE: {len(rows)} ROWS IN {(time.time() - start) * 1000:.1f}ms", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+def coords(count):
+    def parse(text):
+        values = [float(v) for v in text.split(",")]
+        if len(values) != count: raise argparse.ArgumentTypeError(f"expected {count} comma-separated numbers")
+        return values
+    return parse
+
+
+def cmd_errors(args):
+    store = ForensicStore(args.db)
+    try:
+        for path, stage, kind, message, extractor, seconds, at in store.errors(args.kind, args.limit):
+            print(f"{at}\t{stage}/{kind}\t{extractor or '-'}\t{'-' if seconds is None else f'{seconds:.3f}s'}\t{path}\t{message}")
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_correlate(args):
+    store = ForensicStore(args.db)
+    try: correlate(store, args)
+    finally: store.close()
+    return 0
+
+
+def cmd_export(args):
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in EXPORTERS:
+        print(f"EXPORT ERROR: unknown format '{fmt}' (use one of {', '.join(EXPORTERS)})", file=sys.stderr)
+        return 2
+    store = ForensicStore(args.db)
+    try:
+        start = time.time()
+        count = EXPORTERS[fmt](store, args.output)
+        print(f"{fmt.upper()} REPORT EXPORTED TO: {args.output} ({count} ROWS IN {time.time() - start:.2f}s)")
+        logger.info(f"{fmt.upper()} REPORT EXPORTED TO: {args.output}")
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_search(args):
+    store = ForensicStore(args.db)
+    try:
+        start = time.time()
+        try: cursor = forensic_search.search(store, args.query, args.limit)
+        except ValueError as e:
+            print(f"SEARCH ERROR: {e}", file=sys.stderr)
+            return 2
+        count = 0
+        for row in cursor:
+            count += 1
+            print("\t".join("" if v is None else str(v) for v in row))
+        print(f"SEARCH COMPLETE: {count} ROWS IN {(time.time() - start) * 1000:.1f}ms", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_hashset(args):
+    start = time.time()
+    count = build_hashset(args.sources, args.output, args.algorithm)
+    print(f"HASH SET BUILT: {args.output} ({count} {args.algorithm.upper()} DIGESTS IN {time.time() - start:.2f}s)")
+    return 0
+
+
+def cmd_bench(args):
+    import forensic_bench
+    stages = args.stages or list(forensic_bench.STAGES)
+    unknown = [s for s in stages if s not in forensic_bench.STAGES]
+    if unknown:
+        print(f"BENCH ERROR: unknown stage(s) {', '.join(unknown)} (use {', '.join(forensic_bench.STAGES)})", file=sys.stderr)
+        return 2
+    corpus = args.corpus or os.path.join(args.work, "corpus")
+    print(f"BENCH INGEST MODE: {'unsandboxed process pool' if args.no_sandbox else 'sandboxed workers'}")
+    results = forensic_bench.run_benchmarks(corpus, args.work, args.files, args.seed, args.payload_kb, args.workers,
+                                            stages, args.label, progress=lambda name: print(f"BENCH STAGE: {name}"),
+                                            sandbox=not args.no_sandbox)
+    for name, r in results["stages"].items():
+        rate = next((f"{r[k]} {k.replace('_per_s', '/s')}" for k in ("files_per_s", "rows_per_s") if k in r), "")
+        print(f"  {name:<12} {r.get('seconds', ''):>10}s  {rate:<22} peak_rss={r['peak_rss_mb']} MiB")
+    with open(args.output, "w") as f: json.dump(results, f, indent=2)
+    print(f"BENCH RESULTS SAVED TO: {args.output}")
+    if not args.compare: return 0
+    with open(args.compare) as f: baseline = json.load(f)
+    if baseline.get("sandboxed", False) != results["sandboxed"]:
+        print(f"BENCH WARNING: {args.compare} measured ingest {'with' if baseline.get('sandboxed') else 'without'} the sandbox")
+    regressions = 0
+    for stage, metric, old, new, change, regressed in forensic_bench.compare(baseline, results, args.tolerance):
+        regressions += regressed
+        print(f"  {'REGRESSION' if regressed else 'ok':<10} {stage}.{metric}: {old} -> {new} ({change:+.1%})")
+    print(f"BENCH COMPARE: {regressions} REGRESSION(S) vs {args.compare}")
+    return 1 if regressions else 0
+
+
+def add_correlation_args(p):
+    p.add_argument("--rules", type=lambda s: s.split(","), default=None, metavar="R1,R2",
+                   help="comma-separated correlation rules to (re)build (default: all)")
+    p.add_argument("--window", type=int, default=TIME_WINDOW, help="timestamp bucket in seconds (default: %(default)s)")
+    p.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD,
+                   help="fuzzy author similarity 0..1 (default: %(default)s)")
+    p.add_argument("--show", type=int, default=20, metavar="N", help="print the N largest groups (default: %(default)s)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="forensic_cli", description="Metadata Interceptor headless engine")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite evidence database (default: %(default)s)")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="directory for forensic_ops.log (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("analyze", help="extract, hash and store metadata for files/directories")
+    p.add_argument("paths", nargs="*", help="files or directories (directories are walked recursively)")
+    p.add_argument("-l", "--file-list", action="append", default=[], metavar="FILE",
+                   help="read newline-separated paths from FILE ('-' for stdin); may be repeated")
+    p.add_argument("--fresh", action="store_true", help="flush the database (and file cache) before analyzing")
+    p.add_argument("--paranoid", action="store_true",
+                   help="re-hash files whose size/mtime/inode are unchanged and re-parse them if the content differs")
+    p.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                   help="worker processes for hashing/parsing; 1 runs serially (default: %(default)s)")
+    p.add_argument("--queue-size", type=int, default=None, metavar="N",
+                   help="max chunks of files (single files when sandboxed) in flight at once (default: 4 x workers)")
+    p.add_argument("--hash", dest="extra_hash", action="append", default=[], choices=OPTIONAL_DIGESTS,
+                   help="extra digest computed in the same read pass as MD5/SHA-256; may be repeated")
+    p.add_argument("-v", "--verbose", action="store_true", help="print one line per processed file")
+    p.add_argument("--include", action="append", default=[], metavar="GLOB",
+                   help="only analyze files whose path or name matches GLOB; may be repeated")
+    p.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                   help="skip files and directories whose path or name matches GLOB; may be repeated")
+    p.add_argument("--ext", type=lambda s: s.split(","), default=None, metavar=".JPG,.PDF",
+                   help="only analyze these extensions")
+    p.add_argument("--magic", type=lambda s: s.split(","), default=None, metavar="JPEG,PDF",
+                   help="only analyze files whose magic bytes match these extractor kinds")
+    p.add_argument("--min-size", type=int, default=None, metavar="BYTES", help="skip smaller files")
+    p.add_argument("--max-size", type=int, default=None, metavar="BYTES", help="skip larger files")
+    p.add_argument("--scan-workers", type=int, default=8, metavar="N",
+                   help="threads enumerating directories; files come out in the same sorted order for any N (default: %(default)s)")
+    p.add_argument("--known-good", action="append", default=[], metavar="HSET",
+                   help="hash set of known-good files: stored with status KNOWN and not parsed; may be repeated")
+    p.add_argument("--known-bad", action="append", default=[], metavar="HSET",
+                   help="hash set of known-bad files: flagged KNOWN_BAD; may be repeated")
+    p.add_argument("--no-archives", action="store_true", help="do not descend into zip/tar/gzip/bzip2/xz members")
+    p.add_argument("--archive-depth", type=int, default=DEFAULT_LIMITS.max_depth,
+                   help="max nesting depth for archive descent (default: %(default)s)")
+    p.add_argument("--archive-max-members", type=int, default=DEFAULT_LIMITS.max_members,
+                   help="max members expanded per top-level archive (default: %(default)s)")
+    p.add_argument("--archive-member-mb", type=int, default=DEFAULT_LIMITS.max_member_size >> 20,
+                   help="members larger than this are hashed but not parsed (default: %(default)s)")
+    p.add_argument("--archive-total-mb", type=int, default=DEFAULT_LIMITS.max_total >> 20,
+                   help="max bytes decompressed per top-level archive, zip-bomb guard (default: %(default)s)")
+    p.add_argument("--timeout", type=float, default=DEFAULT_SANDBOX.timeout, metavar="SECONDS",
+                   help="per-file wall-clock limit; the worker is killed and the file recorded as an error (default: %(default)s)")
+    p.add_argument("--max-memory-mb", type=int, default=DEFAULT_SANDBOX.max_memory >> 20, metavar="MB",
+                   help="memory cap of each worker process (default: %(default)s)")
+    p.add_argument("--recycle-after", type=int, default=DEFAULT_SANDBOX.max_tasks, metavar="N",
+                   help="replace each worker after N files (default: %(default)s)")
+    p.add_argument("--no-sandbox", action="store_true",
+                   help="analyze in a plain process pool without timeouts, memory caps or worker recycling")
+    p.add_argument("--no-correlate", action="store_true", help="skip rebuilding the correlation graph afterwards")
+    p.add_argument("--no-timeline", action="store_true", help="skip rebuilding the timeline and anomaly findings afterwards")
+    p.add_argument("--metrics-jsonl", metavar="FILE",
+                   help="append a JSON snapshot of per-stage timers, counters and slowest files to FILE while running")
+    p.add_argument("--metrics-interval", type=float, default=JSONL_INTERVAL, metavar="SECONDS",
+                   help="seconds between --metrics-jsonl snapshots (default: %(default)s)")
+    p.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                   help="serve Prometheus text on http://127.0.0.1:PORT/metrics (and /slowest) during the run")
+    p.add_argument("--slowest", type=int, default=0, metavar="N",
+                   help="print stage totals and the N slowest extractors and files when done")
+    p.add_argument("--profile", metavar="FILE.pstats",
+                   help="run under cProfile, save the stats and print the top functions (use -j 1 to include parsing)")
+    p.add_argument("--tracemalloc", action="store_true", help="trace allocations and print the top allocation sites")
+    add_correlation_args(p)
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("correlate", help="rebuild the correlation link graph over the stored metadata")
+    add_correlation_args(p)
+    p.set_defaults(func=cmd_correlate)
+
+    p = sub.add_parser("timeline", help="rebuild the UTC event timeline and list events or anomaly findings")
+    p.add_argument("--from", dest="start", metavar="DATE", help="first event time (UTC, inclusive)")
+    p.add_argument("--to", dest="end", metavar="DATE", help="last event time (UTC, exclusive)")
+    p.add_argument("-a", "--anomalies", action="store_true", help="list anomaly findings instead of events")
+    p.add_argument("--rule", help="with --anomalies, only this rule")
+    p.add_argument("-n", "--limit", type=int, default=None, help="max rows to print")
+    p.add_argument("--no-build", action="store_true", help="list what is stored without rebuilding first")
+    p.set_defaults(func=cmd_timeline)
+
+    p = sub.add_parser("geo", help="GPS queries: files near a point, inside a box, or clustered at the same place")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--near", type=coords(2), metavar="LAT,LON", help="files within --radius of this point, nearest first")
+    mode.add_argument("--box", type=coords(4), metavar="S,W,N,E", help="files inside this bounding box")
+    p.add_argument("-r", "--radius", type=float, default=100.0, help="radius in metres for --near (default: %(default)s)")
+    p.add_argument("--precision", type=int, default=CLUSTER_PRECISION,
+                   help="geohash length that counts as the same place when clustering (default: %(default)s)")
+    p.add_argument("--min-size", type=int, default=2, help="smallest cluster to list (default: %(default)s)")
+    p.add_argument("-n", "--limit", type=int, default=None, help="max rows to print")
+    p.set_defaults(func=cmd_geo)
+
+    p = sub.add_parser("errors", help="list files whose analysis failed (parser exceptions, timeouts, memory caps, crashes)")
+    p.add_argument("-k", "--kind", choices=("exception", "timeout", "memory", "crash"), help="only this kind of failure")
+    p.add_argument("-n", "--limit", type=int, default=None, help="max rows to print")
+    p.set_defaults(func=cmd_errors)
+
+    p = sub.add_parser("search", help="query the evidence database (FTS over metadata, hashes, dates)")
+    p.add_argument("query", help='e.g. \'key:Model value:"iPhone*" after:2024-01-01\' or an MD5/SHA-256')
+    p.add_argument("-n", "--limit", type=int, default=100, help="max rows to print (default: %(default)s)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("hashset", help="build a .hset lookup file from NSRL/hashdeep CSV or md5sum-style lists")
+    p.add_argument("output", help=".hset file to write")
+    p.add_argument("sources", nargs="+", help="text hash lists to import")
+    p.add_argument("-a", "--algorithm", default="md5", choices=("md5", "sha1", "sha256"),
+                   help="digest column to import (default: %(default)s)")
+    p.set_defaults(func=cmd_hashset)
+
+    p = sub.add_parser("bench", help="benchmark every pipeline stage on a reproducible synthetic corpus")
+    p.add_argument("-o", "--output", default="bench_results.json", help="JSON results file (default: %(default)s)")
+    p.add_argument("--work", default="bench_work", help="scratch directory for the database and reports (default: %(default)s)")
+    p.add_argument("--corpus", help="corpus directory, generated if missing or built with other parameters (default: WORK/corpus)")
+    p.add_argument("--files", type=int, default=1000, help="top-level corpus files (default: %(default)s)")
+    p.add_argument("--seed", type=int, default=1, help="corpus RNG seed (default: %(default)s)")
+    p.add_argument("--payload-kb", type=int, default=64, help="mean filler bytes per file in KiB (default: %(default)s)")
+    p.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="ingest worker processes (default: %(default)s)")
+    p.add_argument("--stages", type=lambda s: s.split(","), default=None, metavar="S1,S2",
+                   help="stages to run, in order (default: all; ingest must run before the stages that read the database)")
+    p.add_argument("--no-sandbox", action="store_true",
+                   help="measure ingest in a plain process pool instead of the sandboxed workers analyze uses")
+    p.add_argument("--label", help="free-form tag stored with the results, e.g. a release name")
+    p.add_argument("--compare", metavar="BASELINE", help="earlier results JSON; exit 1 if a headline metric regressed")
+    p.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown for --compare (default: %(default)s)")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("export", help="stream the evidence database to a CSV, HTML or PDF report")
+    p.add_argument("output", help="report file to write")
+    p.add_argument("-f", "--format", choices=sorted(EXPORTERS), help="report format (default: from the file extension)")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "analyze" and not (args.paths or args.file_list):
+        parser.error("analyze: give at least one path or --file-list")
+    setup_logging(args.log_dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
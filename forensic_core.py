@@ -0,0 +1,305 @@
+import os
+import mmap
+import time
+import hashlib
+import logging
+import functools
+import collections
+
+from forensic_extractors import extract_metadata, has_extractor, signature_matches, sniff, HEADER_SIZE, OUT_OF_MEMORY
+from forensic_archives import archive_kind, expand_archive
+from forensic_scan import scan, NO_FILTER
+from forensic_hashsets import KNOWN_GOOD, KNOWN_BAD
+from forensic_timeline import created_after_modified
+from forensic_metrics import REGISTRY
+
+LOG_DIR = "logs"
+LOG_FORMAT = '%(asctime)s | %(levelname)s | %(message)s'
+
+logger = logging.getLogger("forensic")
+
+
+# --- LOGGING ---
+def setup_logging(log_dir=LOG_DIR, level=logging.INFO):
+    if not os.path.exists(log_dir): os.makedirs(log_dir)
+    logging.basicConfig(filename=os.path.join(log_dir, 'forensic_ops.log'), level=level, format=LOG_FORMAT)
+
+
+# --- INTEGRITY CHECKS ---
+def validate_signature(file_path, header=None):
+    try:
+        if header is None:
+            with open(file_path, 'rb') as f: header = f.read(HEADER_SIZE)
+        return signature_matches(file_path, header)
+    except OSError: return False
+
+
+# --- HASHING ---
+DEFAULT_DIGESTS = ('md5', 'sha256')
+OPTIONAL_DIGESTS = ('sha1', 'blake2b')
+READ_BUFFER = 1 << 20           # 1 MiB readinto buffer for ordinary files
+MMAP_THRESHOLD = 64 << 20       # files at least this big are hashed through mmap
+MMAP_CHUNK = 8 << 20
+KEEP_IN_MEMORY = 8 << 20        # files up to this size are handed to the parsers from RAM
+
+
+def hash_file(path, algorithms=DEFAULT_DIGESTS, keep_limit=KEEP_IN_MEMORY, keep_if=None):
+    """Computes every digest in `algorithms` from a single read of the file.
+
+    Returns (digests, header, data): hex digests by algorithm name, the first
+    HEADER_SIZE bytes for signature checks, and the full content when the file is
+    no larger than keep_limit (None otherwise), so parsers need not re-read it.
+    keep_if(header), checked after the first read, can veto keeping the content.
+    """
+    hashers = [(name, hashlib.new(name)) for name in algorithms]
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                for pos in range(0, size, MMAP_CHUNK):
+                    with view[pos:pos + MMAP_CHUNK] as chunk:
+                        for _, h in hashers: h.update(chunk)
+                header = mm[:HEADER_SIZE]
+            return {name: h.hexdigest() for name, h in hashers}, header, None
+        keep = bytearray() if size <= keep_limit else None
+        buf = bytearray(READ_BUFFER)
+        mv = memoryview(buf)
+        header = b""
+        while True:
+            n = f.readinto(buf)
+            if not n: break
+            chunk = mv[:n]
+            if len(header) < HEADER_SIZE:
+                header += bytes(chunk[:HEADER_SIZE - len(header)])
+                if keep is not None and keep_if is not None and not keep_if(header): keep = None
+            for _, h in hashers: h.update(chunk)
+            if keep is not None: keep += chunk
+    data = bytes(keep) if keep is not None else None
+    return {name: h.hexdigest() for name, h in hashers}, header, data
+
+
+def get_hashes(file_path):
+    try:
+        digests, _, _ = hash_file(file_path, DEFAULT_DIGESTS, keep_limit=0)
+        return digests['md5'], digests['sha256']
+    except OSError: return "ERROR", "ERROR"
+
+
+# --- FILE ENUMERATION ---
+def iter_files(paths, flt=NO_FILTER, workers=1):
+    """Expands directories recursively and yields every file path once (see forensic_scan.scan)."""
+    return scan(paths, flt, workers)
+
+
+# --- PER-FILE ANALYSIS ---
+CACHED = "cached"   # job marker: the stored result is still valid, no work needed
+
+
+def error_info(stage, kind, message, extractor=None, seconds=None):
+    """The structured "error" entry of a result, stored as an `errors` row."""
+    return {"stage": stage, "kind": kind, "message": str(message)[:1000], "extractor": extractor,
+            "seconds": None if seconds is None else round(seconds, 3)}
+
+
+def parse_error(message, extractor=None, seconds=None):
+    return error_info("parse", "memory" if message == OUT_OF_MEMORY else "exception", message, extractor, seconds)
+
+
+def file_identity(path):
+    """(size, mtime_ns, inode) used by the incremental cache to spot changed files."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def apply_anomaly_rules(result):
+    meta = result["meta"]
+    if result["status"] == KNOWN_BAD: return result
+    if created_after_modified(meta): result["status"] = "FLAGGED"
+    return result
+
+
+def analyze_file(path, expected=None, algorithms=DEFAULT_DIGESTS, archives=None, known=None):
+    """Hashes, checks and parses one file.
+
+    `expected` drives the incremental cache: CACHED skips all work, and a dict of
+    stored digests re-hashes the file and only re-parses it if a digest differs.
+    Skipped files come back as {"path": ..., "cached": True}.
+    With `archives` (an ArchiveLimits), zip/tar/gzip/bzip2/xz members are expanded
+    in memory and returned under "children" with their virtual paths. "children"
+    is always present (empty when nothing was expanded, e.g. for a known-good
+    archive) so storing the result replaces any members stored for an earlier version.
+    With `known` (a KnownFiles), files on a known-good list are stored unparsed
+    with status KNOWN and files on a known-bad list are flagged KNOWN_BAD.
+    The result's "timings" hold the seconds spent hashing, parsing and expanding
+    archives (see forensic_metrics.Metrics.record_result).
+    """
+    if expected == CACHED: return {"path": path, "cached": True}
+    started = time.perf_counter()
+    try:
+        st = os.stat(path)
+        identity, times = (st.st_size, st.st_mtime_ns, st.st_ino), (st.st_atime_ns, st.st_ctime_ns)
+        keep_if = lambda h: has_extractor(path, h) or (archives is not None and archive_kind(h) is not None)
+        digests, header, data = hash_file(path, algorithms, keep_if=keep_if)
+        status = "SECURE" if validate_signature(path, header) else "SPOOFED?"
+    except OSError:
+        identity, times, digests, header, data, status = (None, None, None), (None, None), {}, None, None, "SPOOFED?"
+    if expected and all(digests.get(k) == v for k, v in expected.items()):
+        return {"path": path, "cached": True, "verified": True}
+    hashed = time.perf_counter()
+    verdict, set_name = known.lookup(digests) if known is not None else (None, None)
+    ex = sniff(header) if header else None
+    meta = extract_metadata(path, data, header) if verdict != KNOWN_GOOD else {}
+    timings = {"hash": hashed - started, "parse": time.perf_counter() - hashed,
+               "extractor": ex.name if ex and verdict != KNOWN_GOOD else None, "bytes": identity[0]}
+    if set_name: meta['Hash Set'] = set_name
+    if expected: meta['Cache Warning'] = "content changed without a size/mtime/inode change"
+    for name in algorithms:
+        if name not in DEFAULT_DIGESTS and name in digests: meta[name.upper()] = digests[name]
+    result = apply_anomaly_rules({
+        "path": path,
+        "filename": os.path.basename(path),
+        "file_type": os.path.splitext(path)[1].lower(),
+        "md5": digests.get('md5', "ERROR"),
+        "sha256": digests.get('sha256', "ERROR"),
+        "status": verdict or status,
+        "meta": meta,
+        "size": identity[0],
+        "mtime_ns": identity[1],
+        "inode": identity[2],
+        "atime_ns": times[0],
+        "ctime_ns": times[1],
+        "timings": timings,
+        "children": [],
+    })
+    if 'Error' in meta: result["error"] = parse_error(meta['Error'], timings["extractor"], timings["parse"])
+    if archives is not None and header and archive_kind(header) and verdict != KNOWN_GOOD:
+        expanding = time.perf_counter()
+        children, warning = expand_archive(path, header, data, algorithms, archives, known)
+        result["children"] = [apply_anomaly_rules(c) for c in children]
+        for c in result["children"]:
+            if 'Error' in c["meta"]: c["error"] = parse_error(c["meta"]['Error'])
+        meta['Archive Members'] = len(children)
+        if warning: meta['Archive Warning'] = warning
+        timings["archive"] = time.perf_counter() - expanding
+    return result
+
+
+def analyze_batch(jobs, **options):
+    return [analyze_file(path, expected, **options) for path, expected in jobs]
+
+
+# --- PARALLEL EXECUTION ---
+def iter_results(jobs, workers=1, queue_size=None, chunksize=8, sandbox=None, **options):
+    """Yields analyze_file results for (path, expected) jobs in input order.
+
+    With workers > 1 the jobs are fanned out in chunks to a process pool. At most
+    queue_size chunks are in flight, so memory stays bounded however long `jobs` is.
+    With `sandbox` (a SandboxLimits) each file instead runs alone in an isolated,
+    memory-capped worker (even with workers=1) that is killed and replaced if it
+    overruns the per-file timeout (see forensic_sandbox).
+    CACHED jobs never leave this process. `options` are passed to analyze_file.
+    """
+    if sandbox is not None:
+        from forensic_sandbox import run_sandboxed
+        yield from run_sandboxed(jobs, workers, queue_size or max(1, workers) * 4, sandbox, options)
+        return
+    if workers <= 1:
+        for path, expected in jobs: yield analyze_file(path, expected, **options)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    queue_size = queue_size or workers * 4
+    batch = functools.partial(analyze_batch, **options)
+    pending = collections.deque()
+    chunk = []
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def drain(limit):
+        REGISTRY.gauge("queue_depth", len(pending))
+        while len(pending) > limit:
+            head = pending.popleft()
+            yield from head if isinstance(head, list) else head.result()
+
+    try:
+        for path, expected in jobs:
+            if expected == CACHED:
+                if chunk: pending.append(pool.submit(batch, chunk)); chunk = []
+                pending.append([{"path": path, "cached": True}])
+            else:
+                chunk.append((path, expected))
+                if len(chunk) >= chunksize: pending.append(pool.submit(batch, chunk)); chunk = []
+            yield from drain(queue_size - 1)
+        if chunk: pending.append(pool.submit(batch, chunk))
+        yield from drain(0)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+# --- ENGINE ---
+class ForensicEngine:
+    """Runs the analysis pipeline into a ForensicStore without any UI dependency.
+
+    Files whose (size, mtime, inode) match the store's file_state are not re-read;
+    their stored rows are reused. With paranoid=True they are re-hashed and only
+    re-parsed if the content changed. With `known` hash sets, an unchanged file is
+    still re-analyzed when the sets now classify it (or one of its stored archive
+    members) differently from the stored status, or need a digest never computed for it.
+    """
+
+    def __init__(self, store, workers=1, queue_size=None, algorithms=DEFAULT_DIGESTS, paranoid=False, archives=None,
+                 known=None, metrics=REGISTRY, sandbox=None):
+        self.store = store
+        self.metrics = metrics
+        self.sandbox = sandbox
+        self.workers = workers
+        self.queue_size = queue_size
+        self.paranoid = paranoid
+        if known is not None: algorithms = tuple(algorithms) + tuple(sorted(known.algorithms() - set(algorithms)))
+        self.options = {"algorithms": tuple(algorithms), "archives": archives, "known": known}
+        self.stats = {"analyzed": 0, "cached": 0, "verified": 0, "members": 0, "known": 0, "known_bad": 0, "errors": 0}
+
+    def plan(self, paths):
+        for path in paths:
+            state = self.store.file_state(path)
+            try:
+                unchanged = state is not None and state[:3] == file_identity(path)
+            except OSError:
+                unchanged = False
+            if not unchanged or self.reclassified(path): yield path, None
+            elif self.paranoid: yield path, {"md5": state[3], "sha256": state[4]}
+            else: yield path, CACHED
+
+    def reclassified(self, path):
+        """True when the hash sets disagree with the stored KNOWN/KNOWN_BAD status of path or its members."""
+        known = self.options["known"]
+        if known is None: return False
+        algorithms = known.algorithms()
+        for status, digests in self.store.stored_digests(path, algorithms - {"md5", "sha256"}):
+            if digests["md5"] in (None, "ERROR"): continue                       # never hashed (e.g. encrypted member)
+            if any(not digests.get(name) for name in algorithms): return True      # a set needs a digest never computed
+            verdict, _ = known.lookup(digests)
+            if verdict != (status if status in (KNOWN_GOOD, KNOWN_BAD) else None): return True
+        return False
+
+    def process(self, paths):
+        """Analyzes each path, persists it and yields the result dict; commits when exhausted."""
+        for result in iter_results(self.plan(paths), self.workers, self.queue_size, sandbox=self.sandbox, **self.options):
+            self.metrics.record_result(result)
+            if result.get("cached"):
+                self.stats["verified" if result.get("verified") else "cached"] += 1
+                result = self.store.load_result(result["path"])
+            else:
+                self.stats["analyzed"] += 1
+                self.stats["members"] += len(result.get("children", ()))
+                for r in [result] + result.get("children", []):
+                    if "error" in r: self.stats["errors"] += 1
+                    if r["status"] == KNOWN_GOOD: self.stats["known"] += 1
+                    elif r["status"] == KNOWN_BAD: self.stats["known_bad"] += 1
+                if 'Cache Warning' in result["meta"]: logger.warning(f"HASH MISMATCH ON UNCHANGED FILE: {result['path']}")
+                self.store.add_result(result)
+            yield result
+        self.store.commit()
+
+    def run(self, paths):
+        count = 0
+        for _ in self.process(paths): count += 1
+        return count
@@ -0,0 +1,181 @@
+import re
+import difflib
+import datetime
+import unicodedata
+from collections import defaultdict
+
+from forensic_timeline import parse_epoch
+from forensic_geo import CLUSTER_PRECISION
+
+# Exact-match rules: rule name -> metadata keys that must all be present and equal.
+DEFAULT_RULES = {
+    "camera": ("Image Make", "Image Model"),
+    "camera_serial": ("EXIF BodySerialNumber",),
+    "software": ("Image Software",),
+    "producer": ("Producer",),
+    "creator_tool": ("Creator",),        # PDF /Creator names the authoring application, not a person
+}
+AUTHOR_KEYS = ("Author", "Image Artist", "LastModifiedBy", "PNG Author", "Audio artist")
+TIME_KEYS = ("EXIF DateTimeOriginal", "Image DateTime", "CreationDate", "Created")
+SPECIAL_RULES = ("md5", "author", "time", "gps")
+
+TIME_WINDOW = 60            # seconds per timestamp bucket
+FUZZY_THRESHOLD = 0.88      # difflib ratio for two author names to be linked
+MAX_BLOCK = 500             # blocks larger than this are too generic to compare pairwise
+
+
+# --- NORMALIZATION ---
+def time_bucket(value, window):
+    epoch = parse_epoch(value)
+    if epoch is None: return None
+    start = epoch // window * window
+    return datetime.datetime.fromtimestamp(start, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def normalize_name(value):
+    """Case/accent/punctuation-insensitive form with sorted tokens ('Smith, Alice' == 'alice smith')."""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return " ".join(sorted(re.findall(r"\w+", text)))
+
+
+def cluster_names(names, threshold=FUZZY_THRESHOLD):
+    """Union-find clustering of normalized names, comparing only names that share a token prefix."""
+    parent = {n: n for n in names}
+
+    def find(n):
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    blocks = defaultdict(list)
+    for n in names:
+        for token in set(n.split()):
+            if len(token) >= 3: blocks[token[:3]].append(n)
+    for members in blocks.values():
+        if len(members) > MAX_BLOCK: continue
+        for i, a in enumerate(members):
+            matcher = difflib.SequenceMatcher(None, a)
+            for b in members[i + 1:]:
+                if find(a) == find(b): continue
+                matcher.set_seq2(b)
+                if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                    ra, rb = find(a), find(b)
+                    parent[max(ra, rb)] = min(ra, rb)
+    return {n: find(n) for n in names}
+
+
+# --- CORRELATION ENGINE ---
+class Correlator:
+    """Groups stored files by shared metadata and persists the groups as a link graph.
+
+    Each rule fills temp.sig with (file_id, signature) pairs and every signature
+    shared by more than one file becomes a correlation_groups row with one
+    correlation_links row per member. All grouping is done by SQLite over indexes,
+    so a run is a few sorted scans rather than pairwise comparisons.
+    """
+
+    def __init__(self, store, rules=None, window=TIME_WINDOW, threshold=FUZZY_THRESHOLD):
+        self.conn = store.conn
+        self.rules = dict(DEFAULT_RULES if rules is None else rules)
+        self.window = window
+        self.threshold = threshold
+        self.conn.create_function("time_bucket", 2, time_bucket, deterministic=True)
+
+    def rule_names(self):
+        return list(self.rules) + list(SPECIAL_RULES)
+
+    def run(self, only=None):
+        """Rebuilds the link graph for the selected rules; returns {rule: group_count}."""
+        selected = [r for r in self.rule_names() if only is None or r in only]
+        counts = {}
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS sig (file_id INTEGER, signature TEXT)")
+            for rule in selected:
+                conn.execute("DELETE FROM correlation_groups WHERE rule = ?", (rule,))
+                conn.execute("DELETE FROM temp.sig")
+                if rule in SPECIAL_RULES: getattr(self, f"collect_{rule}")()
+                else: self.collect_keys(self.rules[rule])
+                counts[rule] = self.persist(rule)
+            conn.execute("DROP TABLE temp.sig")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return counts
+
+    def collect_keys(self, keys):
+        picks = ", ".join(f"max(CASE WHEN key = ? THEN value END) AS v{i}" for i in range(len(keys)))
+        signature = " || ' | ' || ".join(f"v{i}" for i in range(len(keys)))
+        present = " AND ".join(f"v{i} IS NOT NULL" for i in range(len(keys)))
+        marks = ", ".join("?" * len(keys))
+        self.conn.execute(f'''INSERT INTO temp.sig (file_id, signature)
+                              SELECT file_id, {signature} FROM
+                                  (SELECT file_id, {picks} FROM metadata WHERE key IN ({marks}) GROUP BY file_id)
+                              WHERE {present}''', (*keys, *keys))
+
+    def collect_md5(self):
+        self.conn.execute('''INSERT INTO temp.sig (file_id, signature)
+                             SELECT id, md5_hash FROM files WHERE md5_hash IS NOT NULL AND md5_hash != 'ERROR' ''')
+
+    def collect_time(self):
+        marks = ", ".join("?" * len(TIME_KEYS))
+        self.conn.execute(f'''INSERT INTO temp.sig (file_id, signature)
+                              SELECT DISTINCT file_id, time_bucket(value, ?) AS b FROM metadata
+                              WHERE key IN ({marks}) AND b IS NOT NULL''', (self.window, *TIME_KEYS))
+
+    def collect_gps(self):
+        """Same place = same geohash cell of CLUSTER_PRECISION characters (~150 m)."""
+        self.conn.execute('''INSERT INTO temp.sig (file_id, signature)
+                             SELECT file_id, substr(geohash, 1, ?) FROM locations''', (CLUSTER_PRECISION,))
+
+    def collect_author(self):
+        marks = ", ".join("?" * len(AUTHOR_KEYS))
+        raw = [v for (v,) in self.conn.execute(f"SELECT DISTINCT value FROM metadata WHERE key IN ({marks})", AUTHOR_KEYS)]
+        normalized = {v: normalize_name(v) for v in raw}
+        clusters = cluster_names({n for n in normalized.values() if n}, self.threshold)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS author_map (value TEXT PRIMARY KEY, label TEXT)")
+        self.conn.execute("DELETE FROM temp.author_map")
+        self.conn.executemany("INSERT INTO temp.author_map VALUES (?, ?)",
+                              ((v, clusters[n]) for v, n in normalized.items() if n))
+        self.conn.execute(f'''INSERT INTO temp.sig (file_id, signature)
+                              SELECT DISTINCT m.file_id, a.label FROM metadata m JOIN temp.author_map a ON a.value = m.value
+                              WHERE m.key IN ({marks})''', AUTHOR_KEYS)
+        self.conn.execute("DROP TABLE temp.author_map")
+
+    def persist(self, rule):
+        conn = self.conn
+        conn.execute("CREATE INDEX IF NOT EXISTS temp.idx_sig ON sig (signature)")
+        conn.execute('''INSERT INTO correlation_groups (rule, signature, size)
+                        SELECT ?, signature, count(DISTINCT file_id) FROM temp.sig
+                        GROUP BY signature HAVING count(DISTINCT file_id) > 1''', (rule,))
+        conn.execute('''INSERT INTO correlation_links (group_id, file_id)
+                        SELECT DISTINCT g.id, s.file_id FROM temp.sig s
+                        JOIN correlation_groups g ON g.rule = ? AND g.signature = s.signature''', (rule,))
+        return conn.execute("SELECT count(*) FROM correlation_groups WHERE rule = ?", (rule,)).fetchone()[0]
+
+    # --- QUERIES ---
+    def groups(self, rule=None, limit=None):
+        """(group_id, rule, signature, size) ordered by size, largest first."""
+        sql = "SELECT id, rule, signature, size FROM correlation_groups"
+        params = []
+        if rule: sql += " WHERE rule = ?"; params.append(rule)
+        sql += " ORDER BY size DESC, id"
+        if limit: sql += " LIMIT ?"; params.append(limit)
+        return self.conn.execute(sql, params)
+
+    def members(self, group_id):
+        return self.conn.execute('''SELECT f.id, f.path FROM correlation_links l JOIN files f ON f.id = l.file_id
+                                    WHERE l.group_id = ? ORDER BY f.id''', (group_id,))
+
+    def related(self, file_id):
+        """Files sharing at least one group with file_id: (file_id, path, rule, signature)."""
+        return self.conn.execute('''SELECT f.id, f.path, g.rule, g.signature
+                                    FROM correlation_links a
+                                    JOIN correlation_links b ON b.group_id = a.group_id AND b.file_id != a.file_id
+                                    JOIN correlation_groups g ON g.id = a.group_id
+                                    JOIN files f ON f.id = b.file_id
+                                    WHERE a.file_id = ? ORDER BY g.rule, f.id''', (file_id,))
@@ -0,0 +1,367 @@
+import os
+import sqlite3
+import time
+import datetime
+
+from forensic_metrics import REGISTRY
+from forensic_geo import GPS_KEYS, POSITION_KEY, gps_decimal, parse_position, geohash
+
+DB_PATH = "forensic_data.db"
+SCHEMA_VERSION = 7
+BATCH_FILES = 500
+MAX_ID = (1 << 63) - 1             # largest SQLite integer key: page(before=MAX_ID) is the last page
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",        # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",      # 256 MiB memory-mapped reads
+    "PRAGMA foreign_keys=ON",
+)
+
+SCHEMA = (
+    # mtime_local = 1: mtime_ns is wall-clock time of an unknown zone (zip members' DOS entry times).
+    '''CREATE TABLE IF NOT EXISTS files
+       (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, filename TEXT, file_type TEXT,
+        size INTEGER, mtime_ns INTEGER, inode INTEGER, atime_ns INTEGER, ctime_ns INTEGER,
+        md5_hash TEXT, sha256_hash TEXT, anomaly_flag TEXT, analyzed_at TEXT,
+        mtime_local INTEGER NOT NULL DEFAULT 0)''',
+    '''CREATE TABLE IF NOT EXISTS metadata
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE, key TEXT NOT NULL, value TEXT)''',
+    "CREATE INDEX IF NOT EXISTS idx_files_md5 ON files (md5_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_file ON metadata (file_id)",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_key_value ON metadata (key, value)",
+    "CREATE INDEX IF NOT EXISTS idx_metadata_value ON metadata (value)",
+    "CREATE INDEX IF NOT EXISTS idx_files_mtime ON files (mtime_ns)",
+    # Full-text index over metadata keys/values; external content keyed on metadata.id, which
+    # AUTOINCREMENT never reuses, so rows above the pre-batch high-water mark are exactly the new ones.
+    # ForensicStore keeps it in sync batch-wise (per-row triggers made ingest ~8x slower).
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS metadata_fts
+       USING fts5 (key, value, content='metadata', content_rowid='id')''',
+    '''CREATE TABLE IF NOT EXISTS correlation_groups
+       (id INTEGER PRIMARY KEY, rule TEXT NOT NULL, signature TEXT, size INTEGER)''',
+    '''CREATE TABLE IF NOT EXISTS correlation_links
+       (group_id INTEGER NOT NULL REFERENCES correlation_groups (id) ON DELETE CASCADE,
+        file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE)''',
+    "CREATE INDEX IF NOT EXISTS idx_groups_rule ON correlation_groups (rule, signature)",
+    "CREATE INDEX IF NOT EXISTS idx_links_group ON correlation_links (group_id)",
+    "CREATE INDEX IF NOT EXISTS idx_links_file ON correlation_links (file_id)",
+    '''CREATE TABLE IF NOT EXISTS events
+       (file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+        source TEXT, kind TEXT NOT NULL, ts INTEGER NOT NULL, local INTEGER NOT NULL DEFAULT 0)''',
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events (kind, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_file ON events (file_id, kind)",
+    '''CREATE TABLE IF NOT EXISTS anomalies
+       (file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE, rule TEXT NOT NULL, detail TEXT)''',
+    "CREATE INDEX IF NOT EXISTS idx_anomalies_rule ON anomalies (rule)",
+    "CREATE INDEX IF NOT EXISTS idx_anomalies_file ON anomalies (file_id)",
+    # Decimal GPS position per file; geohash prefixes serve radius/"same place" queries, (lat, lon) boxes.
+    '''CREATE TABLE IF NOT EXISTS locations
+       (file_id INTEGER PRIMARY KEY REFERENCES files (id) ON DELETE CASCADE,
+        lat REAL NOT NULL, lon REAL NOT NULL, geohash TEXT NOT NULL)''',
+    "CREATE INDEX IF NOT EXISTS idx_locations_geohash ON locations (geohash)",
+    "CREATE INDEX IF NOT EXISTS idx_locations_lat_lon ON locations (lat, lon)",
+    # Why a file could not be (fully) analyzed: parser exception, sandbox timeout/memory cap/crash.
+    '''CREATE TABLE IF NOT EXISTS errors
+       (file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE, stage TEXT NOT NULL, kind TEXT NOT NULL,
+        message TEXT, extractor TEXT, seconds REAL, at TEXT)''',
+    "CREATE INDEX IF NOT EXISTS idx_errors_kind ON errors (kind)",
+    "CREATE INDEX IF NOT EXISTS idx_errors_file ON errors (file_id)",
+    '''CREATE VIEW IF NOT EXISTS report_rows AS
+       SELECT f.filename, f.file_type, m.key, m.value, f.md5_hash, f.anomaly_flag, f.id AS file_id
+       FROM metadata m JOIN files f ON f.id = m.file_id''',
+)
+
+
+def keyset_page(conn, sql, params, key, limit, after=0, before=None):
+    """Runs `sql` (ending in a WHERE condition) as one page ordered by the integer column `key`.
+
+    The first `limit` rows with key > `after`, or with `before`, the last `limit`
+    rows with key < `before` (still in ascending order). Unlike LIMIT/OFFSET, a
+    deep page costs the same as the first one.
+    """
+    if before is None:
+        return conn.execute(f"{sql} AND {key} > ? ORDER BY {key} LIMIT ?", [*params, after, limit]).fetchall()
+    return conn.execute(f"{sql} AND {key} < ? ORDER BY {key} DESC LIMIT ?", [*params, before, limit]).fetchall()[::-1]
+
+
+# --- SCHEMA MIGRATION ---
+def migrate_legacy(conn):
+    """Moves the flat pre-v1 `metadata` and `file_state` tables into files + metadata."""
+    conn.execute("ALTER TABLE metadata RENAME TO metadata_legacy")
+    for stmt in SCHEMA: conn.execute(stmt)
+    legacy_cols = [row[1] for row in conn.execute("PRAGMA table_info(metadata_legacy)")]
+    ident = "COALESCE(l.path, l.filename)" if 'path' in legacy_cols else "l.filename"
+    sha = "l.sha256_hash" if 'sha256_hash' in legacy_cols else "NULL"
+    conn.execute(f'''INSERT OR IGNORE INTO files (path, filename, file_type, md5_hash, sha256_hash, anomaly_flag)
+                     SELECT {ident}, l.filename, l.file_type, l.md5_hash, {sha}, l.anomaly_flag
+                     FROM metadata_legacy l GROUP BY {ident}''')
+    conn.execute(f'''INSERT INTO metadata (file_id, key, value)
+                     SELECT f.id, l.key, l.value FROM metadata_legacy l JOIN files f ON f.path = {ident}''')
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'file_state'").fetchone():
+        conn.execute("INSERT OR IGNORE INTO files (path) SELECT path FROM file_state")
+        conn.execute('''UPDATE files SET
+                            size = (SELECT s.size FROM file_state s WHERE s.path = files.path),
+                            mtime_ns = (SELECT s.mtime_ns FROM file_state s WHERE s.path = files.path),
+                            inode = (SELECT s.inode FROM file_state s WHERE s.path = files.path),
+                            md5_hash = (SELECT s.md5_hash FROM file_state s WHERE s.path = files.path),
+                            sha256_hash = (SELECT s.sha256_hash FROM file_state s WHERE s.path = files.path),
+                            anomaly_flag = (SELECT s.anomaly_flag FROM file_state s WHERE s.path = files.path),
+                            analyzed_at = (SELECT s.analyzed_at FROM file_state s WHERE s.path = files.path)
+                        WHERE path IN (SELECT path FROM file_state)''')
+        for file_id, path in conn.execute("SELECT id, path FROM files WHERE filename IS NULL").fetchall():
+            conn.execute("UPDATE files SET filename = ?, file_type = ? WHERE id = ?",
+                         (os.path.basename(path), os.path.splitext(path)[1].lower(), file_id))
+        conn.execute("DROP TABLE file_state")
+    conn.execute("DROP TABLE metadata_legacy")
+
+
+def rekey_metadata(conn):
+    """Gives pre-v6 `metadata` a stable AUTOINCREMENT id (plain rowids were reused after deletes,
+    so re-analyzed files' new rows could slip past the FTS sync)."""
+    conn.execute("DROP VIEW IF EXISTS report_rows")
+    conn.execute("DROP TABLE IF EXISTS metadata_fts")
+    conn.execute('''CREATE TABLE metadata_v6
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE, key TEXT NOT NULL, value TEXT)''')
+    conn.execute("INSERT INTO metadata_v6 (id, file_id, key, value) SELECT rowid, file_id, key, value FROM metadata ORDER BY rowid")
+    conn.execute("DROP TABLE metadata")
+    conn.execute("ALTER TABLE metadata_v6 RENAME TO metadata")
+
+
+def backfill_locations(conn):
+    """Fills `locations` from the raw EXIF GPS tags stored before positions were normalized."""
+    marks = ", ".join("?" * len(GPS_KEYS))
+    tags = {}
+    for file_id, key, value in conn.execute(f"SELECT file_id, key, value FROM metadata WHERE key IN ({marks})", GPS_KEYS):
+        tags.setdefault(file_id, {})[key] = value
+    rows = []
+    for file_id, meta in tags.items():
+        coords = gps_decimal(meta)
+        if coords: rows.append((file_id, *coords, geohash(*coords)))
+    conn.executemany("INSERT OR REPLACE INTO locations (file_id, lat, lon, geohash) VALUES (?, ?, ?, ?)", rows)
+
+
+def backfill_mtime_local(conn):
+    """Marks stored members of zip-family containers, whose DOS entry times are local wall-clock."""
+    zips = {path for path, in conn.execute('''SELECT path FROM files WHERE file_type IN ('.docx', '.xlsx', '.pptx')
+                                              OR id IN (SELECT file_id FROM metadata WHERE key = 'Zip Entries')''')}
+    members = conn.execute("SELECT id, path FROM files WHERE path GLOB '*!/*' AND mtime_ns IS NOT NULL").fetchall()
+    conn.executemany("UPDATE files SET mtime_local = 1 WHERE id = ?",
+                     ((file_id,) for file_id, path in members if path.rsplit("!/", 1)[0] in zips))
+
+
+# --- EVIDENCE STORE ---
+class ForensicStore:
+    """SQLite-backed evidence store shared by the GUI and the headless engine.
+
+    One `files` row per analyzed path (hashes, status and the size/mtime_ns/inode
+    used by the incremental cache) and one `metadata` row per extracted key/value.
+    Results are buffered and written batch_files at a time in one transaction.
+    """
+
+    def __init__(self, path=DB_PATH, batch_files=BATCH_FILES):
+        self.path = path
+        self.batch_files = batch_files
+        self.pending = []
+        self.on_flush = None            # optional callable run after each committed batch (e.g. to refresh a view)
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        for pragma in PRAGMAS: self.conn.execute(pragma)
+        self.conn.execute("BEGIN")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            cols = [row[1] for row in self.conn.execute("PRAGMA table_info(metadata)")]
+            if 'filename' in cols: migrate_legacy(self.conn)
+        if version < 6:
+            cols = [row[1] for row in self.conn.execute("PRAGMA table_info(metadata)")]
+            if cols and 'id' not in cols: rekey_metadata(self.conn)
+        for stmt in SCHEMA: self.conn.execute(stmt)
+        if version < 6: self.conn.execute("INSERT INTO metadata_fts (metadata_fts) VALUES ('rebuild')")
+        if version < 3:
+            cols = [row[1] for row in self.conn.execute("PRAGMA table_info(files)")]
+            for col in ("atime_ns", "ctime_ns"):
+                if col not in cols: self.conn.execute(f"ALTER TABLE files ADD COLUMN {col} INTEGER")
+        if version < 7:
+            if 'mtime_local' not in [row[1] for row in self.conn.execute("PRAGMA table_info(files)")]:
+                self.conn.execute("ALTER TABLE files ADD COLUMN mtime_local INTEGER NOT NULL DEFAULT 0")
+            backfill_mtime_local(self.conn)
+        if version < 4: backfill_locations(self.conn)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.execute("COMMIT")
+
+    # --- WRITES ---
+    def add_result(self, result):
+        """Queues a result (and its archive members); on flush it replaces any earlier rows for the same path.
+
+        A result with a "children" list (every top-level result) also drops the
+        members stored under it before, whether or not it was expanded again.
+        """
+        self.pending.append(result)
+        self.pending.extend(result.get("children", ()))
+        if len(self.pending) >= self.batch_files: self.flush()
+
+    def flush(self):
+        if not self.pending: return
+        started = time.perf_counter()
+        now = datetime.datetime.now().isoformat()
+        meta_rows, loc_rows, err_rows = [], [], []
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM metadata").fetchone()[0]
+            for r in self.pending:
+                if "children" in r: self.delete_members(cur, r["path"])
+                cur.execute('''INSERT INTO files (path, filename, file_type, size, mtime_ns, inode, atime_ns, ctime_ns,
+                                                  mtime_local, md5_hash, sha256_hash, anomaly_flag, analyzed_at)
+                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                               ON CONFLICT (path) DO UPDATE SET
+                                   filename = excluded.filename, file_type = excluded.file_type,
+                                   size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode,
+                                   atime_ns = excluded.atime_ns, ctime_ns = excluded.ctime_ns, mtime_local = excluded.mtime_local,
+                                   md5_hash = excluded.md5_hash, sha256_hash = excluded.sha256_hash,
+                                   anomaly_flag = excluded.anomaly_flag, analyzed_at = excluded.analyzed_at''',
+                            (r["path"], r["filename"], r["file_type"], r.get("size"), r.get("mtime_ns"), r.get("inode"),
+                             r.get("atime_ns"), r.get("ctime_ns"), int(bool(r.get("mtime_local"))),
+                             r["md5"], r["sha256"], r["status"], now))
+                file_id = cur.execute("SELECT id FROM files WHERE path = ?", (r["path"],)).fetchone()[0]
+                self.unindex(cur, "file_id = ?", (file_id,))
+                cur.execute("DELETE FROM metadata WHERE file_id = ?", (file_id,))
+                meta_rows.extend((file_id, k, str(v)) for k, v in r["meta"].items() if v)
+                cur.execute("DELETE FROM locations WHERE file_id = ?", (file_id,))
+                coords = parse_position(r["meta"].get(POSITION_KEY)) if POSITION_KEY in r["meta"] else None
+                if coords: loc_rows.append((file_id, *coords, geohash(*coords)))
+                cur.execute("DELETE FROM errors WHERE file_id = ?", (file_id,))
+                e = r.get("error")
+                if e: err_rows.append((file_id, e["stage"], e["kind"], e["message"], e.get("extractor"), e.get("seconds"), now))
+            cur.executemany("INSERT INTO metadata (file_id, key, value) VALUES (?, ?, ?)", meta_rows)
+            cur.executemany("INSERT INTO locations (file_id, lat, lon, geohash) VALUES (?, ?, ?, ?)", loc_rows)
+            cur.executemany('''INSERT INTO errors (file_id, stage, kind, message, extractor, seconds, at)
+                               VALUES (?, ?, ?, ?, ?, ?, ?)''', err_rows)
+            cur.execute('''INSERT INTO metadata_fts (rowid, key, value)
+                           SELECT id, key, value FROM metadata WHERE id > ?''', (last_id,))
+            cur.execute("COMMIT")
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        REGISTRY.observe("db_flush", time.perf_counter() - started)
+        REGISTRY.inc("db_files", len(self.pending))
+        REGISTRY.inc("db_rows", len(meta_rows))
+        self.pending = []
+        if self.on_flush: self.on_flush()
+
+    def delete_members(self, cur, path):
+        """Drops stored archive members of path (virtual paths 'path!/...')."""
+        lo, hi = path + "!/", path + "!0"
+        members = "file_id IN (SELECT id FROM files WHERE path >= ? AND path < ?)"
+        self.unindex(cur, members, (lo, hi))
+        cur.execute(f"DELETE FROM metadata WHERE {members}", (lo, hi))
+        cur.execute("DELETE FROM files WHERE path >= ? AND path < ?", (lo, hi))
+
+    def unindex(self, cur, where, params):
+        """Removes the metadata rows matching `where` from metadata_fts; call before deleting them."""
+        cur.execute(f'''INSERT INTO metadata_fts (metadata_fts, rowid, key, value)
+                        SELECT 'delete', id, key, value FROM metadata WHERE {where}''', params)
+
+    def clear(self):
+        self.pending = []
+        self.conn.execute("BEGIN")
+        self.conn.execute("INSERT INTO metadata_fts (metadata_fts) VALUES ('delete-all')")
+        self.conn.execute("DELETE FROM correlation_links")
+        self.conn.execute("DELETE FROM correlation_groups")
+        self.conn.execute("DELETE FROM anomalies")
+        self.conn.execute("DELETE FROM events")
+        self.conn.execute("DELETE FROM locations")
+        self.conn.execute("DELETE FROM errors")
+        self.conn.execute("DELETE FROM metadata")
+        self.conn.execute("DELETE FROM files")
+        self.conn.execute("COMMIT")
+
+    def rebuild_search(self):
+        """Re-indexes metadata_fts from scratch (e.g. after editing `metadata` outside ForensicStore)."""
+        self.flush()
+        self.conn.execute("INSERT INTO metadata_fts (metadata_fts) VALUES ('rebuild')")
+
+    def commit(self):
+        self.flush()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- READS ---
+    def file_state(self, path):
+        """(size, mtime_ns, inode, md5, sha256) recorded for path, or None."""
+        return self.conn.execute("SELECT size, mtime_ns, inode, md5_hash, sha256_hash FROM files WHERE path = ?",
+                                 (path,)).fetchone()
+
+    def stored_digests(self, path, extra=()):
+        """[(status, {algorithm: hexdigest})] for path and its stored archive members.
+
+        md5/sha256 come from `files`; `extra` algorithms from the metadata rows
+        analyze_file writes for optional digests (e.g. key 'SHA1'), when present.
+        """
+        rows = self.conn.execute('''SELECT id, anomaly_flag, md5_hash, sha256_hash FROM files
+                                    WHERE path = ? OR (path >= ? AND path < ?)''', (path, path + "!/", path + "!0")).fetchall()
+        keys = {name.upper(): name for name in extra}
+        marks = ", ".join("?" * len(keys))
+        out = []
+        for file_id, status, md5, sha256 in rows:
+            digests = {"md5": md5, "sha256": sha256}
+            if keys:
+                for key, value in self.conn.execute(f"SELECT key, value FROM metadata WHERE file_id = ? AND key IN ({marks})",
+                                                    (file_id, *keys)):
+                    digests[keys[key]] = value
+            out.append((status, digests))
+        return out
+
+    def load_result(self, path):
+        """Rebuilds the engine's result dict for path from the stored rows."""
+        file_id, size, mtime_ns, inode, md5, sha256, status = self.conn.execute(
+            "SELECT id, size, mtime_ns, inode, md5_hash, sha256_hash, anomaly_flag FROM files WHERE path = ?",
+            (path,)).fetchone()
+        meta = dict(self.conn.execute("SELECT key, value FROM metadata WHERE file_id = ?", (file_id,)))
+        return {
+            "path": path,
+            "filename": os.path.basename(path),
+            "file_type": os.path.splitext(path)[1].lower(),
+            "md5": md5,
+            "sha256": sha256,
+            "status": status,
+            "meta": meta,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "inode": inode,
+            "cached": True,
+        }
+
+    def rows(self):
+        """Report rows in the legacy six-column layout: filename, type, key, value, md5, status."""
+        return self.conn.execute('''SELECT filename, file_type, key, value, md5_hash, anomaly_flag
+                                    FROM report_rows ORDER BY file_id''')
+
+    def page(self, limit, after=0, before=None):
+        """One page of report rows (filename, key, value, md5, status, metadata id) in id order (see keyset_page)."""
+        return keyset_page(self.conn, '''SELECT f.filename, m.key, m.value, f.md5_hash, f.anomaly_flag, m.id
+                                         FROM metadata m JOIN files f ON f.id = m.file_id WHERE 1''',
+                           [], "m.id", limit, after, before)
+
+    def row_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def errors(self, kind=None, limit=None):
+        """(path, stage, kind, message, extractor, seconds, at) per failed file, newest first."""
+        sql = '''SELECT f.path, e.stage, e.kind, e.message, e.extractor, e.seconds, e.at
+                 FROM errors e JOIN files f ON f.id = e.file_id'''
+        params = []
+        if kind:
+            sql += " WHERE e.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY e.at DESC, f.path"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
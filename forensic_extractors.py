@@ -0,0 +1,312 @@
+"""Extractor registry: magic-byte dispatch to per-format metadata parsers.
+
+Each Extractor names the header signatures it recognises and its parser.
+Third-party parser libraries are imported inside the parsers, so a run only
+pays for the formats it meets.
+"""
+import io
+import os
+import zlib
+import struct
+import datetime
+import zipfile
+import xml.etree.ElementTree as ET
+
+from forensic_geo import POSITION_KEY, gps_decimal, format_position
+
+HEADER_SIZE = 512               # enough for every signature below (tar's "ustar" sits at 257)
+SKIP_EXIF_TAGS = ('JPEGThumbnail', 'Filename', 'EXIF MakerNote')
+DOCPROPS_LIMIT = 1 << 20        # docProps parts bigger than this are not trusted
+PNG_TEXT_LIMIT = 1 << 20        # cap on decompressed zTXt/iTXt payloads
+ZIP_LISTING = 50                # member names recorded for generic archives
+OUT_OF_MEMORY = "out of memory"  # meta['Error'] when a parser hits the (sandbox) memory cap
+
+# OOXML docProps element (local name) -> metadata key
+CORE_PROPS = {
+    'creator': 'Author',
+    'lastModifiedBy': 'LastModifiedBy',
+    'created': 'Created',
+    'modified': 'Modified',
+    'lastPrinted': 'LastPrinted',
+    'title': 'Title',
+    'subject': 'Subject',
+    'keywords': 'Keywords',
+    'description': 'Comments',
+    'category': 'Category',
+    'revision': 'Revision',
+}
+APP_PROPS = {
+    'Application': 'Application',
+    'AppVersion': 'AppVersion',
+    'Company': 'Company',
+    'Manager': 'Manager',
+    'Template': 'Template',
+    'TotalTime': 'TotalEditingTime',
+    'Pages': 'Pages',
+    'Words': 'Words',
+    'Slides': 'Slides',
+}
+OOXML_PARTS = (('word/document.xml', 'DOCX'), ('xl/workbook.xml', 'XLSX'), ('ppt/presentation.xml', 'PPTX'))
+
+
+# --- REGISTRY ---
+class Extractor:
+    def __init__(self, name, func, magic=(), exts=(), probe=None):
+        self.name = name
+        self.func = func
+        self.magic = magic          # (offset, signature) pairs
+        self.exts = exts
+        self.probe = probe          # optional header -> bool for signatures magic can't express
+
+    def matches(self, header, probe=True):
+        if any(header.startswith(sig, off) for off, sig in self.magic): return True
+        return bool(probe and self.probe and self.probe(header))
+
+
+REGISTRY = []
+BY_EXT = {}
+
+
+def register(name, func, magic=(), exts=(), probe=None):
+    """Adds an extractor. `exts` are the extensions that claim this format (for spoof checks)."""
+    ex = Extractor(name, func, magic, exts, probe)
+    REGISTRY.append(ex)
+    for ext in exts: BY_EXT[ext] = ex
+    return ex
+
+
+def sniff(header):
+    """The first registered Extractor whose signature matches the header, or None.
+
+    Fixed-offset magic wins over probes, so a zip or tar whose first member is a
+    PDF is not claimed by the PDF probe's search for '%PDF-' anywhere in the header.
+    """
+    for ex in REGISTRY:
+        if ex.matches(header, probe=False): return ex
+    for ex in REGISTRY:
+        if ex.probe and ex.probe(header): return ex
+    return None
+
+
+def signature_matches(path, header):
+    """False when the extension claims a registered format that the header contradicts."""
+    claimed = BY_EXT.get(os.path.splitext(path)[1].lower())
+    return claimed is None or claimed.matches(header)
+
+
+# --- FAST PATHS (read only the metadata parts of a file) ---
+def read_docprops(zf):
+    """Reads docProps/core.xml and docProps/app.xml from an OOXML zip, nothing else.
+
+    Returns None when the package has no docProps parts so the caller can fall back.
+    """
+    meta = {}
+    found = False
+    for part, fields in (('docProps/core.xml', CORE_PROPS), ('docProps/app.xml', APP_PROPS)):
+        try: info = zf.getinfo(part)
+        except KeyError: continue
+        if info.file_size > DOCPROPS_LIMIT: continue
+        found = True
+        for el in ET.fromstring(zf.read(info)):
+            key = fields.get(el.tag.rsplit('}', 1)[-1])
+            if key and el.text and el.text.strip(): meta[key] = el.text.strip()
+    return meta if found else None
+
+
+# --- PER-FORMAT PARSERS ---
+def extract_image(f, meta):
+    import exifread
+    tags = exifread.process_file(f, details=False)
+    for k, v in tags.items():
+        if k not in SKIP_EXIF_TAGS: meta[str(k)] = str(v)
+    coords = gps_decimal(meta)
+    if coords: meta[POSITION_KEY] = format_position(*coords)
+
+
+def extract_png(f, meta):
+    """tEXt/zTXt/iTXt/tIME chunks (seeking past image data), then any eXIf block via exifread."""
+    f.seek(8)
+    has_exif = False
+    while True:
+        head = f.read(8)
+        if len(head) < 8: break
+        length, ctype = struct.unpack('>I4s', head)
+        if ctype in (b'tEXt', b'zTXt', b'iTXt', b'tIME'):
+            body = f.read(min(length, PNG_TEXT_LIMIT))
+            f.seek(length - len(body) + 4, 1)
+            if ctype == b'tIME' and len(body) == 7:
+                meta['PNG Modified'] = "%04d:%02d:%02d %02d:%02d:%02d" % struct.unpack('>H5B', body)
+                continue
+            keyword, _, rest = body.partition(b'\0')
+            key = f"PNG {keyword.decode('latin-1')}"
+            if ctype == b'tEXt': meta[key] = rest.decode('latin-1')
+            elif ctype == b'zTXt': meta[key] = zlib.decompressobj().decompress(rest[1:], PNG_TEXT_LIMIT).decode('latin-1')
+            else:
+                flag, method, rest = rest[0], rest[1], rest[2:]
+                _, _, rest = rest.partition(b'\0')      # language tag
+                _, _, text = rest.partition(b'\0')      # translated keyword
+                if flag: text = zlib.decompressobj().decompress(text, PNG_TEXT_LIMIT)
+                meta[key] = text.decode('utf-8', 'replace')
+        else:
+            if ctype == b'eXIf': has_exif = True
+            if ctype == b'IEND': break
+            f.seek(length + 4, 1)
+    if has_exif:
+        f.seek(0)
+        extract_image(f, meta)
+
+
+def extract_pdf(f, meta):
+    from forensic_pdf import read_pdf_metadata
+    try:
+        meta.update(read_pdf_metadata(f))
+        return
+    except Exception:
+        f.seek(0)
+    import PyPDF2
+    pdf = PyPDF2.PdfReader(f)
+    if pdf.metadata:
+        for k, v in pdf.metadata.items(): meta[k.replace('/', '')] = str(v)
+
+
+def extract_ooxml_fallback(kind, f, meta):
+    """Full-library path for OOXML packages without docProps parts."""
+    f.seek(0)
+    if kind == 'DOCX':
+        import docx
+        props = docx.Document(f).core_properties
+    elif kind == 'PPTX':
+        from pptx import Presentation
+        props = Presentation(f).core_properties
+    else:
+        import openpyxl
+        wb = openpyxl.load_workbook(f, read_only=True)
+        meta['Author'] = wb.properties.creator
+        wb.close()
+        return
+    meta['Author'] = props.author
+    meta['Created'] = str(props.created)
+
+
+def extract_zip(f, meta):
+    """OOXML documents get their docProps; any other zip gets a central-directory listing."""
+    with zipfile.ZipFile(f) as zf:
+        names = set(zf.namelist())
+        kind = next((k for part, k in OOXML_PARTS if part in names), None)
+        if kind:
+            props = read_docprops(zf)
+            if props is None: return extract_ooxml_fallback(kind, f, meta)
+            meta.update(props)
+            if kind == 'PPTX' and 'Slides' not in meta:
+                meta['Slides'] = sum(1 for n in names if n.startswith('ppt/slides/slide') and n.endswith('.xml'))
+            return
+        infos = zf.infolist()
+        meta['Zip Entries'] = len(infos)
+        meta['Zip Uncompressed Size'] = sum(i.file_size for i in infos)
+        if zf.comment: meta['Zip Comment'] = zf.comment.decode('utf-8', 'replace')
+        if any(i.flag_bits & 0x1 for i in infos): meta['Zip Encrypted'] = "YES"
+        stamps = sorted(i.date_time for i in infos)
+        if stamps:
+            meta['Zip Oldest Entry'] = "%04d:%02d:%02d %02d:%02d:%02d" % stamps[0]
+            meta['Zip Newest Entry'] = "%04d:%02d:%02d %02d:%02d:%02d" % stamps[-1]
+        meta['Zip Listing'] = "; ".join(i.filename for i in infos[:ZIP_LISTING]) + ("; ..." if len(infos) > ZIP_LISTING else "")
+
+
+def extract_tar(f, meta):
+    import tarfile
+    with tarfile.open(fileobj=f, mode="r:") as tf:
+        members = tf.getmembers()
+    meta['Tar Entries'] = len(members)
+    meta['Tar Uncompressed Size'] = sum(m.size for m in members)
+    owners = sorted({m.uname for m in members if m.uname})
+    if owners: meta['Tar Owners'] = "; ".join(owners)
+    meta['Tar Listing'] = "; ".join(m.name for m in members[:ZIP_LISTING]) + ("; ..." if len(members) > ZIP_LISTING else "")
+
+
+def extract_gzip(f, meta):
+    """Header fields only (RFC 1952): original file name, mtime and creating OS."""
+    head = f.read(10)
+    flags, mtime, os_id = head[3], struct.unpack('<I', head[4:8])[0], head[9]
+    if mtime: meta['GZip Modified'] = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).strftime("%Y:%m:%d %H:%M:%S")
+    meta['GZip OS'] = os_id
+    if flags & 0x04: f.seek(struct.unpack('<H', f.read(2))[0], 1)        # FEXTRA
+    if flags & 0x08:                                                       # FNAME
+        name = bytearray()
+        while len(name) < 4096:
+            ch = f.read(1)
+            if not ch or ch == b'\0': break
+            name += ch
+        meta['GZip Original Name'] = name.decode('latin-1')
+
+
+def extract_audio(f, meta):
+    import mutagen
+    audio = mutagen.File(f, easy=True)
+    if audio is None: return
+    info = getattr(audio, 'info', None)
+    if info is not None:
+        if getattr(info, 'length', None): meta['Audio Length'] = f"{info.length:.2f}s"
+        if getattr(info, 'bitrate', None): meta['Audio Bitrate'] = info.bitrate
+        if getattr(info, 'sample_rate', None): meta['Audio Sample Rate'] = info.sample_rate
+    for k, v in (audio.tags or {}).items():
+        meta[f"Audio {k}"] = "; ".join(str(x) for x in v) if isinstance(v, list) else str(v)
+
+
+def is_mpeg_audio(header):
+    return len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0 and header[1] & 0x06 != 0
+
+
+def is_pdf(header):
+    return b'%PDF-' in header[:HEADER_SIZE]
+
+
+def is_riff_audio(header):
+    return header.startswith(b'RIFF') and header[8:12] == b'WAVE'
+
+
+def is_aiff(header):
+    return header.startswith(b'FORM') and header[8:12] in (b'AIFF', b'AIFC')
+
+
+def is_mp4_audio(header):
+    return header[4:8] == b'ftyp' and header[8:11] in (b'M4A', b'M4B', b'mp4', b'iso', b'3gp')
+
+
+register('JPEG', extract_image, magic=((0, b'\xff\xd8\xff'),), exts=('.jpg', '.jpeg', '.jpe'))
+register('TIFF', extract_image, magic=((0, b'II*\x00'), (0, b'MM\x00*')), exts=('.tif', '.tiff'))
+register('PNG', extract_png, magic=((0, b'\x89PNG\r\n\x1a\n'),), exts=('.png',))
+register('PDF', extract_pdf, probe=is_pdf, exts=('.pdf',))
+register('ZIP', extract_zip, magic=((0, b'PK\x03\x04'), (0, b'PK\x05\x06')),
+         exts=('.zip', '.docx', '.xlsx', '.pptx', '.docm', '.xlsm', '.pptm'))
+register('TAR', extract_tar, magic=((257, b'ustar'),), exts=('.tar',))
+register('GZIP', extract_gzip, magic=((0, b'\x1f\x8b'),), exts=('.gz', '.tgz'))
+register('AUDIO', extract_audio, magic=((0, b'ID3'), (0, b'fLaC'), (0, b'OggS')),
+         probe=lambda h: is_mpeg_audio(h) or is_riff_audio(h) or is_aiff(h) or is_mp4_audio(h),
+         exts=('.mp3', '.flac', '.ogg', '.wav', '.m4a', '.aiff', '.aif', '.aifc'))
+
+
+# --- DISPATCH ---
+def read_header(path, data=None):
+    if data is not None: return data[:HEADER_SIZE]
+    with open(path, 'rb') as f: return f.read(HEADER_SIZE)
+
+
+def has_extractor(path, header=None):
+    return sniff(header if header is not None else read_header(path)) is not None
+
+
+def extract_metadata(path, data=None, header=None):
+    """Runs the parser matching the file's magic bytes; parser errors land in meta['Error'].
+
+    When `data` holds the file content already read by the hasher, the parser works
+    from memory instead of opening the file again.
+    """
+    meta = {}
+    try:
+        if header is None: header = read_header(path, data)
+        ex = sniff(header)
+        if ex is None: return meta
+        with (io.BytesIO(data) if data is not None else open(path, 'rb')) as f: ex.func(f, meta)
+    except MemoryError: meta['Error'] = OUT_OF_MEMORY
+    except Exception as e: meta['Error'] = str(e)
+    return meta
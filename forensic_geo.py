@@ -0,0 +1,165 @@
+"""GPS normalization and the geohash spatial index over the `locations` table.
+
+EXIF GPS tags (degree/minute/second rationals plus N/S/E/W references) are
+turned into decimal degrees when a file is parsed and stored with a geohash.
+Nearby points share geohash prefixes, so radius queries become a handful of
+index range scans over the 3x3 block of cells around the centre, and
+"same place" clustering is a GROUP BY over a fixed-length prefix.
+"""
+import re
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9               # stored geohash length (~5 m cells)
+CLUSTER_PRECISION = 7       # prefix length treated as "the same place" (~150 m cells)
+EARTH_RADIUS = 6371008.8    # metres (mean)
+METRES_PER_DEGREE = 111320.0
+
+GPS_KEYS = ("GPS GPSLatitude", "GPS GPSLatitudeRef", "GPS GPSLongitude", "GPS GPSLongitudeRef")
+POSITION_KEY = "GPS Position"
+RATIONAL = re.compile(r"(-?\d+(?:\.\d+)?)(?:/(\d+))?")
+
+
+# --- NORMALIZATION ---
+def dms_to_degrees(value):
+    """Decimal degrees from exifread's '[37, 46, 3019/100]' (or a bare number), or None."""
+    parts = []
+    for num, den in RATIONAL.findall(str(value))[:3]:
+        if den and int(den) == 0: return None
+        parts.append(float(num) / (int(den) if den else 1))
+    if not parts: return None
+    return sum(p / 60 ** i for i, p in enumerate(parts))
+
+
+def gps_decimal(meta):
+    """(lat, lon) in signed decimal degrees from EXIF GPS tags, or None if absent/invalid/0,0."""
+    if not all(k in meta for k in (GPS_KEYS[0], GPS_KEYS[2])): return None
+    lat, lon = dms_to_degrees(meta[GPS_KEYS[0]]), dms_to_degrees(meta[GPS_KEYS[2]])
+    if lat is None or lon is None: return None
+    if str(meta.get(GPS_KEYS[1], "N")).strip().upper().startswith("S"): lat = -lat
+    if str(meta.get(GPS_KEYS[3], "E")).strip().upper().startswith("W"): lon = -lon
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0): return None
+    return round(lat, 7), round(lon, 7)
+
+
+def format_position(lat, lon):
+    return f"{lat:.6f}, {lon:.6f}"
+
+
+def parse_position(value):
+    try:
+        lat, lon = (float(v) for v in str(value).split(","))
+        return lat, lon
+    except ValueError:
+        return None
+
+
+# --- GEOHASH ---
+def geohash(lat, lon, precision=PRECISION):
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid: ch, lon_lo = ch << 1 | 1, mid
+            else: ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid: ch, lat_lo = ch << 1 | 1, mid
+            else: ch, lat_hi = ch << 1, mid
+        even, bits = not even, bits + 1
+        if bits == 5:
+            out.append(BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def cell_bounds(cell):
+    """(south, west, north, east) of a geohash cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for c in cell:
+        idx = BASE32.index(c)
+        for shift in range(4, -1, -1):
+            bit = idx >> shift & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit: lon_lo = mid
+                else: lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit: lat_lo = mid
+                else: lat_hi = mid
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision, lat=0.0):
+    """(height, width) in metres of a geohash cell of this length at latitude `lat`."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return (180.0 / 2 ** lat_bits * METRES_PER_DEGREE,
+            360.0 / 2 ** lon_bits * METRES_PER_DEGREE * math.cos(math.radians(lat)))
+
+
+def cover(lat, lon, radius):
+    """Geohash prefixes (the centre cell and its 8 neighbours) covering a circle, or None if too large."""
+    precision = next((p for p in range(PRECISION, 0, -1) if min(cell_size(p, lat)) >= radius), None)
+    if precision is None or abs(lat) > 85: return None
+    south, west, north, east = cell_bounds(geohash(lat, lon, precision))
+    dlat, dlon = north - south, east - west
+    clat, clon = (south + north) / 2, (west + east) / 2
+    cells = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            y = min(max(clat + dy * dlat, -89.999999), 89.999999)
+            x = (clon + dx * dlon + 180) % 360 - 180
+            cells.add(geohash(y, x, precision))
+    return sorted(cells)
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (haversine)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+# --- QUERIES ---
+class GeoIndex:
+    """Spatial queries over `locations` (file_id, lat, lon, geohash)."""
+
+    def __init__(self, store):
+        self.conn = store.conn
+
+    def near(self, lat, lon, radius, limit=None):
+        """(path, lat, lon, metres) within `radius` metres of (lat, lon), nearest first."""
+        cells = cover(lat, lon, radius)
+        sql = "SELECT f.path, l.lat, l.lon FROM locations l JOIN files f ON f.id = l.file_id"
+        params = []
+        if cells:
+            sql += " WHERE " + " OR ".join("(l.geohash >= ? AND l.geohash < ?)" for _ in cells)
+            for c in cells: params += [c, c + "{"]     # '{' sorts right after 'z', the last base32 digit
+        hits = []
+        for path, plat, plon in self.conn.execute(sql, params):
+            d = distance(lat, lon, plat, plon)
+            if d <= radius: hits.append((path, plat, plon, round(d, 1)))
+        hits.sort(key=lambda h: h[3])
+        return hits[:limit] if limit is not None else hits
+
+    def within(self, south, west, north, east):
+        """(path, lat, lon) inside a bounding box; west > east wraps across the antimeridian."""
+        lon_test = "l.lon BETWEEN ? AND ?" if west <= east else "(l.lon >= ? OR l.lon <= ?)"
+        return self.conn.execute(f'''SELECT f.path, l.lat, l.lon FROM locations l JOIN files f ON f.id = l.file_id
+                                     WHERE l.lat BETWEEN ? AND ? AND {lon_test} ORDER BY l.lat''',
+                                 (south, north, west, east)).fetchall()
+
+    def clusters(self, precision=CLUSTER_PRECISION, min_size=2, limit=None):
+        """(cell, files, mean lat, mean lon) for places shared by at least `min_size` files, largest first."""
+        sql = '''SELECT substr(geohash, 1, ?) AS cell, COUNT(*) AS n, AVG(lat), AVG(lon) FROM locations
+                 GROUP BY cell HAVING n >= ? ORDER BY n DESC, cell'''
+        params = [precision, min_size]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
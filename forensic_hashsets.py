@@ -0,0 +1,172 @@
+"""Known-file hash sets (NSRL-style) in a compact, memory-mapped on-disk format.
+
+A .hset file holds one digest algorithm's sorted, de-duplicated raw digests:
+
+    32-byte header   MAGIC, algorithm name (16 bytes, NUL padded), entry count (u64)
+    fan-out table    65537 u64 entry indexes, one per leading 16-bit prefix
+    records          count * digest_size bytes, sorted
+
+A lookup reads two fan-out slots and binary-searches only that prefix's slice
+(about count / 65536 records), so tens of millions of entries cost a few page
+reads and no RAM beyond the OS page cache, shared by every worker process.
+"""
+import os
+import re
+import csv
+import mmap
+import heapq
+import itertools
+import struct
+import hashlib
+import functools
+import tempfile
+
+MAGIC = b"FHSET\x00\x01\x00"
+HEADER = struct.Struct("<8s16sQ")
+FANOUT = struct.Struct("<65537Q")
+DATA_OFFSET = HEADER.size + FANOUT.size
+RUN_SIZE = 1_000_000            # digests sorted in memory per run while building
+
+KNOWN_GOOD = "KNOWN"            # status for files on a known-good list (not parsed)
+KNOWN_BAD = "KNOWN_BAD"         # status for files on a known-bad list (parsed and flagged)
+
+
+def digest_size(algorithm):
+    return hashlib.new(algorithm).digest_size
+
+
+# --- BUILDING ---
+def read_digests(path, algorithm):
+    """Hex digests from a text hash list: NSRL/hashdeep CSV (column named after the
+    algorithm), md5sum-style output or one digest per line."""
+    width = digest_size(algorithm) * 2
+    column = re.sub(r"[^a-z0-9]", "", algorithm.lower())
+    pattern = re.compile(rf"\b[0-9a-fA-F]{{{width}}}\b")
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        first = f.readline()
+        names = [re.sub(r"[^a-z0-9]", "", c.lower()) for c in next(csv.reader([first]), [])]
+        if column in names:
+            idx = names.index(column)
+            for row in csv.reader(f):
+                if len(row) > idx and len(row[idx]) == width: yield row[idx]
+            return
+        for line in itertools.chain([first], f):
+            m = pattern.search(line)
+            if m: yield m.group(0)
+
+
+def write_run(digests, tmp_dir):
+    digests.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f: f.write(b"".join(digests))
+    return path
+
+
+def read_run(path, width):
+    with open(path, "rb") as f:
+        while True:
+            rec = f.read(width)
+            if len(rec) < width: return
+            yield rec
+
+
+def build_hashset(sources, out_path, algorithm="md5", run_size=RUN_SIZE):
+    """Builds out_path from text hash lists with an external merge sort (bounded memory).
+
+    Returns the number of distinct digests written.
+    """
+    width = digest_size(algorithm)
+    tmp_dir = os.path.dirname(os.path.abspath(out_path))
+    runs, batch = [], []
+    try:
+        for src in sources:
+            for hexdigest in read_digests(src, algorithm):
+                batch.append(bytes.fromhex(hexdigest))
+                if len(batch) >= run_size: runs.append(write_run(batch, tmp_dir)); batch = []
+        if batch: runs.append(write_run(batch, tmp_dir))
+        fanout = [0] * 65537
+        count, last = 0, None
+        with open(out_path, "wb") as out:
+            out.seek(DATA_OFFSET)
+            for rec in heapq.merge(*(read_run(r, width) for r in runs)):
+                if rec == last: continue
+                out.write(rec)
+                fanout[int.from_bytes(rec[:2], "big") + 1] += 1
+                count, last = count + 1, rec
+            for i in range(1, 65537): fanout[i] += fanout[i - 1]
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, algorithm.encode("ascii"), count))
+            out.write(FANOUT.pack(*fanout))
+    finally:
+        for r in runs: os.remove(r)
+    return count
+
+
+# --- LOOKUP ---
+class HashSet:
+    """Read-only view of a .hset file; `hexdigest in hashset` is an O(log n) mmap lookup."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(path, "rb") as f:
+            magic, algorithm, self.count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC: raise ValueError(f"{path}: not a hash set file")
+            self.algorithm = algorithm.rstrip(b"\x00").decode("ascii")
+            self.width = digest_size(self.algorithm)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, hexdigest):
+        if self.mm is None or not hexdigest or len(hexdigest) != self.width * 2: return False
+        try: needle = bytes.fromhex(hexdigest)
+        except ValueError: return False
+        prefix = int.from_bytes(needle[:2], "big")
+        lo, hi = struct.unpack_from("<QQ", self.mm, HEADER.size + prefix * 8)
+        w, mm = self.width, self.mm
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = DATA_OFFSET + mid * w
+            rec = mm[pos:pos + w]
+            if rec < needle: lo = mid + 1
+            elif rec > needle: hi = mid
+            else: return True
+        return False
+
+    def close(self):
+        if self.mm is not None: self.mm.close()
+
+
+@functools.lru_cache(maxsize=None)
+def open_hashset(path):
+    """One shared HashSet per path and process."""
+    return HashSet(path)
+
+
+class KnownFiles:
+    """Known-good and known-bad hash set paths. Sets are opened lazily in whichever
+    process first classifies a file, so instances pickle cheaply to pool workers."""
+
+    def __init__(self, good=(), bad=()):
+        self.good = tuple(good)
+        self.bad = tuple(bad)
+        self._sets = None
+
+    def __getstate__(self):
+        return {"good": self.good, "bad": self.bad, "_sets": None}
+
+    def sets(self):
+        if self._sets is None:
+            self._sets = [(KNOWN_BAD, open_hashset(p)) for p in self.bad] + [(KNOWN_GOOD, open_hashset(p)) for p in self.good]
+        return self._sets
+
+    def algorithms(self):
+        return {hs.algorithm for _, hs in self.sets()}
+
+    def lookup(self, digests):
+        """(KNOWN_BAD or KNOWN_GOOD, set name) for the first set holding one of `digests`; bad lists win."""
+        for verdict, hs in self.sets():
+            if digests.get(hs.algorithm) in hs: return verdict, hs.name
+        return None, None
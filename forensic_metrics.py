@@ -0,0 +1,259 @@
+"""Structured timing/counter instrumentation for the ingest pipeline.
+
+A process-wide Metrics registry (REGISTRY) collects counters, gauges and timers
+keyed by name and labels, plus the slowest files seen. Pool workers time their
+own stages and send the numbers back inside each result ("timings"); the engine
+folds them into the registry of the main process. Snapshots can be appended to a
+JSON-lines file or scraped from a local Prometheus-style text endpoint, and
+profiled() wraps a run in cProfile and/or tracemalloc.
+"""
+import io
+import re
+import json
+import time
+import heapq
+import bisect
+import logging
+import threading
+import contextlib
+
+logger = logging.getLogger("forensic")
+
+PREFIX = "forensic_"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOWEST_KEEP = 20               # slowest files remembered
+JSONL_INTERVAL = 5.0            # seconds between snapshots appended to a metrics file
+PROFILE_TOP = 25                # functions printed from a cProfile run
+TRACEMALLOC_TOP = 10            # allocation sites printed from a tracemalloc snapshot
+FILE_TYPE = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+def label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- REGISTRY ---
+class Metrics:
+    """Counters, gauges (last value and peak) and timers (count, sum, max, histogram) by (name, labels)."""
+
+    def __init__(self, keep=SLOWEST_KEEP):
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters, self.gauges, self.timers, self.slowest = {}, {}, {}, []
+            self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock: self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            peak = self.gauges.get(key, (value, value))[1]
+            self.gauges[key] = (value, max(peak, value))
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            t = self.timers.get(key)
+            if t is None: t = self.timers[key] = [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+            t[0] += 1
+            t[1] += seconds
+            if seconds > t[2]: t[2] = seconds
+            t[3][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try: yield
+        finally: self.observe(name, time.perf_counter() - start, **labels)
+
+    def slow(self, seconds, path, detail=""):
+        """Remembers path if it is among the `keep` slowest seen so far."""
+        item = (seconds, path, detail)
+        with self.lock:
+            if len(self.slowest) < self.keep: heapq.heappush(self.slowest, item)
+            elif seconds > self.slowest[0][0]: heapq.heapreplace(self.slowest, item)
+
+    # --- VIEWS ---
+    def slowest_files(self):
+        """[(seconds, path, detail)] slowest first."""
+        with self.lock: return sorted(self.slowest, reverse=True)
+
+    def slowest_timers(self, name, n=10):
+        """(labels, count, mean, max) for timer `name`, worst mean first (e.g. the slowest extractors)."""
+        with self.lock:
+            rows = [(dict(labels), t[0], t[1] / t[0], t[2]) for (nm, labels), t in self.timers.items() if nm == name and t[0]]
+        return sorted(rows, key=lambda r: r[2], reverse=True)[:n]
+
+    def snapshot(self):
+        label = lambda labels: ",".join(f"{k}={v}" for k, v in labels)
+        with self.lock:
+            return {
+                "ts": round(time.time(), 3),
+                "uptime": round(time.time() - self.started, 3),
+                "counters": {f"{n}{{{label(l)}}}": v for (n, l), v in self.counters.items()},
+                "gauges": {f"{n}{{{label(l)}}}": {"value": v, "max": p} for (n, l), (v, p) in self.gauges.items()},
+                "timers": {f"{n}{{{label(l)}}}": {"count": c, "sum": round(s, 6), "mean": round(s / c, 6) if c else 0.0,
+                                                  "max": round(m, 6)}
+                           for (n, l), (c, s, m, _) in self.timers.items()},
+                "slowest": [{"seconds": round(s, 6), "path": p, "detail": d} for s, p, d in sorted(self.slowest, reverse=True)],
+            }
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{label_value(v)}"' for k, v in items) + "}" if items else ""
+        out, typed = [], set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                out.append(f"# TYPE {name} {kind}")
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                declare(PREFIX + name + "_total", "counter")
+                out.append(f"{PREFIX}{name}_total{fmt(labels)} {value}")
+            for (name, labels), (value, peak) in sorted(self.gauges.items()):
+                declare(PREFIX + name, "gauge")
+                out.append(f"{PREFIX}{name}{fmt(labels)} {value}")
+                declare(PREFIX + name + "_max", "gauge")
+                out.append(f"{PREFIX}{name}_max{fmt(labels)} {peak}")
+            for (name, labels), (count, total, peak, buckets) in sorted(self.timers.items()):
+                metric = f"{PREFIX}{name}_seconds"
+                declare(metric, "histogram")
+                running = 0
+                for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+                    running += n
+                    out.append(f"{metric}_bucket{fmt(labels, [('le', bound)])} {running}")
+                out.append(f"{metric}_sum{fmt(labels)} {total:.6f}")
+                out.append(f"{metric}_count{fmt(labels)} {count}")
+                declare(metric + "_max", "gauge")
+                out.append(f"{metric}_max{fmt(labels)} {peak:.6f}")
+        return "\n".join(out) + "\n"
+
+    # --- PIPELINE HOOKS ---
+    def record_result(self, result):
+        """Folds one analyze_file result (and the timings its worker measured) into the registry."""
+        if result.get("cached"):
+            self.inc("files", outcome="verified" if result.get("verified") else "cached")
+            return
+        file_type = result.get("file_type") or ""
+        if not FILE_TYPE.fullmatch(file_type): file_type = "other"       # keep label cardinality bounded
+        self.inc("files", outcome="analyzed")
+        self.inc("status", status=result.get("status"))
+        for r in [result] + result.get("children", []):
+            if "error" in r: self.inc("errors", stage=r["error"]["stage"], kind=r["error"]["kind"])
+        timings = result.get("timings")
+        if not timings: return
+        extractor = timings.get("extractor") or "none"
+        self.inc("bytes_read", timings.get("bytes") or 0, file_type=file_type)
+        for stage in ("hash", "parse", "archive"):
+            if stage in timings: self.observe("stage", timings[stage], stage=stage)
+        if "parse" in timings: self.observe("extractor", timings["parse"], extractor=extractor)
+        total = sum(timings.get(s, 0.0) for s in ("hash", "parse", "archive"))
+        self.observe("file", total, file_type=file_type)
+        if result.get("children"): self.inc("archive_members", len(result["children"]))
+        self.slow(total, result["path"], extractor)
+
+
+REGISTRY = Metrics()
+
+
+# --- EXPORTERS ---
+class JsonlExporter:
+    """Appends a registry snapshot to `path` at most every `interval` seconds (tick) and on close."""
+
+    def __init__(self, path, registry=REGISTRY, interval=JSONL_INTERVAL):
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        self.last = time.monotonic()
+
+    def tick(self):
+        if time.monotonic() - self.last >= self.interval: self.write()
+
+    def write(self):
+        with open(self.path, "a", encoding="utf-8") as f: f.write(json.dumps(self.registry.snapshot()) + "\n")
+        self.last = time.monotonic()
+
+    def close(self):
+        self.write()
+
+
+def serve(port, registry=REGISTRY, host="127.0.0.1"):
+    """Serves /metrics (Prometheus text) and /slowest (JSON) from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics"):
+                body, ctype = registry.render_prometheus().encode(), "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path.startswith("/slowest"):
+                body, ctype = json.dumps(registry.snapshot()["slowest"], indent=1).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"METRICS ENDPOINT: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+# --- PROFILING ---
+@contextlib.contextmanager
+def profiled(stats_path=None, memory=False, report=print):
+    """cProfile (when stats_path is given) and/or tracemalloc around a block; summaries go to `report`.
+
+    Only this process is profiled: run with one worker to see parser internals.
+    """
+    import pstats
+    import cProfile
+    import tracemalloc
+    profiler = cProfile.Profile() if stats_path else None
+    if memory: tracemalloc.start()
+    if profiler: profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(stats_path)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            report(f"PROFILE SAVED TO: {stats_path}\n{text.getvalue().rstrip()}")
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]
+            tracemalloc.stop()
+            report(f"TRACEMALLOC: current={current / 1048576:.1f} MiB peak={peak / 1048576:.1f} MiB\n" +
+                   "\n".join(f"  {stat}" for stat in top))
+
+
+def summary(registry=REGISTRY, n=10):
+    """Human-readable lines: per-stage totals, slowest extractors (by mean) and slowest files."""
+    lines = []
+    for labels, count, mean, peak in registry.slowest_timers("stage", n):
+        lines.append(f"STAGE {labels['stage']:<8} n={count:<7} mean={mean * 1000:.2f}ms max={peak * 1000:.1f}ms")
+    for labels, count, mean, peak in registry.slowest_timers("extractor", n):
+        lines.append(f"EXTRACTOR {labels['extractor']:<8} n={count:<7} mean={mean * 1000:.2f}ms max={peak * 1000:.1f}ms")
+    for name, title in (("db_flush", "DB FLUSH"), ("gui_page", "TABLE REFRESH")):
+        for _, count, mean, peak in registry.slowest_timers(name, 1):
+            lines.append(f"{title} n={count} mean={mean * 1000:.2f}ms max={peak * 1000:.1f}ms")
+    for seconds, path, detail in registry.slowest_files()[:n]:
+        lines.append(f"SLOW FILE {seconds * 1000:.1f}ms [{detail}] {path}")
+    return lines
@@ -0,0 +1,240 @@
+"""Header-only PDF metadata reader: trailer, /Info dictionary and XMP packet.
+
+Only the bytes needed to follow startxref -> xref -> Info/Catalog/Metadata are
+read, so the cost does not grow with page count or file size. Anything this
+reader does not understand (object streams, encrypted files, broken xref
+tables) raises PdfQuickError and the caller falls back to PyPDF2.
+"""
+import re
+import zlib
+import codecs
+import xml.etree.ElementTree as ET
+
+TAIL_SIZE = 4096
+OBJECT_LIMIT = 1 << 20          # never read more than 1 MiB for a single object
+XMP_LIMIT = 4 << 20
+MAX_PREV = 32                   # incremental-update sections followed via /Prev
+
+DELIMS = b"()<>[]{}/%"
+WHITESPACE = b" \t\r\n\f\x00"
+XMP_FIELDS = {
+    "CreateDate": "XMP CreateDate",
+    "ModifyDate": "XMP ModifyDate",
+    "MetadataDate": "XMP MetadataDate",
+    "CreatorTool": "XMP CreatorTool",
+    "Producer": "XMP Producer",
+    "DocumentID": "XMP DocumentID",
+    "InstanceID": "XMP InstanceID",
+    "creator": "XMP Creator",
+    "title": "XMP Title",
+}
+
+
+class PdfQuickError(Exception):
+    pass
+
+
+class Ref(tuple):
+    """Indirect reference (object number, generation)."""
+
+
+# --- TOKENIZER ---
+def skip_ws(data, pos):
+    n = len(data)
+    while pos < n:
+        ch = data[pos]
+        if ch in WHITESPACE: pos += 1
+        elif ch == 0x25:                                   # % comment
+            while pos < n and data[pos] not in b"\r\n": pos += 1
+        else: break
+    return pos
+
+
+def parse_literal(data, pos):
+    out, depth, n = bytearray(), 1, len(data)
+    pos += 1
+    while pos < n:
+        ch = data[pos]
+        if ch == 0x5C:                                     # backslash escape
+            pos += 1
+            esc = data[pos:pos + 1]
+            if not esc: break
+            if esc in b"nrtbf": out += {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}[esc]
+            elif esc in b"01234567":
+                m = re.match(rb"[0-7]{1,3}", data[pos:pos + 3])
+                out.append(int(m.group(), 8) & 0xFF)
+                pos += len(m.group()) - 1
+            elif esc == b"\r":
+                if data[pos + 1:pos + 2] == b"\n": pos += 1
+            elif esc != b"\n": out += esc
+        elif ch == 0x28:
+            depth += 1
+            out.append(ch)
+        elif ch == 0x29:
+            depth -= 1
+            if depth == 0: return bytes(out), pos + 1
+            out.append(ch)
+        else: out.append(ch)
+        pos += 1
+    raise PdfQuickError("unterminated string")
+
+
+def parse_value(data, pos):
+    """Parses one PDF object starting at pos; returns (value, new_pos)."""
+    pos = skip_ws(data, pos)
+    if pos >= len(data): raise PdfQuickError("unexpected end of object")
+    ch = data[pos:pos + 1]
+    if data.startswith(b"<<", pos):
+        result, pos = {}, pos + 2
+        while True:
+            pos = skip_ws(data, pos)
+            if data.startswith(b">>", pos): return result, pos + 2
+            key, pos = parse_value(data, pos)
+            if not isinstance(key, str) or not key.startswith("/"): raise PdfQuickError("bad dictionary key")
+            result[key[1:]], pos = parse_value(data, pos)
+    if ch == b"[":
+        result, pos = [], pos + 1
+        while True:
+            pos = skip_ws(data, pos)
+            if data.startswith(b"]", pos): return result, pos + 1
+            item, pos = parse_value(data, pos)
+            result.append(item)
+    if ch == b"(": return parse_literal(data, pos)
+    if ch == b"<":
+        end = data.index(b">", pos)
+        hexed = re.sub(rb"\s", b"", data[pos + 1:end])
+        if len(hexed) % 2: hexed += b"0"
+        return bytes.fromhex(hexed.decode("ascii")), end + 1
+    if ch == b"/":
+        end = pos + 1
+        while end < len(data) and data[end] not in WHITESPACE and data[end] not in DELIMS: end += 1
+        name = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), data[pos:end])
+        return name.decode("latin-1"), end
+    m = re.compile(rb"(\d+)\s+(\d+)\s+R(?![A-Za-z])").match(data, pos)
+    if m: return Ref((int(m.group(1)), int(m.group(2)))), m.end()
+    m = re.compile(rb"[+-]?(\d+\.?\d*|\.\d+)|true|false|null").match(data, pos)
+    if not m: raise PdfQuickError(f"unexpected token at {pos}")
+    token = m.group()
+    if token in (b"true", b"false"): return token == b"true", m.end()
+    if token == b"null": return None, m.end()
+    return (float(token) if b"." in token else int(token)), m.end()
+
+
+def decode_text(value):
+    """PDF text string -> str (UTF-16 with BOM, UTF-8 with BOM, else PDFDocEncoding ~ latin-1)."""
+    if isinstance(value, bytes):
+        if value.startswith(codecs.BOM_UTF16_BE): return value[2:].decode("utf-16-be", "replace")
+        if value.startswith(codecs.BOM_UTF8): return value[3:].decode("utf-8", "replace")
+        return value.decode("latin-1")
+    if isinstance(value, str) and value.startswith("/"): return value
+    return str(value)
+
+
+# --- READER ---
+class PdfQuickReader:
+    def __init__(self, f):
+        self.f = f
+        f.seek(0, 2)
+        self.size = f.tell()
+        self.offsets = {}
+        self.trailer = {}
+        self.read_xref_chain()
+
+    def read_at(self, offset, length):
+        self.f.seek(offset)
+        return self.f.read(length)
+
+    def read_xref_chain(self):
+        tail = self.read_at(max(0, self.size - TAIL_SIZE), TAIL_SIZE)
+        m = list(re.finditer(rb"startxref\s+(\d+)", tail))
+        if not m: raise PdfQuickError("no startxref")
+        offset, seen = int(m[-1].group(1)), set()
+        while offset is not None and offset not in seen and len(seen) < MAX_PREV:
+            seen.add(offset)
+            offset = self.read_xref_section(offset)
+
+    def read_xref_section(self, offset):
+        """Reads one classic xref table plus its trailer; returns the /Prev offset or None."""
+        head = self.read_at(offset, 4)
+        if head != b"xref": raise PdfQuickError("cross-reference stream (PDF 1.5+)")
+        data = self.read_at(offset, OBJECT_LIMIT)
+        pos = 4
+        while True:
+            pos = skip_ws(data, pos)
+            if data.startswith(b"trailer", pos): break
+            m = re.compile(rb"(\d+)\s+(\d+)").match(data, pos)
+            if not m: raise PdfQuickError("bad xref subsection")
+            start, count = int(m.group(1)), int(m.group(2))
+            pos = skip_ws(data, m.end())
+            for i in range(count):
+                entry = data[pos:pos + 20]
+                if len(entry) < 18: raise PdfQuickError("truncated xref table")
+                if entry[17:18] == b"n": self.offsets.setdefault(start + i, int(entry[:10]))
+                pos += 20
+        trailer, _ = parse_value(data, pos + len(b"trailer"))
+        for k, v in trailer.items(): self.trailer.setdefault(k, v)
+        if "Encrypt" in trailer: raise PdfQuickError("encrypted document")
+        prev = trailer.get("Prev")
+        return prev if isinstance(prev, int) else None
+
+    def object(self, ref):
+        """Returns (value, raw_bytes, value_end) for an indirect object."""
+        if ref[0] not in self.offsets: raise PdfQuickError(f"object {ref[0]} not in xref (object stream?)")
+        data = self.read_at(self.offsets[ref[0]], OBJECT_LIMIT)
+        m = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj").match(data)
+        if not m or int(m.group(1)) != ref[0]: raise PdfQuickError(f"xref points off object {ref[0]}")
+        value, end = parse_value(data, m.end())
+        return value, data, end
+
+    def resolve(self, value):
+        return self.object(value)[0] if isinstance(value, Ref) else value
+
+    def info(self):
+        info = self.resolve(self.trailer.get("Info"))
+        if info is None: return {}
+        if not isinstance(info, dict): raise PdfQuickError("bad /Info")
+        return {k: decode_text(self.resolve(v)) for k, v in info.items()}
+
+    def xmp(self):
+        root = self.resolve(self.trailer.get("Root"))
+        if not isinstance(root, dict) or not isinstance(root.get("Metadata"), Ref): return None
+        stream_dict, data, end = self.object(root["Metadata"])
+        length = self.resolve(stream_dict.get("Length"))
+        m = re.compile(rb"\s*stream\r?\n").match(data, end)
+        if not m or not isinstance(length, int) or length > XMP_LIMIT: raise PdfQuickError("bad XMP stream")
+        raw = data[m.end():m.end() + length] if m.end() + length <= len(data) else \
+            self.read_at(self.offsets[root["Metadata"][0]] + m.end(), length)
+        filters = stream_dict.get("Filter")
+        filters = filters if isinstance(filters, list) else [filters] if filters else []
+        for flt in filters:
+            if flt != "/FlateDecode": raise PdfQuickError(f"unsupported XMP filter {flt}")
+            raw = zlib.decompressobj().decompress(raw, XMP_LIMIT)
+        return raw
+
+
+def parse_xmp(packet):
+    """Flat {XMP key: value} from an XMP packet; rdf:Seq/Alt/Bag items are joined with '; '."""
+    result = {}
+    start, end = packet.find(b"<x:xmpmeta"), packet.rfind(b"</x:xmpmeta>")
+    if start < 0 or end < 0: return result
+    root = ET.fromstring(packet[start:end + len(b"</x:xmpmeta>")])
+    for desc in root.iter("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description"):
+        for attr, value in desc.attrib.items():
+            local = attr.rsplit("}", 1)[-1]
+            if local in XMP_FIELDS: result[XMP_FIELDS[local]] = value
+        for child in desc:
+            local = child.tag.rsplit("}", 1)[-1]
+            if local not in XMP_FIELDS: continue
+            items = [li.text.strip() for li in child.iter("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}li") if li.text]
+            text = "; ".join(items) if items else (child.text or "").strip()
+            if text: result[XMP_FIELDS[local]] = text
+    return result
+
+
+def read_pdf_metadata(f):
+    """{key: value} from the /Info dictionary (keys without '/') plus 'XMP ...' fields."""
+    reader = PdfQuickReader(f)
+    meta = reader.info()
+    packet = reader.xmp()
+    if packet: meta.update(parse_xmp(packet))
+    return meta
@@ -0,0 +1,130 @@
+import csv
+import html
+import datetime
+import platform
+
+FETCH_ROWS = 5000            # rows pulled from SQLite per fetchmany()
+WRITE_BUFFER = 1 << 20       # 1 MiB output buffer
+
+REPORT_SQL = '''SELECT file_id, filename, file_type, key, value, md5_hash, anomaly_flag
+                FROM report_rows ORDER BY file_id'''
+
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { background-color: #121212; color: #00ff00; font-family: Consolas, monospace; padding: 20px; }
+        h1 { border-bottom: 2px solid #00ff00; padding-bottom: 10px; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { border: 1px solid #333; padding: 10px; text-align: left; }
+        th { background-color: #1e1e1e; color: #fff; }
+        tr:nth-child(even) { background-color: #1a1a1a; }
+        .flag { color: red; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <h1>METADATA FORENSIC INVESTIGATION REPORT</h1>
+    <p>Generated by: Metadata Interceptor Tool</p>
+    <p>Date: {date}</p>
+    <table>
+        <tr><th>Filename</th><th>File Type</th><th>Metadata Key</th><th>Value</th><th>MD5 Hash</th><th>Status</th></tr>
+"""
+HTML_ROW = '        <tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td class="{}">{}</td></tr>\n'
+HTML_TAIL = """    </table>
+</body>
+</html>
+"""
+
+
+# --- ROW STREAMING ---
+def iter_chunks(store, sql=REPORT_SQL, size=FETCH_ROWS):
+    """Yields lists of at most `size` report rows; only one chunk is ever held in memory."""
+    cur = store.conn.cursor()
+    cur.arraysize = size
+    cur.execute(sql)
+    while True:
+        rows = cur.fetchmany()
+        if not rows: break
+        yield rows
+
+
+def is_flagged(status):
+    return bool(status) and ("FLAGGED" in status or "SPOOFED" in status)
+
+
+# --- EXPORTERS ---
+def export_csv(store, path):
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        w = csv.writer(f)
+        w.writerow(["File", "Type", "Key", "Value", "Hash", "Status"])
+        for rows in iter_chunks(store):
+            w.writerows(row[1:] for row in rows)
+            count += len(rows)
+    return count
+
+
+def export_html(store, path):
+    count = 0
+    esc = html.escape
+    with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        f.write(HTML_HEAD.replace("{date}", esc(str(datetime.datetime.now()))))
+        for rows in iter_chunks(store):
+            f.write("".join(HTML_ROW.format(esc(str(fname)), esc(str(ftype)), esc(str(key)), esc(str(value)),
+                                            esc(str(md5)), "flag" if is_flagged(status) else "", esc(str(status)))
+                            for _, fname, ftype, key, value, md5, status in rows))
+            count += len(rows)
+        f.write(HTML_TAIL)
+    return count
+
+
+def export_pdf(store, path):
+    """Draws rows as they stream from SQLite, one file block at a time (no per-case dict)."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    c_pdf = canvas.Canvas(path, pagesize=letter, pageCompression=1)
+    width, height = letter
+    y_pos = height - 50
+
+    c_pdf.setFont("Helvetica-Bold", 16)
+    c_pdf.drawCentredString(width / 2, y_pos, "Metadata Extraction & Correlation Report")
+    y_pos -= 20
+
+    c_pdf.setFont("Helvetica", 9)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    sys_info = f"{platform.system()} {platform.release()}"
+    c_pdf.drawCentredString(width / 2, y_pos, f"Generated on: {timestamp} | System: {sys_info}")
+    y_pos -= 40
+
+    count = 0
+    current = None
+    for rows in iter_chunks(store):
+        for file_id, filename, _, key, val, file_hash, status in rows:
+            if file_id != current:
+                if current is not None: y_pos -= 10
+                current = file_id
+                if y_pos < 100:
+                    c_pdf.showPage()
+                    y_pos = height - 50
+                c_pdf.setFont("Helvetica-Bold", 12)
+                c_pdf.drawString(40, y_pos, f"File: {filename} [{status}]")
+                y_pos -= 15
+                c_pdf.setFont("Helvetica", 10)
+                c_pdf.drawString(60, y_pos, f"- MD5 Hash: {file_hash}")
+                y_pos -= 15
+            if y_pos < 50:
+                c_pdf.showPage()
+                y_pos = height - 50
+                c_pdf.setFont("Helvetica", 10)
+            val = str(val)
+            display_val = (val[:80] + '...') if len(val) > 80 else val
+            c_pdf.drawString(60, y_pos, f"- {key}: {display_val}")
+            y_pos -= 15
+            count += 1
+
+    c_pdf.save()
+    return count
+
+
+EXPORTERS = {"csv": export_csv, "html": export_html, "pdf": export_pdf}
@@ -0,0 +1,178 @@
+"""Isolated, resource-limited workers for hashing and parsing untrusted files.
+
+Each worker process handles one file at a time under an address-space cap
+(setrlimit). The parent holds every in-flight file's deadline, kills a worker
+that overruns it or dies, starts a replacement and records the file as a
+structured error instead of stalling or losing the run. Workers are also
+recycled after a fixed number of files so slow leaks in parser libraries
+cannot accumulate.
+"""
+import os
+import sys
+import time
+import signal
+import logging
+import multiprocessing
+from collections import namedtuple
+from multiprocessing.connection import wait
+
+try: import resource
+except ImportError: resource = None     # Windows: no per-process memory cap, timeouts still apply
+
+from forensic_core import analyze_file, error_info, CACHED
+from forensic_metrics import REGISTRY
+
+logger = logging.getLogger("forensic")
+
+SandboxLimits = namedtuple("SandboxLimits", "timeout max_memory max_tasks")
+DEFAULT_SANDBOX = SandboxLimits(timeout=300, max_memory=2 << 30, max_tasks=500)
+STOP_GRACE = 2.0                # seconds a recycled worker gets to exit before it is killed
+
+ERROR_STATUS = "ERROR"          # status for files whose analysis was aborted (retried on the next run)
+
+
+# --- ERROR RESULTS ---
+def failed_result(path, kind, message, seconds=None):
+    """Result for a file whose worker timed out, ran out of memory or died.
+
+    size/mtime/inode stay empty so the incremental cache retries the file next run.
+    """
+    return {
+        "path": path,
+        "filename": os.path.basename(path),
+        "file_type": os.path.splitext(path)[1].lower(),
+        "md5": "ERROR",
+        "sha256": "ERROR",
+        "status": ERROR_STATUS,
+        "meta": {"Error": f"{kind}: {message}"},
+        "size": None,
+        "mtime_ns": None,
+        "inode": None,
+        "children": [],                 # drops members stored for an earlier, expanded version
+        "error": error_info("sandbox", kind, message, seconds=seconds),
+    }
+
+
+# --- WORKER SIDE ---
+def apply_limits(max_memory):
+    """Caps this process's data segment (Linux) or address space at max_memory bytes."""
+    if resource is None or not max_memory: return
+    which = resource.RLIMIT_DATA if sys.platform.startswith("linux") else resource.RLIMIT_AS
+    _, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY: max_memory = min(max_memory, hard)
+    try: resource.setrlimit(which, (max_memory, hard))
+    except (ValueError, OSError) as e: logger.warning(f"SANDBOX MEMORY LIMIT NOT APPLIED: {e}")
+
+
+def worker_main(conn, options, max_memory):
+    """Worker loop: receives (seq, path, expected), answers (seq, result); None stops it."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)        # the parent owns Ctrl-C and tears workers down
+    apply_limits(max_memory)
+    while True:
+        try: msg = conn.recv()
+        except (EOFError, OSError): return
+        if msg is None: return
+        seq, path, expected = msg
+        started = time.perf_counter()
+        try:
+            result = analyze_file(path, expected, **options)
+        except MemoryError:
+            result = failed_result(path, "memory", "memory limit exceeded", time.perf_counter() - started)
+        except Exception as e:
+            result = failed_result(path, "exception", f"{type(e).__name__}: {e}", time.perf_counter() - started)
+        try: conn.send((seq, result))
+        except MemoryError:
+            conn.send((seq, failed_result(path, "memory", "memory limit exceeded sending result")))
+        except Exception as e:
+            conn.send((seq, failed_result(path, "exception", f"unsendable result: {e}")))
+
+
+# --- PARENT SIDE ---
+class Worker:
+    def __init__(self, ctx, options, limits):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=worker_main, args=(child, options, limits.max_memory), daemon=True)
+        self.proc.start()
+        child.close()
+        self.task = None            # (seq, path, started) while busy
+        self.done = 0
+
+    def submit(self, seq, path, expected):
+        self.conn.send((seq, path, expected))
+        self.task = (seq, path, time.monotonic())
+
+    def stop(self, kill=False):
+        if not kill:
+            try: self.conn.send(None)
+            except OSError: kill = True
+            else: self.proc.join(STOP_GRACE)
+        if self.proc.is_alive(): self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+
+def run_sandboxed(jobs, workers, queue_size, limits, options):
+    """Yields analyze_file results for (path, expected) jobs in input order, at most
+    queue_size jobs ahead of the consumer. CACHED jobs are answered without a worker."""
+    ctx = multiprocessing.get_context()
+    pool = [Worker(ctx, options, limits) for _ in range(max(1, workers))]
+    done, seq_in, next_out = {}, 0, 0
+    jobs = iter(jobs)
+    exhausted = False
+
+    def replace(w, kill):
+        w.stop(kill)
+        REGISTRY.inc("worker_restarts", reason="recycle" if not kill else "failure")
+        pool[pool.index(w)] = Worker(ctx, options, limits)
+
+    try:
+        while True:
+            idle = [w for w in pool if w.task is None]
+            while not exhausted and idle and seq_in - next_out < queue_size:
+                try: path, expected = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if expected == CACHED: done[seq_in] = {"path": path, "cached": True}
+                else: idle.pop().submit(seq_in, path, expected)
+                seq_in += 1
+            REGISTRY.gauge("queue_depth", seq_in - next_out)
+            while next_out in done:
+                yield done.pop(next_out)
+                next_out += 1
+            if exhausted and next_out == seq_in: return
+            busy = [w for w in pool if w.task is not None]
+            if not busy: continue
+            now = time.monotonic()
+            deadline = min(w.task[2] for w in busy) + limits.timeout
+            wait([w.conn for w in busy] + [w.proc.sentinel for w in busy], max(0.0, deadline - now))
+            now = time.monotonic()
+            for w in busy:
+                seq, path, started = w.task
+                reply, dead = None, not w.proc.is_alive()
+                if w.conn.poll():
+                    try: reply = w.conn.recv()
+                    except (EOFError, OSError):
+                        w.proc.join(STOP_GRACE)         # died mid-task: reap it for the exit code
+                        dead = True
+                if reply is not None:
+                    seq, result = reply
+                    done[seq] = result
+                    w.task = None
+                    w.done += 1
+                    if w.done >= limits.max_tasks or (result.get("error") or {}).get("kind") == "memory":
+                        replace(w, kill=False)
+                elif dead:
+                    code = w.proc.exitcode
+                    reason = f"killed by signal {-code}" if code is not None and code < 0 else f"exited with code {code}"
+                    done[seq] = failed_result(path, "crash", f"worker {reason}", now - started)
+                    logger.error(f"SANDBOX WORKER CRASHED ON: {path} ({reason})")
+                    w.task = None
+                    replace(w, kill=True)
+                elif now - started >= limits.timeout:
+                    done[seq] = failed_result(path, "timeout", f"no result after {limits.timeout}s", now - started)
+                    logger.error(f"SANDBOX TIMEOUT ON: {path}")
+                    w.task = None
+                    replace(w, kill=True)
+    finally:
+        for w in pool: w.stop(kill=w.task is not None)
@@ -0,0 +1,104 @@
+"""Directory enumeration for the ingest pipeline.
+
+scan() walks roots with os.scandir (reusing the dirent type, and the stat
+Windows returns with it), optionally across a thread pool, applies
+include/exclude globs plus size, extension and magic-byte filters, and yields
+paths as soon as they are found so analysis can start before the walk ends.
+The order is always sorted depth-first, however many threads scan ahead, so
+identical runs assign identical file ids.
+"""
+import os
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+from forensic_extractors import HEADER_SIZE, sniff
+
+
+class ScanFilter:
+    def __init__(self, include=(), exclude=(), exts=None, min_size=None, max_size=None, magic=None):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.exts = {e.lower() if e.startswith('.') else '.' + e.lower() for e in exts} if exts else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.magic = {m.upper() for m in magic} if magic else None
+
+    def skip_dir(self, path):
+        return any(fnmatch.fnmatch(path, pat) or fnmatch.fnmatch(os.path.basename(path), pat) for pat in self.exclude)
+
+    def accept(self, path, entry=None):
+        name = os.path.basename(path)
+        if self.exts is not None and os.path.splitext(name)[1].lower() not in self.exts: return False
+        if self.include and not any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in self.include): return False
+        if self.exclude and any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in self.exclude): return False
+        try:
+            if self.min_size is not None or self.max_size is not None:
+                size = entry.stat(follow_symlinks=False).st_size if entry is not None else os.path.getsize(path)
+                if self.min_size is not None and size < self.min_size: return False
+                if self.max_size is not None and size > self.max_size: return False
+            if self.magic is not None:
+                with open(path, 'rb') as f: ex = sniff(f.read(HEADER_SIZE))
+                if ex is None or ex.name not in self.magic: return False
+        except OSError:
+            return False
+        return True
+
+
+NO_FILTER = ScanFilter()
+
+
+def scan_dir(path, flt, follow_symlinks=False):
+    """One directory level: (accepted file paths, sub-directories to descend into)."""
+    files, dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if not flt.skip_dir(entry.path): dirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=follow_symlinks) and flt.accept(entry.path, entry):
+                        files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    files.sort()
+    dirs.sort()
+    return files, dirs
+
+
+def walk(root, flt, follow_symlinks=False):
+    """Serial depth-first walk in sorted order."""
+    stack = [root]
+    while stack:
+        files, dirs = scan_dir(stack.pop(), flt, follow_symlinks)
+        yield from files
+        stack.extend(reversed(dirs))
+
+
+def walk_parallel(root, flt, workers, follow_symlinks=False, max_pending=None):
+    """Same order as walk(), with the next max_pending directories in that order scanned ahead on a thread pool."""
+    max_pending = max_pending or workers * 4
+    stack, ahead = [root], {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while stack:
+            for path in reversed(stack):        # prefetch from the top of the DFS stack: what walk() visits next
+                if len(ahead) >= max_pending: break
+                if path not in ahead: ahead[path] = pool.submit(scan_dir, path, flt, follow_symlinks)
+            files, dirs = ahead.pop(stack.pop()).result()
+            yield from files
+            stack.extend(reversed(dirs))
+
+
+def scan(paths, flt=NO_FILTER, workers=1, follow_symlinks=False):
+    """Yields every accepted file under `paths` once; plain file arguments are filtered too."""
+    seen = set()
+    for p in paths:
+        if os.path.isdir(p):
+            found = walk_parallel(p, flt, workers, follow_symlinks) if workers > 1 else walk(p, flt, follow_symlinks)
+        else:
+            found = [p] if flt is NO_FILTER or flt.accept(p) else []
+        for path in found:
+            if path not in seen:
+                seen.add(path)
+                yield path
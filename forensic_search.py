@@ -0,0 +1,104 @@
+"""Evidence search: a small query language over the metadata_fts index.
+
+    iphone                  any key or value containing the token
+    value:"iPhone*"         value tokens starting with iphone ("..." keeps phrases together)
+    key:Model               key contains the token Model
+    md5:<hex> sha256:<hex>  hash lookup; a bare 32/64-digit hex token means either hash
+    hash:<hex>              either hash
+    after:2024-01-01        file mtime on/after (EXIF, PDF and ISO timestamps also accepted)
+    before:2024-02-01       file mtime before
+    status:FLAGGED          anomaly flag
+    file:IMG_*.jpg          file name pattern
+
+All terms must match. Text terms go to FTS5; the rest are plain indexed columns.
+"""
+import re
+
+from forensic_db import keyset_page
+from forensic_timeline import parse_epoch
+
+TOKEN = re.compile(r'(?:(\w+):)?("[^"]*"\*?|\S+)')
+HEX = re.compile(r"[0-9a-fA-F]{32}(?:[0-9a-fA-F]{32})?")
+TEXT_FIELDS = {"key": "key : ", "value": "value : ", "any": ""}
+ROW_COLUMNS = "f.filename, m.key, m.value, f.md5_hash, f.anomaly_flag"
+
+
+def fts_phrase(term):
+    """Quotes a user term as an FTS5 phrase, keeping a trailing * as a prefix query."""
+    if term.startswith('"'): term = term.replace('"', '')
+    prefix = term.endswith("*")
+    term = term.rstrip("*").strip()
+    if not term: return None
+    return '"' + term.replace('"', '""') + '"' + ("*" if prefix else "")
+
+
+def parse_date(value):
+    epoch = parse_epoch(value)
+    if epoch is None: raise ValueError(f"bad date '{value}' (use YYYY-MM-DD)")
+    return epoch * 1_000_000_000
+
+
+def parse_query(text):
+    """Splits a query into (fts_match or None, [where clauses], [params]); raises ValueError on bad input."""
+    phrases, where, params = [], [], []
+    for field, raw in TOKEN.findall(text):
+        field = field.lower()
+        value = raw.strip('"')
+        if field in ("md5", "sha256"):
+            where.append(f"f.{field}_hash = ?"); params.append(value.lower())
+        elif field == "hash" or (not field and HEX.fullmatch(raw)):
+            where.append("(f.md5_hash = ? OR f.sha256_hash = ?)"); params += [value.lower()] * 2
+        elif field in ("after", "since"):
+            where.append("f.mtime_ns >= ?"); params.append(parse_date(value))
+        elif field in ("before", "until"):
+            where.append("f.mtime_ns < ?"); params.append(parse_date(value))
+        elif field == "status":
+            where.append("f.anomaly_flag = ?"); params.append(value.upper())
+        elif field in ("file", "name"):
+            where.append("f.filename LIKE ? ESCAPE '\\'")
+            params.append(value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "%").replace("?", "_"))
+        else:
+            phrase = fts_phrase(raw) if field in TEXT_FIELDS else fts_phrase(f"{field}:{raw}" if field else raw)
+            if phrase: phrases.append(TEXT_FIELDS.get(field, "") + phrase)
+    return (" AND ".join(phrases) or None), where, params
+
+
+def build_sql(text, columns=ROW_COLUMNS):
+    """(sql, params, key): the query ends in a WHERE condition; key is the metadata id column to order/page by."""
+    match, where, params = parse_query(text)
+    if match:
+        sql = f'''SELECT {columns} FROM metadata_fts JOIN metadata m ON m.id = metadata_fts.rowid
+                  JOIN files f ON f.id = m.file_id WHERE metadata_fts MATCH ?'''
+        params = [match] + params
+        key = "metadata_fts.rowid"         # lets FTS5 seek to a page instead of filtering every match
+    elif where:
+        sql = f"SELECT {columns} FROM files f JOIN metadata m ON m.file_id = f.id WHERE 1"
+        key = "m.id"
+    else:
+        raise ValueError("empty query")
+    for clause in where: sql += f" AND {clause}"
+    return sql, params, key
+
+
+def search(store, text, limit=None, offset=0):
+    """Cursor over matching report rows (filename, key, value, md5, status) in storage order."""
+    sql, params, _ = build_sql(text)
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return store.conn.execute(sql, params)
+
+
+def page(store, text, limit, after=0, before=None):
+    """One page of matching rows (filename, key, value, md5, status, metadata id) in id order (see keyset_page)."""
+    sql, params, key = build_sql(text, ROW_COLUMNS + ", m.id")
+    return keyset_page(store.conn, sql, params, key, limit, after, before)
+
+
+def count(store, text, cap=None):
+    """Number of matching rows, stopping at `cap` so broad queries stay cheap."""
+    sql, params, _ = build_sql(text, columns="1")
+    if cap is not None:
+        sql += " LIMIT ?"
+        params.append(cap)
+    return store.conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
@@ -0,0 +1,189 @@
+"""Timeline normalization and case-wide timestamp anomaly rules.
+
+Every timestamp-bearing metadata key (EXIF, PDF, OOXML, PNG, archive entries)
+and the filesystem MAC times are parsed into UTC epoch seconds in the `events`
+table. The anomaly rules then run as set-based SQL over indexed events rather
+than per file in Python, and write their findings to `anomalies`.
+"""
+import re
+import time
+import datetime
+
+# metadata key -> (event kind, local wall-clock time without a zone?)
+EVENT_KEYS = {
+    "EXIF DateTimeOriginal": ("captured", True),
+    "EXIF DateTimeDigitized": ("digitized", True),
+    "Image DateTime": ("modified", True),
+    "PNG Modified": ("modified", True),
+    "CreationDate": ("created", False),
+    "ModDate": ("modified", False),
+    "Created": ("created", False),
+    "Modified": ("modified", False),
+    "LastPrinted": ("printed", False),
+    "GZip Modified": ("modified", False),
+    "Zip Oldest Entry": ("archive_oldest", True),
+    "Zip Newest Entry": ("archive_newest", True),
+}
+FS_EVENTS = (("mtime_ns", "fs_modified"), ("atime_ns", "fs_accessed"), ("ctime_ns", "fs_changed"))
+CREATED_MODIFIED = (("Created", "Modified"), ("CreationDate", "ModDate"), ("EXIF DateTimeOriginal", "Image DateTime"))
+CONTENT_KINDS = ("created", "captured", "digitized", "modified")
+BURST_KINDS = ("created", "captured", "modified")
+STATUS_RULES = ("created_after_modified", "time_stomp", "future_date")   # rules that also mark files FLAGGED
+
+TOLERANCE = 60              # seconds of clock noise ignored by every comparison
+TZ_SLACK = 14 * 3600        # extra slack when one side is local time of unknown zone
+SKEW_LIMIT = 86400          # EXIF capture vs filesystem mtime disagreement worth reporting
+BURST_WINDOW = 60           # seconds per burst bucket
+BURST_MIN = 50              # distinct files in one bucket that make it a burst
+
+STAMP = re.compile(r"(\d{4})[:-](\d{2})[:-](\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?)?\s*(Z|[+-]\d{2}:?\d{2})?$", re.I)
+PDF_STAMP = re.compile(r"D:(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?([Zz+-])?(\d{2})?'?(\d{2})?")
+
+
+# --- PARSING ---
+def parse_epoch(value):
+    """UTC epoch seconds from an EXIF, PDF (D:...), ISO 8601 or python datetime string, or None.
+
+    Values without a zone are taken as UTC.
+    """
+    if value is None: return None
+    value = str(value).strip()
+    if value.startswith("D:"):
+        m = PDF_STAMP.match(value)
+        if not m: return None
+        parts = [int(p) if p else d for p, d in zip(m.groups()[:6], (0, 1, 1, 0, 0, 0))]
+        offset = (int(m.group(8) or 0) * 60 + int(m.group(9) or 0)) * (-1 if m.group(7) == "-" else 1)
+    else:
+        m = STAMP.match(value)
+        if not m: return None
+        parts = [int(p) if p else 0 for p in m.groups()[:6]]
+        zone = m.group(7)
+        offset = 0
+        if zone and zone.upper() != "Z":
+            digits = zone[1:].replace(":", "")
+            offset = (int(digits[:2]) * 60 + int(digits[2:])) * (-1 if zone[0] == "-" else 1)
+    try: dt = datetime.datetime(*parts, tzinfo=datetime.timezone.utc)
+    except ValueError: return None
+    return int(dt.timestamp()) - offset * 60
+
+
+def parse_time(value):
+    """Aware UTC datetime for parse_epoch(value), or None."""
+    epoch = parse_epoch(value)
+    if epoch is None: return None
+    try: return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc)
+    except (OverflowError, OSError, ValueError): return None
+
+
+def created_after_modified(meta, tolerance=TOLERANCE):
+    """True when a document/image claims to have been created after it was last modified."""
+    for created_key, modified_key in CREATED_MODIFIED:
+        created, modified = parse_epoch(meta.get(created_key)), parse_epoch(meta.get(modified_key))
+        if created is not None and modified is not None and created > modified + tolerance: return True
+    return False
+
+
+# --- TIMELINE ENGINE ---
+class Timeline:
+    """Rebuilds `events` from the stored metadata and runs the anomaly rules into `anomalies`."""
+
+    def __init__(self, store, tolerance=TOLERANCE, skew=SKEW_LIMIT, burst_window=BURST_WINDOW, burst_min=BURST_MIN):
+        self.conn = store.conn
+        self.tolerance = tolerance
+        self.skew = skew
+        self.burst_window = burst_window
+        self.burst_min = burst_min
+        self.conn.create_function("parse_epoch", 1, parse_epoch, deterministic=True)
+
+    def run(self, now=None):
+        """Rebuilds events and anomalies in one transaction; returns {"events": n, rule: hits}."""
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            counts = {"events": self.build()}
+            counts.update(self.detect(int(time.time()) if now is None else now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return counts
+
+    def build(self):
+        """Refills `events`; its indexes are dropped during the bulk insert and rebuilt by sorting afterwards."""
+        conn = self.conn
+        indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'events' AND sql IS NOT NULL").fetchall()
+        for name, _ in indexes: conn.execute(f"DROP INDEX {name}")
+        conn.execute("DELETE FROM events")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS event_keys (key TEXT PRIMARY KEY, kind TEXT, local INTEGER)")
+        conn.execute("DELETE FROM temp.event_keys")
+        conn.executemany("INSERT INTO temp.event_keys VALUES (?, ?, ?)",
+                         ((k, kind, int(local)) for k, (kind, local) in EVENT_KEYS.items()))
+        conn.execute('''INSERT INTO events (file_id, source, kind, ts, local)
+                        SELECT m.file_id, m.key, k.kind, parse_epoch(m.value) AS ts, k.local
+                        FROM temp.event_keys k JOIN metadata m ON m.key = k.key WHERE ts IS NOT NULL''')
+        for column, kind in FS_EVENTS:
+            local = "mtime_local" if column == "mtime_ns" else "0"      # zip member times are DOS local time
+            conn.execute(f'''INSERT INTO events (file_id, source, kind, ts, local)
+                             SELECT id, '{column}', '{kind}', {column} / 1000000000, {local} FROM files
+                             WHERE {column} IS NOT NULL''')
+        conn.execute("DROP TABLE temp.event_keys")
+        for _, sql in indexes: conn.execute(sql)
+        return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def detect(self, now):
+        conn = self.conn
+        conn.execute("DELETE FROM anomalies")
+        tol, slack = self.tolerance, TZ_SLACK
+        content = ", ".join(f"'{k}'" for k in CONTENT_KINDS)
+        fmt = lambda col: f"datetime({col}, 'unixepoch')"
+        # CROSS JOIN pins the join order: scan one event kind, then look up its partner by (file_id, kind)
+        rules = {
+            "future_date": (f'''SELECT file_id, source || ' = ' || {fmt('ts')} AS detail FROM events
+                                WHERE ts > ? + ? + local * ?''', (now, tol, slack)),
+            "created_after_modified": (f'''SELECT c.file_id, c.source || ' ' || {fmt('c.ts')} || ' after ' || m.source || ' ' || {fmt('m.ts')} AS detail
+                                           FROM events c CROSS JOIN events m ON m.file_id = c.file_id AND m.kind = 'modified'
+                                           WHERE c.kind IN ('created', 'captured') AND c.local = m.local AND c.ts > m.ts + ?''', (tol,)),
+            "time_stomp": (f'''SELECT f.file_id, 'mtime ' || {fmt('f.ts')} || ' before ' || c.source || ' ' || {fmt('c.ts')} AS detail
+                               FROM events c CROSS JOIN events f ON f.file_id = c.file_id AND f.kind = 'fs_modified'
+                               WHERE c.kind IN ({content}) AND c.ts > f.ts + ? + max(c.local, f.local) * ?''', (tol, slack)),
+            "exif_fs_skew": (f'''SELECT c.file_id, 'capture ' || {fmt('c.ts')} || ' vs mtime ' || {fmt('f.ts')}
+                                     || printf(' (%.1f h)', (f.ts - c.ts) / 3600.0) AS detail
+                                 FROM events c CROSS JOIN events f ON f.file_id = c.file_id AND f.kind = 'fs_modified'
+                                 WHERE c.kind = 'captured' AND abs(f.ts - c.ts) > ? + max(c.local, f.local) * ?''', (self.skew, slack)),
+            "burst": (f'''SELECT DISTINCT e.file_id, e.kind || ': ' || b.n || ' files within {self.burst_window}s of '
+                              || {fmt(f'b.bucket * {self.burst_window}')} AS detail
+                          FROM (SELECT kind, ts / {self.burst_window} AS bucket, COUNT(DISTINCT file_id) AS n FROM events
+                                WHERE kind IN ({", ".join(f"'{k}'" for k in BURST_KINDS)})
+                                GROUP BY kind, bucket HAVING n >= ?) b
+                          JOIN events e ON e.kind = b.kind AND e.ts >= b.bucket * {self.burst_window}
+                                       AND e.ts < (b.bucket + 1) * {self.burst_window}''', (self.burst_min,)),
+        }
+        counts = {}
+        for rule, (select, params) in rules.items():
+            cur = conn.execute(f"INSERT INTO anomalies (file_id, rule, detail) SELECT file_id, '{rule}', detail FROM ({select})", params)
+            counts[rule] = cur.rowcount
+        marks = ", ".join("?" * len(STATUS_RULES))
+        conn.execute(f'''UPDATE files SET anomaly_flag = 'FLAGGED' WHERE anomaly_flag = 'SECURE'
+                         AND id IN (SELECT file_id FROM anomalies WHERE rule IN ({marks}))''', STATUS_RULES)
+        return counts
+
+    # --- QUERIES ---
+    def events(self, start=None, end=None, limit=None):
+        """(utc time, kind, source, path) in time order, optionally within [start, end) epoch seconds."""
+        sql = '''SELECT datetime(e.ts, 'unixepoch'), e.kind, e.source, f.path FROM events e JOIN files f ON f.id = e.file_id
+                 WHERE e.ts >= ? AND e.ts < ? ORDER BY e.ts'''
+        params = [-(1 << 62) if start is None else start, 1 << 62 if end is None else end]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params)
+
+    def anomalies(self, rule=None, limit=None):
+        """(rule, path, detail) findings, optionally for one rule."""
+        sql = '''SELECT a.rule, f.path, a.detail FROM anomalies a JOIN files f ON f.id = a.file_id
+                 WHERE ? IS NULL OR a.rule = ? ORDER BY a.rule, f.path'''
+        params = [rule, rule]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params)
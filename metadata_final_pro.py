@@ -1,13 +1,11 @@
 import os
 import datetime
-import hashlib
-import csv
 import logging
-import sqlite3
-import smtplib
+import argparse
 import random
 import string
-import platform
+import queue
+import time
 import threading
 import webbrowser
 from tkinter import filedialog, messagebox, Listbox, END, Canvas, simpledialog, LEFT
@@ -15,33 +13,29 @@ from tkinter import filedialog, messagebox, Listbox, END, Canvas, simpledialog,
 # UI Libraries - FIXED IMPORTS
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from ttkbootstrap.tableview import Tableview
-
-# Forensic Libraries
-import exifread
-import PyPDF2
-import docx
-import openpyxl 
-from pptx import Presentation 
-import mutagen   
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-import zipfile
-
-# --- 1. LOGGING & DATABASE SETUP ---
-if not os.path.exists("logs"): os.makedirs("logs")
-logging.basicConfig(
-    filename='logs/forensic_ops.log',
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s'
-)
-
-conn = sqlite3.connect('forensic_data.db')
-c = conn.cursor()
-c.execute('''CREATE TABLE IF NOT EXISTS metadata 
-             (filename TEXT, file_type TEXT, key TEXT, value TEXT, md5_hash TEXT, anomaly_flag TEXT)''')
-conn.commit()
+
+# Headless core (shared with forensic_cli.py)
+from forensic_core import ForensicEngine, setup_logging, LOG_DIR
+from forensic_db import ForensicStore, DB_PATH, MAX_ID
+from forensic_correlate import Correlator
+from forensic_timeline import Timeline
+from forensic_archives import DEFAULT_LIMITS
+from forensic_sandbox import DEFAULT_SANDBOX
+from forensic_scan import scan
+import forensic_reports as reports
+import forensic_search as search
+import forensic_metrics
+
+LISTBOX_BATCH = 1000    # max scanned paths per file-list update sent by the worker
+POLL_MS = 100           # how often the UI drains the worker's event queue
+PROGRESS_INTERVAL = 0.2 # min seconds between progress events from the worker
+TABLE_REFRESH = 1.0     # min seconds between result-table reloads after the worker flushes a batch
+PAGE_SIZE = 100         # result rows fetched from SQLite per table page
+SEARCH_DELAY_MS = 250   # debounce between the last keystroke and running the search
+SEARCH_COUNT_CAP = 10000
+SPLASH_MS = 3000        # splash duration (--no-splash skips it, a click or key press cuts it short)
+PROJECT_INFO = "Project_Info.html"
+COLUMNS = (("FILENAME", 220), ("METADATA KEY", 180), ("VALUE", 360), ("INTEGRITY (MD5)", 240), ("STATUS", 90))
 
 # --- 2. MATRIX RAIN ANIMATION ---
 class MatrixRain(tb.Toplevel):
@@ -73,22 +67,43 @@ class MatrixRain(tb.Toplevel):
 
 # --- 3. MAIN APPLICATION ---
 class UltimateForensicTool(tb.Window):
-    def __init__(self):
+    def __init__(self, store, splash=True):
         super().__init__(themename="cyborg")
-        self.withdraw()
-        self.splash = MatrixRain(self)
-        self.after(3000, self.start_app) 
+        self.store = store
+        self.splash = None
         self.title("METADATA INTERCEPTOR // FINAL BUILD")
         self.geometry("1400x900")
         self.files_data = []
-        
-        # GENERATE THE HTML INFO FILE ON STARTUP
-        self.generate_html_info()
+        self.queued = set()             # O(1) duplicate check for files_data paths
+        self.worker = None              # background analysis thread while one is running
+        self.scanning = False           # the worker is still enumerating a folder (total not final)
+        self.events = queue.Queue()     # worker -> UI messages, drained by poll_worker()
+        self.cancel_event = threading.Event()
+        self.page_no = 0                # None after jumping to the end of a capped search
+        self.page_after = 0             # keyset of the page on screen: its rows have metadata id > page_after
+        self.page_ids = None            # (first, last) metadata id on screen, None when empty
+        self.row_total = None           # cached row/match count; None when stale
+        self.table_dirty = False        # the worker flushed rows since the last table reload
+        self.query = ""                 # active search; empty shows every row
+        self.search_job = None
+        self.last_refresh = 0.0
+        if splash:
+            self.withdraw()
+            self.splash = MatrixRain(self)
+            self.splash.bind("<Button-1>", lambda _: self.start_app())
+            self.splash.bind("<Key>", lambda _: self.start_app())
+            self.splash.focus_force()
+            self.after(SPLASH_MS, self.start_app)
+        else:
+            self.start_app()
 
     def start_app(self):
-        self.splash.is_running = False
-        self.splash.destroy()
-        self.deiconify()
+        if self.splash is not None:
+            self.splash.is_running = False
+            self.splash.destroy()
+            self.splash = None
+            self.deiconify()
+        elif hasattr(self, "term"): return      # splash was already dismissed by a click/key
         self.create_gui()
         self.log("SYSTEM ONLINE. DATABASE CONNECTED.")
 
@@ -111,6 +126,7 @@ class UltimateForensicTool(tb.Window):
         tb.Button(sidebar, text="[+] ADD FILE(S)", bootstyle="outline-info", command=self.add_files, width=22).pack(pady=5)
         tb.Button(sidebar, text="[#] SCAN FOLDER", bootstyle="outline-warning", command=self.scan_folder, width=22).pack(pady=5) 
         tb.Button(sidebar, text="[>] EXECUTE ANALYSIS", bootstyle="outline-success", command=self.process_data, width=22).pack(pady=5)
+        tb.Button(sidebar, text="[-] CANCEL ANALYSIS", bootstyle="outline-secondary", command=self.cancel_analysis, width=22).pack(pady=5)
         tb.Button(sidebar, text="[x] FLUSH DATABASE", bootstyle="outline-danger", command=self.clear_data, width=22).pack(pady=5)
 
         tb.Separator(sidebar, orient=HORIZONTAL).pack(fill=X, pady=20)
@@ -139,10 +155,36 @@ class UltimateForensicTool(tb.Window):
         tb.Label(sf, text=">> SEARCH DB: ", font=("Consolas", 10, "bold"), bootstyle="success").pack(side=LEFT)
         self.search_var = tb.StringVar()
         tb.Entry(sf, textvariable=self.search_var, font=("Consolas", 10)).pack(side=LEFT, fill=X, expand=YES)
-
-        cols = [{"text": "FILENAME", "stretch": True}, {"text": "METADATA KEY", "stretch": True}, {"text": "VALUE", "stretch": True}, {"text": "INTEGRITY (MD5)", "width": 120}, {"text": "STATUS", "width": 80}]
-        self.table = Tableview(master=dash, coldata=cols, rowdata=[], paginated=True, pagesize=18, bootstyle="info", stripecolor="#222")
-        self.table.pack(fill=BOTH, expand=YES)
+        self.search_var.trace_add("write", self.on_search)
+
+        pf = tb.Frame(dash)
+        pf.pack(fill=X, pady=(0, 10))
+        self.progress = tb.Progressbar(pf, bootstyle="success-striped", maximum=1, value=0)
+        self.progress.pack(side=LEFT, fill=X, expand=YES)
+        self.progress_var = tb.StringVar(value="IDLE")
+        tb.Label(pf, textvariable=self.progress_var, font=("Consolas", 9), bootstyle="success", width=52).pack(side=LEFT, padx=(10, 0))
+
+        # Result table: a plain Treeview showing one page at a time, fetched from SQLite
+        tf = tb.Frame(dash)
+        tf.pack(fill=BOTH, expand=YES)
+        self.table = tb.Treeview(tf, columns=[c for c, _ in COLUMNS], show="headings", bootstyle="info")
+        for col, width in COLUMNS:
+            self.table.heading(col, text=col)
+            self.table.column(col, width=width, stretch=True)
+        vsb = tb.Scrollbar(tf, orient=VERTICAL, command=self.table.yview)
+        self.table.configure(yscrollcommand=vsb.set)
+        self.table.pack(side=LEFT, fill=BOTH, expand=YES)
+        vsb.pack(side=LEFT, fill=Y)
+
+        nav = tb.Frame(dash)
+        nav.pack(fill=X, pady=5)
+        tb.Button(nav, text="<<", bootstyle="info-outline", command=lambda: self.show_page("first"), width=4).pack(side=LEFT, padx=2)
+        tb.Button(nav, text="<", bootstyle="info-outline", command=lambda: self.show_page("prev"), width=4).pack(side=LEFT, padx=2)
+        tb.Button(nav, text=">", bootstyle="info-outline", command=lambda: self.show_page("next"), width=4).pack(side=LEFT, padx=2)
+        tb.Button(nav, text=">>", bootstyle="info-outline", command=lambda: self.show_page("last"), width=4).pack(side=LEFT, padx=2)
+        self.page_var = tb.StringVar(value="PAGE 1 / 1")
+        tb.Label(nav, textvariable=self.page_var, font=("Consolas", 9), bootstyle="info").pack(side=LEFT, padx=10)
+        self.show_page("first")
 
         tb.Label(dash, text=">> LIVE_SYSTEM_LOGS", font=("Consolas", 11, "bold"), bootstyle="warning").pack(anchor="w")
         self.term = tb.Text(dash, height=8, bg="black", fg="#0F0", font=("Consolas", 9), state='disabled')
@@ -159,7 +201,6 @@ class UltimateForensicTool(tb.Window):
 
     # --- HTML PROJECT INFO GENERATOR ---
     def generate_html_info(self):
-        def generate_html_info(self):
         """Creates a beautiful, dark-themed HTML file that matches the screenshots"""
         html_content = """
         <!DOCTYPE html>
@@ -251,168 +292,224 @@ class UltimateForensicTool(tb.Window):
             </div>
         </body>
         </html>
-        """        try:
-            with open("Project_Info.html", "w", encoding="utf-8") as f: f.write(html_content)
+        """
+        try:
+            with open(PROJECT_INFO, "w", encoding="utf-8") as f: f.write(html_content)
         except Exception as e: logging.error(f"HTML Gen Error: {e}")
 
     def open_project_info(self):
-        filename = "Project_Info.html"
-        full_path = os.path.abspath(filename)
-        if os.path.exists(filename):
-            try:
-                webbrowser.open(f'file://{full_path}')
-                self.log("OPENING PROJECT INFO IN BROWSER...")
-            except: messagebox.showerror("Error", "Could not open Browser.")
-        else:
-            self.generate_html_info()
+        """Writes Project_Info.html the first time it is asked for, then opens it."""
+        full_path = os.path.abspath(PROJECT_INFO)
+        if not os.path.exists(PROJECT_INFO): self.generate_html_info()
+        try:
             webbrowser.open(f'file://{full_path}')
+            self.log("OPENING PROJECT INFO IN BROWSER...")
+        except: messagebox.showerror("Error", "Could not open Browser.")
 
     # --- FORENSIC LOGIC ---
-    def validate_signature(self, file_path):
-        try:
-            ext = os.path.splitext(file_path)[1].lower()
-            with open(file_path, 'rb') as f:
-                header = f.read(4).hex()
-                if ext == '.jpg' and header.startswith('ffd8'): return True
-                if ext == '.pdf' and header.startswith('2550'): return True
-                if ext in ['.docx', '.xlsx', '.pptx', '.zip'] and header.startswith('504b'): return True
-            return True 
-        except: return False
-
-    def get_hashes(self, file_path):
-        md5 = hashlib.md5()
-        try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""): md5.update(chunk)
-            return md5.hexdigest(), "SHA-Calculated"
-        except: return "ERROR", "ERROR"
-
     def add_files(self):
-        paths = filedialog.askopenfilenames()
-        for p in paths: self.queue_file(p)
+        self.queue_files(filedialog.askopenfilenames())
 
     def scan_folder(self): 
         folder = filedialog.askdirectory()
-        if folder:
-            self.log(f"SCANNING: {folder}")
-            for root, _, files in os.walk(folder):
-                for file in files: self.queue_file(os.path.join(root, file))
+        if not folder: return
+        if self.worker: return self.log("ANALYSIS ALREADY RUNNING.")
+        self.log(f"SCANNING AND ANALYZING: {folder}")
+        self.start_worker(self.scanned(folder))
+
+    def scanned(self, folder):
+        """Runs on the worker thread: streams scan() into the engine, sending found paths to the UI in batches."""
+        batch, last = [], time.monotonic()
+        try:
+            for path in scan([folder], workers=8):
+                batch.append(path)
+                yield path
+                if len(batch) >= LISTBOX_BATCH or time.monotonic() - last >= PROGRESS_INTERVAL:
+                    self.events.put(("queued", batch))
+                    batch, last = [], time.monotonic()
+        finally:
+            self.events.put(("queued", batch))
+            self.events.put(("scanned", None))
 
     def queue_file(self, path):
-        if not any(d['path'] == path for d in self.files_data):
-            self.files_data.append({"path": path})
-            self.file_list.insert(END, f"> {os.path.basename(path)}")
+        self.queue_files([path])
+
+    def queue_files(self, paths):
+        """Queues unseen paths and adds them to the Listbox in a single insert."""
+        fresh = [p for p in paths if p not in self.queued]
+        if not fresh: return
+        self.queued.update(fresh)
+        self.files_data.extend({"path": p} for p in fresh)
+        self.file_list.insert(END, *(f"> {os.path.basename(p)}" for p in fresh))
 
     def process_data(self):
         if not self.files_data: return
+        if self.worker: return self.log("ANALYSIS ALREADY RUNNING.")
         self.log("EXECUTING ANALYSIS...")
-        self.table.delete_rows()
-        c.execute("DELETE FROM metadata")
-        correlation = {}
-        for f_obj in self.files_data:
-            path = f_obj["path"]
-            fname = os.path.basename(path)
-            md5, _ = self.get_hashes(path)
-            status = "SECURE" if self.validate_signature(path) else "SPOOFED?"
-            meta = {}
-            ext = os.path.splitext(path)[1].lower()
-            try:
-                if ext in ['.jpg', '.png']:
-                    with open(path, 'rb') as f:
-                        tags = exifread.process_file(f)
-                        for k, v in tags.items(): 
-                            if k not in ['JPEGThumbnail', 'Filename', 'EXIF MakerNote']: meta[str(k)] = str(v)
-                elif ext == '.pdf':
-                    with open(path, 'rb') as f:
-                        pdf = PyPDF2.PdfReader(f)
-                        if pdf.metadata: 
-                            for k, v in pdf.metadata.items(): meta[k.replace('/', '')] = str(v)
-                elif ext == '.docx':
-                    doc = docx.Document(path)
-                    meta['Author'] = doc.core_properties.author
-                    meta['Created'] = str(doc.core_properties.created)
-                elif ext == '.xlsx':
-                    wb = openpyxl.load_workbook(path)
-                    meta['Author'] = wb.properties.creator
-            except Exception as e: meta['Error'] = str(e)
-
-            if 'Created' in meta and 'Modified' in meta:
-                if str(meta.get('Created')) > str(meta.get('Modified')): status = "FLAGGED"
-
-            for k, v in meta.items():
-                if v:
-                    c.execute("INSERT INTO metadata VALUES (?, ?, ?, ?, ?, ?)", (fname, ext, k, str(v), md5, status))
-                    self.table.insert_row(values=(fname, k, v, md5, status))
-                    if k in ['Author', 'Creator']:
-                        if (k,v) not in correlation: correlation[(k,v)] = []
-                        correlation[(k,v)].append(fname)
-        conn.commit()
-        self.table.load_table_data()
-        for (k, v), files in correlation.items():
-            if len(files) > 1: self.log(f"LINK: {k}='{v}' SHARED BY {len(files)} FILES")
-        self.log("ANALYSIS COMPLETE.")
+        self.start_worker([d["path"] for d in self.files_data], len(self.files_data))
+
+    def start_worker(self, paths, total=None):
+        """Starts the analysis thread; `paths` may be a lazy scan (total=None), consumed on that thread."""
+        self.cancel_event.clear()
+        self.total, self.scanning = total or 0, total is None
+        self.progress.configure(maximum=max(self.total, 1), value=0)
+        self.started = time.monotonic()
+        self.worker = threading.Thread(target=self.analysis_worker, args=(paths,), daemon=True)
+        self.worker.start()
+        self.after(POLL_MS, self.poll_worker)
+
+    def analysis_worker(self, paths):
+        """Background thread: runs the engine on its own DB connection and reports via self.events only."""
+        worker_store = ForensicStore(self.store.path)
+        worker_store.on_flush = lambda: self.events.put(("flushed", None))
+        forensic_metrics.REGISTRY.reset()
+        try:
+            engine = ForensicEngine(worker_store, workers=os.cpu_count() or 1, archives=DEFAULT_LIMITS, sandbox=DEFAULT_SANDBOX)
+            results = engine.process(paths)
+            done, last = 0, 0.0
+            for _ in results:
+                done += 1
+                if self.cancel_event.is_set():
+                    results.close()
+                    if hasattr(paths, "close"): paths.close()      # stops a folder scan still feeding the engine
+                    break
+                now = time.monotonic()
+                if now - last >= PROGRESS_INTERVAL:
+                    self.events.put(("progress", done))
+                    last = now
+            self.events.put(("progress", done))
+            if engine.stats["errors"]: self.events.put(("log", f"FAILED FILES: {engine.stats['errors']} (forensic_cli.py errors lists them)"))
+            if self.cancel_event.is_set():
+                return self.events.put(("done", f"ANALYSIS CANCELLED AFTER {done} FILES."))
+            correlator = Correlator(worker_store)
+            correlator.run()
+            for _, rule, signature, size in correlator.groups(limit=50):
+                self.events.put(("log", f"LINK: {rule}='{signature}' SHARED BY {size} FILES"))
+            counts = Timeline(worker_store).run()
+            self.events.put(("log", "TIMELINE: " + ", ".join(f"{k}={n}" for k, n in counts.items())))
+            for line in forensic_metrics.summary(n=5): self.events.put(("log", line))
+            self.events.put(("done", "ANALYSIS COMPLETE."))
+        except Exception as e:
+            if hasattr(paths, "close"): paths.close()
+            self.events.put(("done", f"ANALYSIS ERROR: {e}"))
+        finally:
+            worker_store.close()
+
+    def poll_worker(self):
+        try:
+            while True:
+                kind, payload = self.events.get_nowait()
+                if kind == "progress": self.show_progress(payload)
+                elif kind == "queued":
+                    self.total += len(payload)
+                    self.queue_files(payload)
+                elif kind == "scanned":
+                    self.scanning = False
+                    self.log(f"SCAN COMPLETE: {self.total} FILES FOUND")
+                elif kind == "flushed": self.table_dirty = True
+                elif kind == "log": self.log(payload)
+                elif kind == "done":
+                    self.worker = None
+                    self.table_dirty = True
+                    self.log(payload)
+        except queue.Empty:
+            pass
+        if self.table_dirty and (self.worker is None or time.monotonic() - self.last_refresh >= TABLE_REFRESH):
+            self.table_dirty, self.row_total = False, None
+            self.show_page("reload")
+        if self.worker is not None: self.after(POLL_MS, self.poll_worker)
+
+    def show_progress(self, done):
+        total = self.total
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = str(datetime.timedelta(seconds=int((total - done) / rate))) if rate and not self.scanning else "--:--:--"
+        self.progress.configure(maximum=max(total, done, 1), value=done)
+        self.progress_var.set(f"{done}/{total}{'+' if self.scanning else ''} FILES | {rate:.1f} FILES/S | ETA {eta}")
+
+    def cancel_analysis(self):
+        if self.worker:
+            self.cancel_event.set()
+            self.log("CANCELLING ANALYSIS...")
+
+    def show_page(self, move="reload"):
+        """Loads one PAGE_SIZE slice of report (or search) rows: move is "first", "prev", "next", "last" or "reload".
+
+        Pages are keyed on the metadata ids of the rows on screen, so a deep page costs
+        the same as the first. The count behind "PAGE n / N" is only re-run when
+        row_total was reset (new search, flushed batch, cleared database).
+        """
+        try:
+            if self.row_total is None:
+                self.row_total = search.count(self.store, self.query, SEARCH_COUNT_CAP) if self.query else self.store.row_count()
+            total = self.row_total
+            pages = max(1, -(-total // PAGE_SIZE))
+            capped = bool(self.query) and total >= SEARCH_COUNT_CAP
+            page_no = self.page_no
+            if move == "next" and self.page_ids:
+                rows = self.fetch_rows(PAGE_SIZE, after=self.page_ids[1])
+                if not rows: return                                     # already on the last page
+                if page_no is not None: page_no += 1
+            elif move == "prev" and self.page_ids and page_no != 0:
+                rows = self.fetch_rows(PAGE_SIZE, before=self.page_ids[0])
+                if page_no is not None: page_no -= 1
+                if len(rows) < PAGE_SIZE: rows, page_no = self.fetch_rows(PAGE_SIZE), 0      # reached the start
+            elif move == "last":
+                page_no = None if capped else pages - 1
+                size = PAGE_SIZE if capped else total - (pages - 1) * PAGE_SIZE
+                rows = self.fetch_rows(size or PAGE_SIZE, before=MAX_ID)
+            elif move == "reload":
+                rows = self.fetch_rows(PAGE_SIZE, after=self.page_after)
+            else:
+                rows, page_no = self.fetch_rows(PAGE_SIZE), 0
+        except Exception as e:
+            self.page_var.set(f"SEARCH ERROR: {e}")
+            return
+        self.page_no = page_no
+        self.page_ids = (rows[0][-1], rows[-1][-1]) if rows else None
+        self.page_after = rows[0][-1] - 1 if rows else 0
+        with forensic_metrics.REGISTRY.timer("gui_page"):
+            self.table.delete(*self.table.get_children())
+            for row in rows: self.table.insert("", END, values=row[:-1])
+        shown = "?" if page_no is None else page_no + 1
+        if self.query:
+            more = "+" if capped else ""
+            self.page_var.set(f"PAGE {shown} / {pages}{more} ({total}{more} MATCHES)")
+        else:
+            self.page_var.set(f"PAGE {shown} / {pages}")
+        self.last_refresh = time.monotonic()
+
+    def fetch_rows(self, limit, after=0, before=None):
+        if self.query: return search.page(self.store, self.query, limit, after, before)
+        return self.store.page(limit, after, before)
+
+    def on_search(self, *_):
+        if self.search_job: self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.query = self.search_var.get().strip()
+        self.row_total = None
+        self.show_page("first")
 
     def clear_data(self):
+        if self.worker: return self.log("CANCEL THE RUNNING ANALYSIS BEFORE FLUSHING.")
         self.files_data = []
+        self.queued.clear()
         self.file_list.delete(0, END)
-        self.table.delete_rows()
-        c.execute("DELETE FROM metadata")
-        conn.commit()
+        self.store.clear()
+        self.row_total = None
+        self.show_page("first")
+        self.progress.configure(value=0)
+        self.progress_var.set("IDLE")
         self.log("MEMORY CLEARED.")
 
     def export_pdf(self):
         try:
             path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], title="Save Report")
             if not path: return
-
-            report_data = {}
-            for row in c.execute("SELECT * FROM metadata"):
-                fname = row[0]
-                key = row[2]
-                val = row[3]
-                file_hash = row[4]
-                status = row[5]
-                if fname not in report_data:
-                    report_data[fname] = {"entries": [], "hash": file_hash, "status": status}
-                report_data[fname]["entries"].append((key, val))
-
-            c_pdf = canvas.Canvas(path, pagesize=letter)
-            width, height = letter
-            y_pos = height - 50 
-            
-            c_pdf.setFont("Helvetica-Bold", 16)
-            c_pdf.drawCentredString(width / 2, y_pos, "Metadata Extraction & Correlation Report")
-            y_pos -= 20
-            
-            c_pdf.setFont("Helvetica", 9)
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            sys_info = f"{platform.system()} {platform.release()}"
-            c_pdf.drawCentredString(width / 2, y_pos, f"Generated on: {timestamp} | System: {sys_info}")
-            y_pos -= 40 
-
-            for filename, data in report_data.items():
-                if y_pos < 100:
-                    c_pdf.showPage()
-                    y_pos = height - 50
-                
-                c_pdf.setFont("Helvetica-Bold", 12)
-                c_pdf.drawString(40, y_pos, f"File: {filename} [{data['status']}]")
-                y_pos -= 15
-                c_pdf.setFont("Helvetica", 10)
-                c_pdf.drawString(60, y_pos, f"- MD5 Hash: {data['hash']}")
-                y_pos -= 15
-
-                for key, val in data["entries"]:
-                    if y_pos < 50: 
-                        c_pdf.showPage()
-                        y_pos = height - 50
-                        c_pdf.setFont("Helvetica", 10)
-                    display_val = (val[:80] + '...') if len(val) > 80 else val
-                    c_pdf.drawString(60, y_pos, f"- {key}: {display_val}")
-                    y_pos -= 15
-                y_pos -= 10 
-
-            c_pdf.save()
+            reports.export_pdf(self.store, path)
             self.log(f"PDF REPORT GENERATED: {path}")
             messagebox.showinfo("Success", "Professional PDF Report Generated!")
         except Exception as e:
@@ -422,78 +519,16 @@ class UltimateForensicTool(tb.Window):
     def export_csv(self):
         path = filedialog.asksaveasfilename(defaultextension=".csv")
         if path:
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                w = csv.writer(f)
-                w.writerow(["File", "Type", "Key", "Value", "Hash", "Status"])
-                for row in c.execute("SELECT * FROM metadata"): w.writerow(row)
+            reports.export_csv(self.store, path)
             self.log("CSV EXPORTED.")
 
-    # --- UPDATED & FIXED HTML EXPORT ---
     def export_html(self):
         path = filedialog.asksaveasfilename(defaultextension=".html")
         if path:
-            # 1. Start Building HTML String
-            html = """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { background-color: #121212; color: #00ff00; font-family: Consolas, monospace; padding: 20px; }
-                    h1 { border-bottom: 2px solid #00ff00; padding-bottom: 10px; }
-                    table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-                    th, td { border: 1px solid #333; padding: 10px; text-align: left; }
-                    th { background-color: #1e1e1e; color: #fff; }
-                    tr:nth-child(even) { background-color: #1a1a1a; }
-                    .flag { color: red; font-weight: bold; }
-                </style>
-            </head>
-            <body>
-                <h1>METADATA FORENSIC INVESTIGATION REPORT</h1>
-                <p>Generated by: Metadata Interceptor Tool</p>
-                <p>Date: """ + str(datetime.datetime.now()) + """</p>
-                <table>
-                    <tr>
-                        <th>Filename</th>
-                        <th>File Type</th>
-                        <th>Metadata Key</th>
-                        <th>Value</th>
-                        <th>MD5 Hash</th>
-                        <th>Status</th>
-                    </tr>
-            """
-            
-            # 2. Fetch DATA from Database and Append Rows
             try:
-                for row in c.execute("SELECT * FROM metadata"):
-                    # Check if status is flagged to color it red
-                    status_class = "flag" if "FLAGGED" in row[5] or "SPOOFED" in row[5] else ""
-                    
-                    html += f"""
-                        <tr>
-                            <td>{row[0]}</td>
-                            <td>{row[1]}</td>
-                            <td>{row[2]}</td>
-                            <td>{row[3]}</td>
-                            <td>{row[4]}</td>
-                            <td class="{status_class}">{row[5]}</td>
-                        </tr>
-                    """
-                
-                # 3. Close Tags
-                html += """
-                    </table>
-                </body>
-                </html>
-                """
-                
-                # 4. Write to File
-                with open(path, "w", encoding='utf-8') as f:
-                    f.write(html)
-                
+                reports.export_html(self.store, path)
                 self.log(f"HTML REPORT EXPORTED TO: {path}")
-                # Optional: Open automatically
                 webbrowser.open(f'file://{os.path.abspath(path)}')
-                
             except Exception as e:
                 self.log(f"EXPORT ERROR: {e}")
                 messagebox.showerror("Error", str(e))
@@ -501,6 +536,17 @@ class UltimateForensicTool(tb.Window):
     def email_report(self):
         messagebox.showinfo("Email", "Secure Report Sent (Simulation)")
 
+def main(argv=None):
+    """Explicit startup: logging and the evidence DB are opened here, never at import time."""
+    parser = argparse.ArgumentParser(description="Metadata Interceptor GUI")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite evidence database (default: %(default)s)")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="directory for forensic_ops.log (default: %(default)s)")
+    parser.add_argument("--no-splash", action="store_true", help="open the main window immediately")
+    args = parser.parse_args(argv)
+    setup_logging(args.log_dir)
+    app = UltimateForensicTool(ForensicStore(args.db), splash=not args.no_splash)
+    app.mainloop()
+    app.store.close()
+
 if __name__ == "__main__":
-    app = UltimateForensicTool()
-    app.mainloop()
\ No newline at end of file
+    main()
\ No newline at end of file
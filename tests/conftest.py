@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pdf_bytes(info, objects=(), trailer=b""):
+    """Minimal classic-xref PDF with an /Info dictionary (`info` is the raw '<< ... >>' body)."""
+    bodies = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [] /Count 0 >>", info] + list(objects)
+    out, offsets = bytearray(b"%PDF-1.7\n"), []
+    for num, body in enumerate(bodies, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(bodies) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R %s>>\nstartxref\n%d\n%%%%EOF\n" % (len(bodies) + 1, trailer, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def store(tmp_path):
+    from forensic_db import ForensicStore
+    s = ForensicStore(str(tmp_path / "evidence.db"))
+    yield s
+    s.close()
@@ -0,0 +1,97 @@
+import io
+import gzip
+import tarfile
+import zipfile
+import hashlib
+
+from conftest import pdf_bytes
+from forensic_archives import ArchiveLimits, DEFAULT_LIMITS, archive_kind, expand_archive
+from forensic_core import analyze_file
+
+
+def zip_bytes(members, date=(2024, 3, 5, 10, 0, 0)):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members: zf.writestr(zipfile.ZipInfo(name, date), data)
+    return buf.getvalue()
+
+
+def tar_bytes(members, mtime=1_700_000_000):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime = len(data), mtime
+            tf.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def expand(data, path="/ev/case.zip", limits=DEFAULT_LIMITS):
+    return expand_archive(path, data[:512], data, limits=limits)
+
+
+def test_nested_virtual_paths_and_digests():
+    doc = pdf_bytes(b"<< /Author (Alice) >>")
+    inner = zip_bytes([("deep/doc.pdf", doc)])
+    children, warning = expand(zip_bytes([("a.txt", b"hello"), ("/inner.zip", inner)]))
+    assert warning is None
+    paths = [c["path"] for c in children]
+    assert paths == ["/ev/case.zip!/a.txt", "/ev/case.zip!/inner.zip", "/ev/case.zip!/inner.zip!/deep/doc.pdf"]
+    leaf = children[-1]
+    assert leaf["filename"] == "doc.pdf" and leaf["file_type"] == ".pdf"
+    assert leaf["md5"] == hashlib.md5(doc).hexdigest() and leaf["sha256"] == hashlib.sha256(doc).hexdigest()
+    assert leaf["meta"]["Author"] == "Alice" and leaf["size"] == len(doc) and leaf["inode"] is None
+
+
+def test_tar_and_gzip_members():
+    doc = pdf_bytes(b"<< /Author (Bob) >>")
+    data = gzip.compress(tar_bytes([("docs/b.pdf", doc)]), mtime=0)
+    assert archive_kind(data) == "gzip"
+    children, warning = expand(data, "/ev/bundle.tar.gz")
+    assert warning is None
+    assert [c["path"] for c in children] == ["/ev/bundle.tar.gz!/bundle.tar", "/ev/bundle.tar.gz!/bundle.tar!/docs/b.pdf"]
+    assert children[-1]["meta"]["Author"] == "Bob"
+    assert children[-1]["mtime_ns"] == 1_700_000_000 * 10 ** 9 and not children[-1]["mtime_local"]
+
+
+def test_depth_limit():
+    data = zip_bytes([("l2.zip", zip_bytes([("l3.zip", zip_bytes([("x.txt", b"x")]))]))])
+    children, _ = expand(data, limits=DEFAULT_LIMITS._replace(max_depth=2))
+    assert [c["path"].count("!/") for c in children] == [1, 2]
+    children, _ = expand(data, limits=DEFAULT_LIMITS._replace(max_depth=3))
+    assert [c["path"].count("!/") for c in children] == [1, 2, 3]
+
+
+def test_member_count_limit():
+    children, warning = expand(zip_bytes([(f"f{i}.txt", b"x") for i in range(10)]),
+                               limits=DEFAULT_LIMITS._replace(max_members=4))
+    assert len(children) == 4 and warning == "member count limit reached"
+
+
+def test_total_size_limit_stops_zip_bomb():
+    children, warning = expand(zip_bytes([("bomb.bin", b"\0" * (4 << 20)), ("after.txt", b"x")]),
+                               limits=ArchiveLimits(max_depth=3, max_members=100, max_member_size=1 << 20, max_total=1 << 20))
+    assert children == [] and warning == "expanded size limit reached"
+
+
+def test_oversized_member_is_hashed_not_parsed():
+    doc = pdf_bytes(b"<< /Author (Carol) >>", objects=[b"(" + b"x" * 4096 + b")"])
+    children, warning = expand(zip_bytes([("big.pdf", doc)]), limits=DEFAULT_LIMITS._replace(max_member_size=1024))
+    assert warning is None
+    assert children[0]["md5"] == hashlib.md5(doc).hexdigest()
+    assert "Author" not in children[0]["meta"] and "Archive Note" in children[0]["meta"]
+
+
+def test_ooxml_package_only_descends_into_media():
+    docx = zip_bytes([("[Content_Types].xml", b"<Types/>"), ("word/document.xml", b"<w:document/>"),
+                      ("word/media/image1.pdf", pdf_bytes(b"<< /Author (Dave) >>"))])
+    children, _ = expand(docx, "/ev/report.docx")
+    assert [c["path"] for c in children] == ["/ev/report.docx!/word/media/image1.pdf"]
+
+
+def test_corrupt_archive_keeps_partial_results(tmp_path):
+    data = zip_bytes([("a.txt", b"a" * 100)])
+    path = tmp_path / "broken.zip"
+    path.write_bytes(data[:60])
+    result = analyze_file(str(path), archives=DEFAULT_LIMITS)
+    assert result["children"] == [] and "Archive Warning" in result["meta"]
@@ -0,0 +1,18 @@
+from forensic_correlate import Correlator
+
+
+def add(store, path, meta):
+    store.add_result({"path": path, "filename": path.rsplit("/", 1)[-1], "file_type": ".pdf",
+                      "md5": path, "sha256": path, "status": "SECURE", "meta": meta})
+
+
+def test_pdf_creator_is_a_tool_not_an_author(store):
+    add(store, "/ev/a.pdf", {"Author": "Alice Smith", "Creator": "Writer"})
+    add(store, "/ev/b.pdf", {"Author": "Bob Jones", "Creator": "Writer"})
+    add(store, "/ev/c.pdf", {"Author": "smith, alice", "Creator": "Calc"})
+    store.commit()
+    correlator = Correlator(store)
+    counts = correlator.run(only={"author", "creator_tool"})
+    assert counts == {"author": 1, "creator_tool": 1}
+    groups = {rule: signature for _, rule, signature, _ in correlator.groups()}
+    assert groups == {"author": "alice smith", "creator_tool": "Writer"}
@@ -0,0 +1,115 @@
+import io
+import os
+import sqlite3
+import zipfile
+
+from conftest import pdf_bytes
+from forensic_archives import DEFAULT_LIMITS
+from forensic_core import ForensicEngine
+from forensic_db import ForensicStore, SCHEMA_VERSION, MAX_ID
+import forensic_search
+
+
+def ingest(store, paths, archives=None):
+    results = list(ForensicEngine(store, workers=1, archives=archives).process(paths))
+    store.commit()
+    return results
+
+
+def write_pdf(path, author, mtime):
+    path.write_bytes(pdf_bytes(b"<< /Author (%s) /Title (Quarterly) >>" % author.encode()))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def hits(store, query):
+    return forensic_search.count(store, query)
+
+
+def test_reingest_indexes_replaced_rows(tmp_path, store):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    write_pdf(a, "Alice", 1_000_000_000_000_000_000)
+    write_pdf(b, "Bob", 1_000_000_000_000_000_000)
+    ingest(store, [str(a), str(b)])
+    assert hits(store, "bob") == 1
+
+    write_pdf(b, "Xavier", 1_100_000_000_000_000_000)      # b's rows held the highest ids
+    assert [r.get("cached") for r in ingest(store, [str(a), str(b)])] == [True, None]
+    assert store.conn.execute("SELECT COUNT(*) FROM metadata WHERE value = 'Xavier'").fetchone()[0] == 1
+    assert hits(store, "xavier") == 1
+    assert hits(store, "bob") == 0
+    assert hits(store, "alice") == 1
+
+
+def test_fts_matches_metadata_after_repeated_reingest(tmp_path, store):
+    paths = [tmp_path / f"{i}.pdf" for i in range(4)]
+    for round_ in range(3):
+        for i, p in enumerate(paths): write_pdf(p, f"Author{round_}x{i}", (1_000 + round_) * 10 ** 15)
+        ingest(store, [str(p) for p in paths])
+        for i in range(len(paths)): assert hits(store, f"author{round_}x{i}") == 1
+    total = store.conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+    assert store.conn.execute("SELECT COUNT(*) FROM metadata_fts WHERE metadata_fts MATCH 'quarterly'").fetchone()[0] == 4
+    store.conn.execute("INSERT INTO metadata_fts (metadata_fts, rank) VALUES ('integrity-check', 1)")
+    assert total == 4 * len(store.load_result(str(paths[0]))["meta"])
+
+
+def test_reingested_archive_members_are_searchable(tmp_path, store):
+    path = tmp_path / "case.zip"
+    for round_, author in enumerate(["Quentin", "Rosalind"]):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("memo.pdf", pdf_bytes(b"<< /Author (%s) >>" % author.encode()))
+            zf.writestr("notes.txt", b"unchanged")
+        path.write_bytes(buf.getvalue())
+        os.utime(path, ns=((1_000 + round_) * 10 ** 15,) * 2)
+        ingest(store, [str(path)], archives=DEFAULT_LIMITS)
+    assert hits(store, "rosalind") == 1
+    assert hits(store, "quentin") == 0
+    members = store.conn.execute("SELECT COUNT(*) FROM files WHERE path LIKE ?", (str(path) + "!/%",)).fetchone()[0]
+    assert members == 2
+
+
+def test_keyset_pages_match_offset_pages(tmp_path, store):
+    flushes = []
+    store.on_flush = lambda: flushes.append(len(store.pending))
+    for i in range(30):
+        meta = {f"K{j}": f"v{i} {'odd' if j % 2 else 'even'}" for j in range(7)}
+        store.add_result({"path": f"/ev/{i}.bin", "filename": f"{i}.bin", "file_type": ".bin",
+                          "md5": "0" * 32, "sha256": "0" * 64, "status": "SECURE", "meta": meta})
+    store.commit()
+    assert flushes == [0]
+    search_page = lambda limit, after=0, before=None: forensic_search.page(store, "odd", limit, after, before)
+    for sql, page in (("SELECT id FROM metadata ORDER BY id", store.page),
+                      ("SELECT id FROM metadata WHERE value LIKE '%odd' ORDER BY id", search_page)):
+        ids, seen, after = [i for (i,) in store.conn.execute(sql)], [], 0
+        while True:
+            chunk = [r[-1] for r in page(40, after)]
+            if not chunk: break
+            seen.append(chunk)
+            after = chunk[-1]
+        assert seen == [ids[i:i + 40] for i in range(0, len(ids), 40)]
+        assert [r[-1] for r in page(40, before=seen[-1][0])] == seen[-2]
+        assert [r[-1] for r in page(5, before=MAX_ID)] == ids[-5:]
+
+
+def test_v5_database_is_rekeyed(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, filename TEXT, file_type TEXT,
+                            size INTEGER, mtime_ns INTEGER, inode INTEGER, atime_ns INTEGER, ctime_ns INTEGER,
+                            md5_hash TEXT, sha256_hash TEXT, anomaly_flag TEXT, analyzed_at TEXT);
+        CREATE TABLE metadata (file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+                               key TEXT NOT NULL, value TEXT);
+        CREATE VIRTUAL TABLE metadata_fts USING fts5 (key, value, content='metadata', content_rowid='rowid');
+        INSERT INTO files (id, path, filename) VALUES (1, '/x/a.pdf', 'a.pdf');
+        INSERT INTO metadata (file_id, key, value) VALUES (1, 'Author', 'Yvonne');
+        PRAGMA user_version = 5;
+    ''')
+    conn.close()
+    store = ForensicStore(path)
+    try:
+        assert "id" in [row[1] for row in store.conn.execute("PRAGMA table_info(metadata)")]
+        assert hits(store, "yvonne") == 1
+        assert store.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    finally:
+        store.close()
@@ -0,0 +1,93 @@
+import io
+import os
+import sys
+import wave
+import struct
+import tarfile
+import zipfile
+import warnings
+import subprocess
+
+import pytest
+
+from conftest import pdf_bytes
+from forensic_core import analyze_file
+from forensic_extractors import HEADER_SIZE, sniff, signature_matches, extract_metadata
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    import aifc
+
+
+class KeepOpen(io.BytesIO):
+    def close(self):            # aifc closes the stream it wrote to
+        pass
+
+
+def aiff_bytes(compressed=False):
+    buf = KeepOpen()
+    with aifc.open(buf, "wb") as out:
+        if compressed: out.aifc()
+        else: out.aiff()                # aifc defaults to AIFC for unnamed streams
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(22050)
+        out.writeframes(struct.pack(">h", 0) * 2205)
+    return buf.getvalue()
+
+
+def wav_bytes():
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b"\0\0" * 800)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("name, data", [("tone.aiff", aiff_bytes()), ("tone.aif", aiff_bytes()),
+                                        ("tone.aifc", aiff_bytes(compressed=True)), ("tone.wav", wav_bytes())],
+                         ids=["aiff", "aif", "aifc", "wav"])
+def test_audio_containers_are_sniffed_and_parsed(tmp_path, name, data):
+    header = data[:512]
+    assert sniff(header).name == "AUDIO"
+    assert signature_matches(name, header)
+    path = tmp_path / name
+    path.write_bytes(data)
+    result = analyze_file(str(path))
+    assert result["status"] == "SECURE"
+    assert "Audio Sample Rate" in result["meta"] and "Error" not in result["meta"]
+
+
+def test_riff_container_that_is_not_audio_is_not_audio():
+    assert sniff(b"RIFF\0\0\0\0AVI LIST" + b"\0" * 64) is None
+    assert not signature_matches("clip.wav", b"RIFF\0\0\0\0AVI LIST")
+
+
+def test_archive_starting_with_a_pdf_member_is_an_archive():
+    doc = pdf_bytes(b"<< /Author (Alice) >>")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf: zf.writestr("memo.pdf", doc)        # stored: %PDF- lands in the header
+    assert sniff(buf.getvalue()[:HEADER_SIZE]).name == "ZIP"
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        info = tarfile.TarInfo("memo.pdf")
+        info.size = len(doc)
+        tf.addfile(info, io.BytesIO(doc))
+    assert sniff(buf.getvalue()[:HEADER_SIZE]).name == "TAR"
+    assert sniff(b"junk\n" + doc).name == "PDF"
+
+
+def test_parser_errors_land_in_meta(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\ngarbage")
+    assert "Error" in extract_metadata(str(path))
+
+
+def test_parser_libraries_load_on_first_use():
+    code = ("import sys, forensic_extractors; "
+            "print(sorted({'PyPDF2', 'mutagen', 'exifread', 'openpyxl', 'docx', 'pptx'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert out.stdout.strip() == "[]"
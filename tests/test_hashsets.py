@@ -0,0 +1,69 @@
+import hashlib
+
+import pytest
+
+from forensic_hashsets import HashSet, KnownFiles, build_hashset, DATA_OFFSET, KNOWN_BAD, KNOWN_GOOD
+
+# digests on both sides of every 16-bit fan-out edge, plus the extremes
+EDGES = ["0000" + "0" * 28, "0000" + "f" * 28, "0001" + "0" * 28, "00ff" + "f" * 28, "0100" + "0" * 28,
+         "7fff" + "f" * 28, "8000" + "0" * 28, "fffe" + "f" * 28, "ffff" + "0" * 28, "ffff" + "f" * 28]
+ABSENT = ["0000" + "0" * 27 + "1", "0002" + "0" * 28, "00ff" + "f" * 27 + "e", "8000" + "0" * 27 + "1",
+          "fffe" + "0" * 28, "ffff" + "f" * 27 + "e"]
+
+
+def write_list(tmp_path, name, lines):
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("run_size", [1, 3, 1000])
+def test_fanout_boundaries(tmp_path, run_size):
+    src = write_list(tmp_path, "edges.txt", EDGES + EDGES[::2])            # duplicates across runs
+    out = str(tmp_path / "edges.hset")
+    assert build_hashset([src], out, "md5", run_size=run_size) == len(EDGES)
+    hs = HashSet(out)
+    assert len(hs) == len(EDGES) and hs.algorithm == "md5"
+    for digest in EDGES: assert digest in hs and digest.upper() in hs
+    for digest in ABSENT: assert digest not in hs
+    hs.close()
+
+
+def test_input_formats_and_bad_values(tmp_path):
+    md5 = [hashlib.md5(str(i).encode()).hexdigest() for i in range(50)]
+    rows = [f'"{"0" * 40}","{d.upper()}","f{i}"' for i, d in enumerate(md5[:25])]
+    csv_src = write_list(tmp_path, "nsrl.csv", ['"SHA-1","MD5","FileName"'] + rows)
+    sum_src = write_list(tmp_path, "md5sums.txt", [f"{d}  ./file{i}" for i, d in enumerate(md5[25:])])
+    out = str(tmp_path / "mixed.hset")
+    assert build_hashset([csv_src, sum_src], out) == 50
+    hs = HashSet(out)
+    assert all(d in hs for d in md5)
+    for bad in ("", "xyz", md5[0][:-1], md5[0] + "0", "g" * 32, None): assert bad not in hs
+
+
+def test_sha1_set_and_empty_set(tmp_path):
+    digest = hashlib.sha1(b"evidence").hexdigest()
+    out = str(tmp_path / "sha1.hset")
+    build_hashset([write_list(tmp_path, "s.txt", [digest])], out, "sha1")
+    assert digest in HashSet(out) and HashSet(out).algorithm == "sha1"
+    empty = str(tmp_path / "empty.hset")
+    assert build_hashset([write_list(tmp_path, "e.txt", ["no digests here"])], empty) == 0
+    assert len(HashSet(empty)) == 0 and EDGES[0] not in HashSet(empty)
+    with open(empty, "rb") as f: assert len(f.read()) == DATA_OFFSET
+
+
+def test_not_a_hashset(tmp_path):
+    path = tmp_path / "junk.hset"
+    path.write_bytes(b"\0" * DATA_OFFSET)
+    with pytest.raises(ValueError): HashSet(str(path))
+
+
+def test_known_files_bad_wins(tmp_path):
+    digest = hashlib.md5(b"x").hexdigest()
+    src = write_list(tmp_path, "x.txt", [digest])
+    good, bad = str(tmp_path / "good.hset"), str(tmp_path / "bad.hset")
+    build_hashset([src], good)
+    build_hashset([src], bad)
+    assert KnownFiles(good=[good]).lookup({"md5": digest}) == (KNOWN_GOOD, "good.hset")
+    assert KnownFiles(good=[good], bad=[bad]).lookup({"md5": digest}) == (KNOWN_BAD, "bad.hset")
+    assert KnownFiles(good=[good]).lookup({"md5": "0" * 32}) == (None, None)
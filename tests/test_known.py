@@ -0,0 +1,114 @@
+import io
+import os
+import zipfile
+import hashlib
+
+import forensic_search
+from conftest import pdf_bytes
+from forensic_core import ForensicEngine
+from forensic_archives import DEFAULT_LIMITS
+from forensic_hashsets import KnownFiles, build_hashset, KNOWN_GOOD, KNOWN_BAD
+from forensic_sandbox import failed_result
+
+
+def make_set(tmp_path, name, data, algorithm="md5"):
+    src = tmp_path / f"{name}.txt"
+    src.write_text(hashlib.new(algorithm, data).hexdigest() + "\n")
+    out = str(tmp_path / f"{name}.hset")
+    build_hashset([str(src)], out, algorithm)
+    return out
+
+
+def run(store, paths, **options):
+    engine = ForensicEngine(store, workers=1, archives=DEFAULT_LIMITS, **options)
+    return {r["path"]: r for r in engine.process(paths)}, engine.stats
+
+
+def status(store, path):
+    return store.conn.execute("SELECT anomaly_flag FROM files WHERE path = ?", (path,)).fetchone()[0]
+
+
+def test_known_bad_applies_to_cached_file(tmp_path, store):
+    data = pdf_bytes(b"<< /Author (Mallory) >>")
+    (tmp_path / "e.pdf").write_bytes(data)
+    path = str(tmp_path / "e.pdf")
+    run(store, [path])
+    bad = make_set(tmp_path, "bad", data)
+    results, stats = run(store, [path], known=KnownFiles(bad=[bad]))
+    assert not results[path].get("cached") and stats["known_bad"] == 1
+    assert status(store, path) == KNOWN_BAD
+    results, _ = run(store, [path], known=KnownFiles(bad=[bad]))
+    assert results[path].get("cached")                                  # classification settled: cache again
+
+
+def test_known_good_drops_stored_metadata(tmp_path, store):
+    data = pdf_bytes(b"<< /Author (Trent) >>")
+    (tmp_path / "g.pdf").write_bytes(data)
+    path = str(tmp_path / "g.pdf")
+    run(store, [path])
+    assert "Author" in store.load_result(path)["meta"]
+    run(store, [path], known=KnownFiles(good=[make_set(tmp_path, "good", data)]))
+    assert status(store, path) == KNOWN_GOOD
+    assert "Author" not in store.load_result(path)["meta"]
+
+
+def test_set_needing_unstored_digest_forces_rehash(tmp_path, store):
+    data = pdf_bytes(b"<< /Author (Peggy) >>")
+    (tmp_path / "s.pdf").write_bytes(data)
+    path = str(tmp_path / "s.pdf")
+    run(store, [path])
+    bad = make_set(tmp_path, "sha1bad", data, "sha1")
+    results, _ = run(store, [path], known=KnownFiles(bad=[bad]))
+    assert not results[path].get("cached") and status(store, path) == KNOWN_BAD
+    results, _ = run(store, [path], known=KnownFiles(bad=[bad]))
+    assert results[path].get("cached")                                  # SHA1 now stored with the file
+
+
+def test_known_bad_applies_to_cached_archive_member(tmp_path, store):
+    member = pdf_bytes(b"<< /Author (Eve) >>")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf: zf.writestr("docs/m.pdf", member)
+    (tmp_path / "a.zip").write_bytes(buf.getvalue())
+    path = str(tmp_path / "a.zip")
+    run(store, [path])
+    run(store, [path], known=KnownFiles(bad=[make_set(tmp_path, "bad", member)]))
+    assert status(store, path + "!/docs/m.pdf") == KNOWN_BAD
+
+
+def zip_with(tmp_path, name, members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for info, data in members: zf.writestr(info, data)
+    (tmp_path / name).write_bytes(buf.getvalue())
+    return str(tmp_path / name)
+
+
+def test_archive_with_sha1_set_is_cached_on_later_runs(tmp_path, store):
+    locked = zipfile.ZipInfo("locked.bin")
+    locked.flag_bits |= 0x1                                             # encrypted members are never hashed
+    member = pdf_bytes(b"<< /Author (Eve) >>")
+    path = zip_with(tmp_path, "a.zip", [("m.pdf", member), (locked, b"x")])
+    bad = make_set(tmp_path, "sha1bad", b"unrelated", "sha1")
+    results, _ = run(store, [path], known=KnownFiles(bad=[bad]))
+    assert not results[path].get("cached")
+    assert store.load_result(path + "!/m.pdf")["meta"]["SHA1"] == hashlib.sha1(member).hexdigest()
+    for _ in range(2):
+        results, stats = run(store, [path], known=KnownFiles(bad=[bad]))
+        assert results[path].get("cached") and stats["cached"] == 1 and stats["analyzed"] == 0
+
+
+def test_members_dropped_when_archive_is_stored_unexpanded(tmp_path, store):
+    path = zip_with(tmp_path, "a.zip", [("m.pdf", pdf_bytes(b"<< /Author (Eve) >>"))])
+    members = lambda: [p for (p,) in store.conn.execute("SELECT path FROM files WHERE path LIKE ?", (path + "!/%",))]
+    run(store, [path])
+    assert members() and forensic_search.count(store, "eve") == 1
+    run(store, [path], known=KnownFiles(good=[make_set(tmp_path, "good", (tmp_path / "a.zip").read_bytes())]))
+    assert status(store, path) == KNOWN_GOOD
+    assert members() == [] and forensic_search.count(store, "eve") == 0
+
+    os.utime(path, ns=(10 ** 18, 10 ** 18))                            # changed: re-expanded without the set
+    run(store, [path])
+    assert members() and forensic_search.count(store, "eve") == 1
+    store.add_result(failed_result(path, "timeout", "no result after 300s"))        # sandbox gave up on it
+    store.commit()
+    assert members() == [] and forensic_search.count(store, "eve") == 0
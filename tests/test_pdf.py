@@ -0,0 +1,116 @@
+import io
+import zlib
+import codecs
+
+import pytest
+import PyPDF2
+
+from forensic_pdf import PdfQuickError, PdfQuickReader, parse_value, read_pdf_metadata
+from forensic_extractors import extract_metadata
+
+XMP = b"""<?xpacket begin="" id="W5M0MpCehiHzreSzNTczkc9d"?>
+<x:xmpmeta xmlns:x="adobe:ns:meta/">
+ <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description rdf:about="" xmlns:xmp="http://ns.adobe.com/xap/1.0/"
+      xmp:CreatorTool="Writer 7.1" xmp:CreateDate="2024-03-05T10:00:00+01:00"/>
+  <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/">
+   <dc:creator><rdf:Seq><rdf:li>Alice</rdf:li><rdf:li>Bob</rdf:li></rdf:Seq></dc:creator>
+   <dc:title><rdf:Alt><rdf:li xml:lang="x-default">Quarterly</rdf:li></rdf:Alt></dc:title>
+  </rdf:Description>
+ </rdf:RDF>
+</x:xmpmeta>
+<?xpacket end="w"?>"""
+
+
+def section(objects, start, trailer):
+    """Object bodies numbered from 1 written at `start`, then a classic xref table and trailer."""
+    out, offsets = bytearray(), {}
+    for num, body in objects.items():
+        offsets[num] = start + len(out)
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = start + len(out)
+    out += b"xref\n0 1\n0000000000 65535 f \n"
+    for num in sorted(offsets): out += b"%d 1\n%010d 00000 n \n" % (num, offsets[num])
+    out += b"trailer\n" + trailer + b"\nstartxref\n%d\n%%%%EOF\n" % xref
+    return bytes(out), xref
+
+
+def build(info, catalog=b"<< /Type /Catalog /Pages 2 0 R >>", extra=None, updates=()):
+    """A PDF with /Info as object 3, plus incremental updates: [(objects, trailer_extra)]."""
+    objects = {1: catalog, 2: b"<< /Type /Pages /Kids [] /Count 0 >>", 3: info}
+    objects.update(extra or {})
+    head = b"%PDF-1.7\n"
+    body, xref = section(objects, len(head), b"<< /Size 10 /Root 1 0 R /Info 3 0 R >>")
+    data = head + body
+    for objs, trailer in updates:
+        body, xref = section(objs, len(data), b"<< /Size 10 /Root 1 0 R /Info 3 0 R /Prev %d %s>>" % (xref, trailer))
+        data += body
+    return data
+
+
+def stream(payload, flate=False):
+    if flate: payload = zlib.compress(payload)
+    filters = b" /Filter /FlateDecode" if flate else b""
+    return b"<< /Type /Metadata /Subtype /XML /Length %d%s >>\nstream\n" % (len(payload), filters) + payload + b"\nendstream"
+
+
+def pypdf_info(data):
+    return {k.lstrip("/"): str(v) for k, v in (PyPDF2.PdfReader(io.BytesIO(data)).metadata or {}).items()}
+
+
+def quick_info(data):
+    return {k: v for k, v in read_pdf_metadata(io.BytesIO(data)).items() if not k.startswith("XMP ")}
+
+
+def utf16(text):
+    return b"<" + (codecs.BOM_UTF16_BE + text.encode("utf-16-be")).hex().encode() + b">"
+
+
+@pytest.mark.parametrize("info", [
+    b"<< /Author (Alice) /Title (Plain) /CreationDate (D:20240305100000+01'00') >>",
+    b"<< /Author (Nested \\(parens\\) and \\\\ escapes\\n) /Producer (Oct\\351tal) >>",
+    b"<< /Title " + utf16("Grüße 日本") + b" /Author " + utf16("Zoë") + b" >>",
+    b"<< /Title <4869> /Keywords (a b) >>",
+], ids=["plain", "escapes", "utf16", "hex"])
+def test_info_matches_pypdf2(info):
+    data = build(info)
+    assert quick_info(data) == pypdf_info(data)
+
+
+def test_incremental_update_wins_over_original():
+    data = build(b"<< /Author (Alice) /Title (Draft) >>",
+                 updates=[({3: b"<< /Author (Mallory) /Title (Draft) /ModDate (D:20240306) >>"}, b""),
+                          ({3: b"<< /Author (Mallory) /Title (Final) /ModDate (D:20240307) >>"}, b"")])
+    assert quick_info(data) == pypdf_info(data)
+    assert quick_info(data)["Title"] == "Final"
+
+
+def test_xmp_packet_matches_pypdf2():
+    for flate in (False, True):
+        data = build(b"<< /Author (Alice) >>", catalog=b"<< /Type /Catalog /Pages 2 0 R /Metadata 4 0 R >>",
+                     extra={4: stream(XMP, flate)})
+        meta = read_pdf_metadata(io.BytesIO(data))
+        xmp = PyPDF2.PdfReader(io.BytesIO(data)).xmp_metadata
+        assert meta["XMP Creator"] == "; ".join(xmp.dc_creator) == "Alice; Bob"
+        assert meta["XMP Title"] == xmp.dc_title["x-default"]
+        assert meta["XMP CreatorTool"] == xmp.xmp_creator_tool
+        assert meta["XMP CreateDate"] == "2024-03-05T10:00:00+01:00"
+
+
+def test_unsupported_inputs_raise_and_extractor_falls_back(tmp_path):
+    data = build(b"<< /Author (Alice) >>", updates=[({}, b"/Encrypt 9 0 R ")])
+    with pytest.raises(PdfQuickError): PdfQuickReader(io.BytesIO(data))
+    with pytest.raises(PdfQuickError): PdfQuickReader(io.BytesIO(b"%PDF-1.5\nno xref here"))
+    data = build(b"<< /Author (Alice) >>").replace(b"startxref\n", b"startxref\n1")    # startxref misses the table
+    with pytest.raises(PdfQuickError): PdfQuickReader(io.BytesIO(data))
+    path = tmp_path / "broken_xref.pdf"
+    path.write_bytes(data)
+    assert extract_metadata(str(path)) == {"Author": "Alice"}                          # recovered by PyPDF2
+
+
+def test_parse_value_objects():
+    value, _ = parse_value(b"<< /A [1 2.5 -3 true null (x) /N#20ame 4 0 R] /B << /C <00ff> >> >>", 0)
+    assert value["A"][:5] == [1, 2.5, -3, True, None]
+    assert value["A"][5:7] == [b"x", "/N ame"]
+    assert tuple(value["A"][7]) == (4, 0)
+    assert value["B"]["C"] == b"\x00\xff"
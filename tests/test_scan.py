@@ -0,0 +1,33 @@
+import random
+
+from forensic_scan import ScanFilter, scan, walk, walk_parallel, NO_FILTER
+
+
+def make_tree(root, dirs=200, seed=7):
+    rng = random.Random(seed)
+    root.mkdir()
+    made = [root]
+    for i in range(dirs):
+        d = rng.choice(made) / f"d{i:03d}"
+        d.mkdir()
+        made.append(d)
+        for j in range(rng.randint(0, 3)): (d / f"f{j}.txt").write_text(str(j))
+    (root / "top.txt").write_text("x")
+    return root
+
+
+def test_parallel_walk_matches_serial_order(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    serial = list(walk(str(root), NO_FILTER))
+    assert len(serial) > 200
+    for workers, pending in ((2, None), (8, None), (8, 1), (16, 3)):
+        for _ in range(3):
+            assert list(walk_parallel(str(root), NO_FILTER, workers, max_pending=pending)) == serial
+
+
+def test_scan_filters_and_dedupes(tmp_path):
+    root = make_tree(tmp_path / "tree", dirs=20)
+    flt = ScanFilter(include=["*f0.txt"], exclude=["d005"])
+    found = list(scan([str(root), str(root)], flt, workers=4))
+    assert found == list(scan([str(root)], flt, workers=1))
+    assert found and all(p.endswith("f0.txt") and "/d005" not in p for p in found)
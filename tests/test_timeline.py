@@ -0,0 +1,54 @@
+import io
+import os
+import calendar
+import zipfile
+
+from conftest import pdf_bytes
+from forensic_core import ForensicEngine
+from forensic_archives import DEFAULT_LIMITS
+from forensic_timeline import Timeline
+
+
+def zip_with_pdf(tmp_path, entry_time, mod_date):
+    """A zip whose PDF member says ModDate (UTC) and whose DOS entry time is `entry_time` (local, zone-less)."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(zipfile.ZipInfo("doc.pdf", entry_time), pdf_bytes(b"<< /ModDate (D:%sZ) >>" % mod_date))
+    path = tmp_path / "case.zip"
+    path.write_bytes(buf.getvalue())
+    return str(path)
+
+
+def stomps(store):
+    return [path for path, in store.conn.execute('''SELECT f.path FROM anomalies a JOIN files f ON f.id = a.file_id
+                                                    WHERE a.rule = 'time_stomp' ''')]
+
+
+def analyze(store, path):
+    list(ForensicEngine(store, workers=1, archives=DEFAULT_LIMITS).process([path]))
+    Timeline(store).run()
+
+
+def test_zip_entry_time_west_of_utc_is_not_a_time_stomp(tmp_path, store):
+    # saved 18:00 UTC, zipped at the same moment in UTC-8: the DOS entry reads 10:00
+    path = zip_with_pdf(tmp_path, (2024, 3, 5, 10, 0, 0), b"20240305180000")
+    analyze(store, path)
+    member = path + "!/doc.pdf"
+    assert store.conn.execute("SELECT mtime_local FROM files WHERE path = ?", (member,)).fetchone()[0] == 1
+    assert member not in stomps(store)
+    assert store.conn.execute("SELECT anomaly_flag FROM files WHERE path = ?", (member,)).fetchone()[0] == "SECURE"
+
+
+def test_zip_entry_days_before_content_is_still_a_time_stomp(tmp_path, store):
+    path = zip_with_pdf(tmp_path, (2024, 3, 1, 10, 0, 0), b"20240305180000")
+    analyze(store, path)
+    assert path + "!/doc.pdf" in stomps(store)
+
+
+def test_filesystem_mtime_stays_utc(tmp_path, store):
+    path = tmp_path / "d.pdf"
+    path.write_bytes(pdf_bytes(b"<< /ModDate (D:20240305180000Z) >>"))
+    stamp = calendar.timegm((2024, 3, 5, 10, 0, 0)) * 10 ** 9          # 10:00 UTC, eight hours before ModDate
+    os.utime(path, ns=(stamp, stamp))
+    analyze(store, str(path))
+    assert str(path) in stomps(store)